@@ -0,0 +1,88 @@
+"""
+Startup import benchmark.
+
+Imports the GUI entry point in fresh interpreters with -X importtime and
+reports the time spent importing it, the slowest modules, and whether any
+module that should only be loaded on first use was imported at startup.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--budget-ms 150]
+
+Exits with a non-zero status when the median import time exceeds the
+budget or a lazily loaded module is imported at startup.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that must only be imported when their feature is first used
+LAZY_MODULES = (
+    'googleapiclient', 'google_auth_oauthlib', 'google.oauth2',
+    'watchdog.observers', 'model.email_sender', 'view.query_window',
+)
+
+def measure_import(theModule):
+    """
+    Import a module in a fresh interpreter and collect its import times.
+
+    Args:
+        theModule: Name of the module to import.
+
+    Returns:
+        dict: Cumulative import time in microseconds keyed by module name.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {theModule}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # Lines look like 'import time:  self_us | cumulative_us | name'
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative_us)
+    return times
+
+def main():
+    """
+    Run the benchmark and report the results.
+
+    Returns:
+        int: 0 if startup is within budget, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Measure the startup import time of main.py.')
+    parser.add_argument('--module', default='main', help='Module to import. Defaults to main.')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to time.')
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                        help='Maximum median import time in milliseconds.')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest modules to list.')
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    totals = [times.get(args.module, 0) / 1000 for times in runs]
+    median = statistics.median(totals)
+
+    print(f"Import of {args.module}: median {median:.1f} ms, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms over {args.runs} runs")
+    print("Slowest modules (cumulative, last run):")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative_us in slowest[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    eager = [name for name in runs[-1]
+             if any(name == lazy or name.startswith(lazy + '.') for lazy in LAZY_MODULES)]
+    ok = True
+    if eager:
+        print(f"Imported at startup but should be lazy: {', '.join(sorted(eager))}")
+        ok = False
+    if median > args.budget_ms:
+        print(f"Over budget: {median:.1f} ms > {args.budget_ms:.1f} ms")
+        ok = False
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+File Watcher Headless Entry Point.
+
+Runs the file watcher without the Tkinter user interface, persisting every
+event to the database as it happens. Intended for servers and services:
+
+    python cli.py watch PATH [PATH ...] [--include .py,.txt] [--exclude node_modules/] [--reconcile]
+    python cli.py compact [--db database.db]
+    python cli.py maintain [--db database.db] [--partition day] [--retain-days 30]
+    python cli.py export OUTPUT [--format jsonl] [--event-type created] [--date-range Today]
+
+The process runs until it receives SIGINT or SIGTERM, then writes any
+queued events and exits.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+from model.database import configure_database, enable_compact_schema, DATABASE_PATH
+from model.event_writer import EventWriter
+from model.exporters import (
+    FORMATS, columnar_format, export_events, format_for_path, missing_dependency
+)
+from model.eventHandler import MyEventHandler
+from model.fileWatcher import FileWatcher
+from model.partitions import apply_retention, roll_partitions, PERIODS
+from model.path_filter import PathFilter
+
+# Seconds during which bursts of events for one path are merged
+COALESCE_WINDOW = 0.2
+
+# Seconds between partition rolls and retention passes while watching
+MAINTENANCE_INTERVAL = 300
+
+def add_retention_arguments(theParser):
+    """
+    Add the partitioning and retention options to a command.
+
+    Args:
+        theParser: The command's argument parser.
+    """
+    theParser.add_argument('--partition', choices=sorted(PERIODS),
+                           help='Move events older than the current day or week into partition files.')
+    theParser.add_argument('--retain-days', type=float,
+                           help='Delete events older than this many days.')
+    theParser.add_argument('--max-rows', type=int,
+                           help='Keep at most this many of the newest events.')
+    theParser.add_argument('--max-size-mb', type=float,
+                           help='Drop the oldest partitions beyond this total size.')
+
+def build_parser():
+    """
+    Build the command line parser.
+
+    Returns:
+        argparse.ArgumentParser: Parser for the supported commands.
+    """
+    parser = argparse.ArgumentParser(prog='filewatcher',
+                                     description='Headless file system watcher.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    watch = commands.add_parser('watch', help='Watch directories and record their events.')
+    watch.add_argument('paths', nargs='+', metavar='PATH', help='Directories to watch.')
+    watch.add_argument('--include', default='',
+                       help="Extensions or glob patterns to record, e.g. '.py,.txt'.")
+    watch.add_argument('--exclude', default='',
+                       help="Gitignore-style patterns to ignore, e.g. 'node_modules/ .git/'.")
+    watch.add_argument('--db', default=DATABASE_PATH, help='Database file to write events to.')
+    watch.add_argument('--no-recursive', dest='recursive', action='store_false',
+                       help='Only watch the top level of each directory.')
+    watch.add_argument('--coalesce', type=float, default=COALESCE_WINDOW,
+                       help='Seconds to merge bursts of events per path, 0 to disable.')
+    watch.add_argument('--quiet', action='store_true', help='Do not print events.')
+    watch.add_argument('--reconcile', action='store_true',
+                       help='Report changes made while the watcher was stopped, '
+                            'using a snapshot stored in the database.')
+    add_retention_arguments(watch)
+
+    compact = commands.add_parser(
+        'compact', help='Convert the database to the compact, dictionary-encoded layout.')
+    compact.add_argument('--db', default=DATABASE_PATH, help='Database file to convert.')
+
+    maintain = commands.add_parser(
+        'maintain', help='Roll old events into partitions and apply the retention limits once.')
+    maintain.add_argument('--db', default=DATABASE_PATH, help='Database file to maintain.')
+    add_retention_arguments(maintain)
+
+    export = commands.add_parser('export', help='Export recorded events to a file.')
+    export.add_argument('output', metavar='OUTPUT',
+                        help="File to write, gzip-compressed for text formats ending in '.gz'.")
+    export.add_argument('--db', default=DATABASE_PATH, help='Database file to export from.')
+    export.add_argument('--format', choices=sorted(FORMATS) + ['columnar'],
+                        help="Output format, by default picked from the file extension. "
+                             "'columnar' is Parquet when pyarrow is installed, otherwise npz "
+                             "when numpy is.")
+    export.add_argument('--event-type', action='append',
+                        help='Only export this event type. May be repeated.')
+    export.add_argument('--extension', action='append',
+                        help='Only export this file extension. May be repeated.')
+    export.add_argument('--date-range', default='All',
+                        choices=['All', 'Today', 'Last 7 days', 'Last 30 days'],
+                        help='Only export events from this period.')
+    export.add_argument('--path', default='', help='Only export events whose path contains this text.')
+    return parser
+
+def maintain(theArgs):
+    """
+    Roll old events into partitions, then apply the retention limits.
+
+    Args:
+        theArgs: Parsed arguments holding the retention options.
+
+    Returns:
+        bool: True if every step succeeded.
+    """
+    ok = True
+    if theArgs.partition:
+        ok = roll_partitions(theArgs.partition) >= 0
+    if theArgs.retain_days is not None or theArgs.max_rows is not None \
+            or theArgs.max_size_mb is not None:
+        max_bytes = None if theArgs.max_size_mb is None else int(theArgs.max_size_mb * 1024 * 1024)
+        ok = apply_retention(theArgs.retain_days, theArgs.max_rows, max_bytes) >= 0 and ok
+    return ok
+
+def print_event(theEventType, thePath, theDestPath=None, theTimestamp=None):
+    """
+    Print an event on standard output.
+
+    Args:
+        theEventType: The type of event ('created', 'modified', 'deleted', 'moved').
+        thePath: The file path where the event occurred.
+        theDestPath: Destination path of a move. Defaults to None.
+        theTimestamp: Epoch nanoseconds when the event was observed. Defaults to None.
+    """
+    target = f"{thePath} -> {theDestPath}" if theDestPath else thePath
+    print(f"{theEventType}: {target}", flush=True)
+
+def watch(theArgs, theStopEvent=None):
+    """
+    Watch the given directories until the stop event is set.
+
+    Args:
+        theArgs: Parsed arguments of the watch command.
+        theStopEvent: threading.Event that ends the watch. Defaults to a new
+            event set by SIGINT and SIGTERM.
+
+    Returns:
+        int: Process exit code.
+    """
+    missing = [path for path in theArgs.paths if not os.path.isdir(path)]
+    if missing:
+        print(f"Not a directory: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    if theStopEvent is None:
+        theStopEvent = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda signum, frame: theStopEvent.set())
+
+    configure_database(theArgs.db)
+    writer = EventWriter()
+    writer.start()
+    handler = MyEventHandler(logToTextbox=None if theArgs.quiet else print_event,
+                             theEventWriter=writer,
+                             theCoalesceWindow=theArgs.coalesce)
+    includes = PathFilter.parse_patterns(theArgs.include)
+    excludes = PathFilter.parse_patterns(theArgs.exclude)
+
+    watcher = FileWatcher(theEventHandler=handler, theReconcile=theArgs.reconcile)
+    for path in theArgs.paths:
+        path = os.path.abspath(path)
+        watcher.add_root(path, theArgs.recursive, PathFilter(includes, excludes, theRoot=path))
+    watcher.start()
+    print(f"Watching {', '.join(watcher.get_roots())}", flush=True)
+
+    try:
+        maintain(theArgs)
+        next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+        while not theStopEvent.wait(1):
+            if time.monotonic() >= next_maintenance:
+                maintain(theArgs)
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+    finally:
+        watcher.stop()
+        handler.close()
+        writer.stop()
+        print("Stopped watching", flush=True)
+    if writer.get_failed_count():
+        print(f"{writer.get_failed_count()} events could not be saved and were written to "
+              f"{writer.get_dead_letter_path()}", file=sys.stderr)
+        return 1
+    return 0
+
+def main(theArgv=None):
+    """
+    Parse the command line and run the requested command.
+
+    Args:
+        theArgv: Arguments without the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        int: Process exit code.
+    """
+    args = build_parser().parse_args(theArgv)
+    if args.command == 'watch':
+        return watch(args)
+    if args.command == 'compact':
+        configure_database(args.db)
+        return 0 if enable_compact_schema() else 1
+    if args.command == 'export':
+        configure_database(args.db)
+        export_format = args.format or format_for_path(args.output)
+        if export_format == 'columnar':
+            export_format = columnar_format()
+            if export_format is None:
+                print("Columnar exports require the optional 'pyarrow' or 'numpy' package",
+                      file=sys.stderr)
+                return 1
+        package = missing_dependency(export_format)
+        if package:
+            print(f"{export_format} exports require the optional '{package}' package "
+                  f"(pip install {package})", file=sys.stderr)
+            return 1
+        filters = {'event_type': args.event_type, 'extension': args.extension,
+                   'date_range': args.date_range, 'path': args.path}
+        count = export_events(args.output, filters, export_format)
+        if count < 0:
+            return 1
+        print(f"Exported {count} events to {args.output}", flush=True)
+        return 0
+    if args.command == 'maintain':
+        configure_database(args.db)
+        return 0 if maintain(args) else 1
+    return 1
+
+if __name__ == "__main__":
+    """
+    Script entry point.
+    """
+    sys.exit(main())
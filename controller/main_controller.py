@@ -1,26 +1,46 @@
+import threading
 import tkinter as tk
 
-from model.fileWatcher import FileWatcher
-from model.eventHandler import MyEventHandler
+from model.path_filter import PathFilter
 from model.db_handler import (
     query_events,
+    fetch_event_page,
     reset_database as db_reset
 )
-from view.query_window import QueryWindow
 from tkinter import filedialog
-from model.email_sender import send_email_with_attachment
+
+# The watcher (watchdog observers), the query window and the email sender
+# (Google API client) are imported on first use to keep startup fast.
 
 class WatcherController:
     """
     Controller class for managing file system watching operations.
     """
     
+    # Seconds during which bursts of events for one path are merged
+    COALESCE_WINDOW = 0.2
+    
+    # Period of the partition files old events are rolled into while
+    # watching, or None to keep every event in the main database
+    PARTITION_PERIOD = 'day'
+    # Retention limits applied while watching. None keeps everything.
+    RETAIN_DAYS = None
+    MAX_ROWS = None
+    # Milliseconds between maintenance runs while watching
+    MAINTENANCE_INTERVAL = 300000
+    
     def __init__(self):
         """Constructs the WatcherController"""
         self.__myWatcher = None
+        self.__myHandler = None
+        self.__myEventWriter = None
         self.__myView = None
-        self.__myWatchDirectory = ''
+        self.__myWatchDirectories = []
         self.__myFileExtension = ''
+        self.__myExcludePatterns = ''
+        self.__myQueryRunner = None
+        self.__myMaintenanceId = None
+        self.__myMaintenanceThread = None
 
     def set_view(self, theView):
         """
@@ -42,60 +62,148 @@ class WatcherController:
 
     def start_watching(self):
         """
-        Creates a new FileWatcher instance with an event handler and begins
-        monitoring the specified directory. Applies file extension filtering
-        if chosen.
+        Creates a FileWatcher with an event handler and begins monitoring
+        every selected directory on a single observer. Applies the include
+        patterns and exclusions to each directory; excluded directories are
+        never watched. Database maintenance runs right away and then every
+        MAINTENANCE_INTERVAL milliseconds until watching stops.
         """
-        if not self.__myWatchDirectory:
+        if not self.__myWatchDirectories:
             print("No directory selected to watch.")
             return
         
-        handler = MyEventHandler(logToTextbox=self.__myView.add_log)
+        from model.fileWatcher import FileWatcher
+        from model.eventHandler import MyEventHandler
+        from model.event_writer import EventWriter
+        self.__myEventWriter = EventWriter(theOnFailure=self.__myView.report_write_failure)
+        self.__myEventWriter.start()
+        self.__myHandler = MyEventHandler(logToTextbox=self.__myView.add_log,
+                                          theEventWriter=self.__myEventWriter,
+                                          theCoalesceWindow=self.COALESCE_WINDOW)
 
-        if self.__myFileExtension and self.__myFileExtension != 'None':
-            handler.set_extension_filter(self.__myFileExtension)
-
-        self.__myWatcher = FileWatcher(self.__myWatchDirectory, handler)
+        self.__myWatcher = FileWatcher(theEventHandler=self.__myHandler)
+        for directory in self.__myWatchDirectories:
+            self.__myWatcher.add_root(directory, theFilter=self.__build_filter(directory))
         self.__myWatcher.start()
         
         # Disable the start button when watching begins
         self.__myView.get_window().set_start_button_state(False)
+        self.__run_maintenance()
         
-        print(f"Started watching directory: {self.__myWatchDirectory}")
+        print(f"Started watching directories: {', '.join(self.__myWatchDirectories)}")
     
     def stop_watching(self):
         """Stop the current file watching operation if one is active."""
         if self.__myWatcher:
+            if self.__myMaintenanceId is not None:
+                self.__myView.get_root().after_cancel(self.__myMaintenanceId)
+                self.__myMaintenanceId = None
             self.__myWatcher.stop()
+            self.__myWatcher = None
+            self.__myHandler.close()
+            self.__myHandler = None
+            self.__myEventWriter.stop()
+            self.__myEventWriter = None
             
             # Re-enable the start button when watching stops
             self.__myView.get_window().set_start_button_state(True)
             
             print("Stopped watching")
 
+    def __run_maintenance(self):
+        """
+        Starts a maintenance run in the background and schedules the next one.
+        
+        A run is skipped while the previous one is still in progress.
+        """
+        if self.__myMaintenanceThread is None or not self.__myMaintenanceThread.is_alive():
+            self.__myMaintenanceThread = threading.Thread(target=self.__maintain,
+                                                          name='Maintenance', daemon=True)
+            self.__myMaintenanceThread.start()
+        self.__myMaintenanceId = self.__myView.get_root().after(self.MAINTENANCE_INTERVAL,
+                                                                self.__run_maintenance)
+
+    def __maintain(self):
+        """
+        Rolls old events into partitions, then applies the retention limits.
+        Runs on the maintenance thread.
+        """
+        from model.database import close_connection
+        from model.partitions import apply_retention, roll_partitions
+        try:
+            if self.PARTITION_PERIOD:
+                roll_partitions(self.PARTITION_PERIOD)
+            if self.RETAIN_DAYS is not None or self.MAX_ROWS is not None:
+                apply_retention(self.RETAIN_DAYS, self.MAX_ROWS)
+        except Exception as e:
+            print(f"Error maintaining the database: {e}")
+        finally:
+            close_connection()
+
+    def __build_filter(self, theDirectory):
+        """
+        Builds the path filter for one watched directory.
+
+        Args:
+            theDirectory: The directory that anchored patterns are relative to.
+
+        Returns:
+            PathFilter: Filter with the current include patterns and exclusions.
+        """
+        return PathFilter(PathFilter.parse_patterns(self.__myFileExtension),
+                          PathFilter.parse_patterns(self.__myExcludePatterns),
+                          theRoot=theDirectory)
+
     def open_directory(self):
         """
-        Opens a directory selection box and sets the watch directory.
+        Opens a directory selection box and adds the directory to the watch list.
 
-        Also, updates the view to display the selected directory path.
+        The directory is watched right away if watching is active, and the
+        view is updated to display the watched directories.
         """
         directory = filedialog.askdirectory()
-        if directory:
-            self.__myWatchDirectory = directory
-            self.__myView.update_directory_display(directory)
-            print(f"Selected directory: {directory}")
+        if directory and directory not in self.__myWatchDirectories:
+            self.__myWatchDirectories.append(directory)
+            if self.__myWatcher:
+                self.__myWatcher.add_root(directory, theFilter=self.__build_filter(directory))
+            self.__myView.update_directory_display(self.__myWatchDirectories)
+            print(f"Added directory: {directory}")
+
+    def remove_directory(self, theDirectory):
+        """
+        Removes a directory from the watch list, unwatching it if watching is active.
+
+        Args:
+            theDirectory: The directory to stop watching.
+        """
+        if theDirectory in self.__myWatchDirectories:
+            self.__myWatchDirectories.remove(theDirectory)
+            if self.__myWatcher:
+                self.__myWatcher.remove_root(theDirectory)
+            self.__myView.update_directory_display(self.__myWatchDirectories)
+            print(f"Removed directory: {theDirectory}")
     
     def set_file_extension(self, theExtension):
         """
         Sets the file extension filter for monitoring.
 
         Args:
-            theExtension (str): The file extension to filter for ('.txt', '.png', etc.).
+            theExtension (str): The file extension to filter for ('.txt', '.png', etc.),
+                or a comma separated list of extensions and glob patterns.
         """
         self.__myFileExtension = theExtension
         print(f"Selected extension filter: {theExtension}")
-        print(self.__myWatchDirectory)
         
+    def set_exclude_patterns(self, thePatterns):
+        """
+        Sets the gitignore-style exclusions for monitoring.
+
+        Args:
+            thePatterns (str): Comma or space separated patterns ('node_modules/, .git/, *.log').
+        """
+        self.__myExcludePatterns = thePatterns
+        print(f"Excluded patterns: {thePatterns}")
+
     def open_query_window(self):
         """
         Open the database query window.
@@ -103,6 +211,7 @@ class WatcherController:
         Creates a new QueryWindow instance or focuses an existing one.
         Handles window management and ensures only one query window is open.
         """
+        from view.query_window import QueryWindow
         try:
             if hasattr(self, '__query_window') and self.__query_window is not None:
                 self.__query_window.focus()
@@ -125,6 +234,56 @@ class WatcherController:
         """
         return query_events(theFilters)
 
+    def get_event_page(self, theFilters, thePageToken=None):
+        """
+        Gets one page of filtered events from the database.
+
+        Args:
+            theFilters: Filters for the query.
+            thePageToken: Token of the page to load, None for the first page.
+
+        Returns:
+            tuple: (rows, next_token, prev_token) as returned by fetch_event_page.
+        """
+        return fetch_event_page(theFilters, thePageToken)
+
+    def submit_query(self, theFunction, *theArgs):
+        """
+        Run a query function on the background query pool.
+
+        The query supersedes, and interrupts, every query submitted before it.
+
+        Args:
+            theFunction: Function performing the query.
+            *theArgs: Arguments for theFunction.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's result.
+        """
+        if self.__myQueryRunner is None:
+            from model.query_runner import QueryRunner
+            self.__myQueryRunner = QueryRunner()
+        return self.__myQueryRunner.submit(theFunction, *theArgs)
+
+    def is_current_query(self, theFuture):
+        """
+        Check whether a query is still the latest one submitted.
+
+        Args:
+            theFuture: A future returned by submit_query.
+
+        Returns:
+            bool: True if no later query was submitted or cancelled.
+        """
+        return self.__myQueryRunner is not None and self.__myQueryRunner.is_current(theFuture)
+
+    def cancel_queries(self):
+        """
+        Cancel every query submitted to the background query pool.
+        """
+        if self.__myQueryRunner is not None:
+            self.__myQueryRunner.cancel()
+
     def reset_database(self):
         """
         Resets the database.
@@ -149,6 +308,7 @@ class WatcherController:
         Returns:
             bool: True if email was sent successfully, False otherwise.
         """
+        from model.email_sender import send_email_with_attachment
         return send_email_with_attachment(recipient, thePath)
 
     def get_available_extensions(self):
@@ -161,18 +321,18 @@ class WatcherController:
         from model.db_handler import get_unique_extensions
         return get_unique_extensions()
 
-    def save_events_to_database(self, theEvents):
+    def flush_events(self):
         """
-        Saves multiple events to the database.
+        Waits until every event captured so far has been written to the database.
         
-        Args:
-            theEvents: List of event objects to save.
-            
         Returns:
-            bool: True if events were saved successfully, False otherwise.
+            bool: True once pending events are persisted.
         """
-        from model.db_handler import save_multiple_events
-        return save_multiple_events(theEvents)
+        if self.__myHandler:
+            self.__myHandler.flush()
+        if self.__myEventWriter:
+            self.__myEventWriter.flush()
+        return True
 
     def format_event(self, theEvent):
         """
@@ -200,16 +360,51 @@ class WatcherController:
         from model.email_sender import validate_email
         return validate_email(theEmail)
 
-    def export_to_csv(self, thePath, theEvents):
+    def get_export_filetypes(self):
+        """
+        Gets the file types that events can be exported to.
+        
+        Returns:
+            list: (description, pattern) pairs for a file dialog, CSV first.
+                The columnar format is listed only if pyarrow or numpy is installed.
+        """
+        from model.exporters import columnar_format
+        filetypes = [("CSV files", "*.csv"), ("Compressed CSV files", "*.csv.gz"),
+                     ("JSON Lines files", "*.jsonl")]
+        columnar = columnar_format()
+        if columnar:
+            filetypes.append({'parquet': ("Parquet files", "*.parquet"),
+                              'npz': ("NumPy archives", "*.npz")}[columnar])
+        return filetypes
+
+    def get_missing_export_dependency(self, thePath):
         """
-        Export events to a CSV file.
+        Gets the optional package needed to export to a file but not installed.
         
         Args:
-            thePath: File path where the CSV should be saved.
-            theEvents: List of events to export.
+            thePath: File path to export to.
+            
+        Returns:
+            str: Name of the missing package, or None if the export can run.
+        """
+        from model.exporters import format_for_path, missing_dependency
+        return missing_dependency(format_for_path(thePath))
+
+    def start_export(self, thePath, theFilters):
+        """
+        Start exporting the filtered events to a file in the background.
+        
+        The format is picked from the file extension: CSV by default,
+        JSON Lines for '.jsonl', Parquet for '.parquet' and NumPy for '.npz'.
+        
+        Args:
+            thePath: File path to export to, gzip-compressed if it ends with '.gz'.
+            theFilters: Filters for the query.
             
         Returns:
-            bool: True if export was successful, False otherwise.
+            ExportJob: The running export.
         """
-        from model.db_handler import export_events_to_csv
-        return export_events_to_csv(thePath, theEvents)
+        from model.exporters import ExportJob, format_for_path
+        job = ExportJob(thePath, theFilters, format_for_path(thePath))
+        job.start()
+        return job
@@ -0,0 +1,189 @@
+import threading
+import time
+from watchdog.events import (
+    EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED,
+    DirCreatedEvent, DirModifiedEvent, FileCreatedEvent, FileModifiedEvent
+)
+
+COALESCED_TYPES = (EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, EVENT_TYPE_DELETED, EVENT_TYPE_MOVED)
+
+class EventCoalescer:
+    """
+    Collapses bursts of events for the same path within a time window.
+
+    Created, modified, deleted and moved events are held per path for the
+    window and merged as they arrive, so that for example many modifies
+    become one modify, a create followed by a delete disappears entirely
+    and a file created then renamed is a single create at its final path.
+    Other event types are passed straight through.
+
+    Each event carries the timestamp it was observed at. A merged event
+    keeps the timestamp of whichever event it was taken from, and events
+    synthesized by a merge take the timestamp of the newest event.
+
+    Attributes:
+        __mySink: Function called with (event, timestamp) for each event that survives coalescing.
+        __myWindow: Seconds an event is held for merging.
+        __myPending: Held [event, deadline, timestamp] entries keyed by
+            (path, is_directory), in arrival order.
+        __myCondition: Guards __myPending and wakes the flush thread.
+        __myThread: The flush thread, None when not running.
+        __myRunning: Whether the flush thread should keep running.
+    """
+
+    def __init__(self, theSink, theWindow=0.1):
+        """
+        Initialize the coalescer.
+
+        Args:
+            theSink: Function called with (event, timestamp) for each emitted event.
+            theWindow: Seconds events for a path are held and merged. Defaults to 0.1.
+        """
+        self.__mySink = theSink
+        self.__myWindow = theWindow
+        self.__myPending = {}
+        self.__myCondition = threading.Condition()
+        self.__myThread = None
+        self.__myRunning = False
+
+    def start(self):
+        """
+        Start the flush thread.
+        """
+        with self.__myCondition:
+            if self.__myRunning:
+                return
+            self.__myRunning = True
+        self.__myThread = threading.Thread(target=self.__run, name='EventCoalescer', daemon=True)
+        self.__myThread.start()
+
+    def stop(self):
+        """
+        Stop the flush thread and emit every event still held.
+
+        Note:
+            It's safe to call this method even if the coalescer is not running.
+        """
+        with self.__myCondition:
+            self.__myRunning = False
+            self.__myCondition.notify()
+        if self.__myThread:
+            self.__myThread.join()
+            self.__myThread = None
+        self.flush()
+
+    def add(self, theEvent, theTimestamp=None):
+        """
+        Hold an event for merging with later events for the same path.
+
+        Args:
+            theEvent: The watchdog file system event.
+            theTimestamp: Epoch nanoseconds at which the event was observed.
+                Defaults to None (the current time).
+        """
+        timestamp = theTimestamp or time.time_ns()
+        if theEvent.event_type not in COALESCED_TYPES:
+            self.__mySink(theEvent, timestamp)
+            return
+
+        key = (theEvent.src_path, theEvent.is_directory)
+        with self.__myCondition:
+            held = self.__myPending.get(key)
+            if theEvent.event_type == EVENT_TYPE_MOVED and held is not None \
+                    and held[0].event_type == EVENT_TYPE_CREATED:
+                # A new file renamed within the window is just created at its destination
+                del self.__myPending[key]
+                event_class = DirCreatedEvent if theEvent.is_directory else FileCreatedEvent
+                theEvent = event_class(theEvent.dest_path)
+                key = (theEvent.src_path, theEvent.is_directory)
+                held = self.__myPending.get(key)
+            released = None
+            if held is not None and held[0].event_type == EVENT_TYPE_MOVED \
+                    and theEvent.event_type != EVENT_TYPE_MOVED:
+                # Later events at a renamed path belong to a new file; emit the rename first
+                released = self.__myPending.pop(key)
+                held = None
+            if held is None:
+                self.__myPending[key] = [theEvent, time.monotonic() + self.__myWindow, timestamp]
+                self.__myCondition.notify()
+            else:
+                merged = self._merge(held[0], theEvent)
+                if merged is None:
+                    del self.__myPending[key]
+                else:
+                    if merged is not held[0]:
+                        held[2] = timestamp
+                    held[0] = merged
+        if released is not None:
+            self.__mySink(released[0], released[2])
+
+    def flush(self):
+        """
+        Emit every held event immediately.
+        """
+        with self.__myCondition:
+            events = list(self.__myPending.values())
+            self.__myPending.clear()
+        for event, _, timestamp in events:
+            self.__mySink(event, timestamp)
+
+    def pending(self):
+        """
+        Gets the number of paths with a held event.
+
+        Returns:
+            int: Number of held events.
+        """
+        with self.__myCondition:
+            return len(self.__myPending)
+
+    @staticmethod
+    def _merge(theHeld, theNew):
+        """
+        Merge a new event into the one held for the same path.
+
+        Args:
+            theHeld: The event currently held.
+            theNew: The event that just arrived.
+
+        Returns:
+            The event to keep holding, or None if the two cancel out.
+        """
+        held, new = theHeld.event_type, theNew.event_type
+        if new == EVENT_TYPE_MOVED:
+            # The rename supersedes earlier changes to the source path
+            return theNew
+        if held == EVENT_TYPE_CREATED:
+            # Created then deleted never existed; created then modified is still new
+            return None if new == EVENT_TYPE_DELETED else theHeld
+        if held == EVENT_TYPE_DELETED and new != EVENT_TYPE_DELETED:
+            # Deleted then recreated is a replacement of the existing path
+            event_class = DirModifiedEvent if theNew.is_directory else FileModifiedEvent
+            return event_class(theNew.src_path)
+        if new == EVENT_TYPE_DELETED:
+            return theNew
+        return theHeld
+
+    def __run(self):
+        """
+        Flush thread loop. Emits held events once their window has elapsed.
+        """
+        while True:
+            with self.__myCondition:
+                while self.__myRunning:
+                    due = next(iter(self.__myPending.values()), None)
+                    timeout = None if due is None else due[1] - time.monotonic()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self.__myCondition.wait(timeout)
+                if not self.__myRunning:
+                    return
+                now = time.monotonic()
+                expired = []
+                for key, held in self.__myPending.items():
+                    if held[1] > now:
+                        break
+                    expired.append(key)
+                events = [self.__myPending.pop(key) for key in expired]
+            for event, _, timestamp in events:
+                self.__mySink(event, timestamp)
@@ -1,8 +1,214 @@
 import sqlite3
+import threading
+
+DATABASE_PATH = 'database.db'
+
+class ConnectionManager:
+    """
+    Hands out one persistent SQLite connection per thread.
+    
+    Connections are opened lazily on first use in a thread, tuned with
+    WAL journaling so readers do not block the writer, and kept open for
+    the lifetime of the thread instead of being reopened per statement.
+    The first connection also upgrades the schema to the latest version.
+    
+    Attributes:
+        __myPath: Path of the SQLite database file.
+        __myCacheSizeKb: Page cache size per connection in KiB.
+        __myMmapSize: Bytes of the database file to memory-map.
+        __myStatementCacheSize: Number of prepared statements cached per connection.
+        __myLocal: Thread-local storage holding each thread's connection.
+        __myConnections: Every open connection, so they can be closed together.
+        __myLock: Guards __myConnections and __myMigrated.
+        __myMigrated: Whether the schema migrations have been applied.
+    """
+
+    def __init__(self, thePath=DATABASE_PATH, theCacheSizeKb=16384,
+                 theMmapSize=268435456, theStatementCacheSize=256):
+        """
+        Initialize the connection manager.
+        
+        Args:
+            thePath: Path of the SQLite database file. Defaults to 'database.db'.
+            theCacheSizeKb: Page cache size in KiB. Defaults to 16 MiB.
+            theMmapSize: Bytes to memory-map. Defaults to 256 MiB.
+            theStatementCacheSize: Prepared statements cached per connection.
+                Defaults to 256.
+        """
+        self.__myPath = thePath
+        self.__myCacheSizeKb = theCacheSizeKb
+        self.__myMmapSize = theMmapSize
+        self.__myStatementCacheSize = theStatementCacheSize
+        self.__myLocal = threading.local()
+        self.__myConnections = []
+        self.__myLock = threading.Lock()
+        self.__myMigrated = False
+
+    def get_path(self):
+        """
+        Gets the database file path.
+        
+        Returns:
+            str: Path of the SQLite database file.
+        """
+        return self.__myPath
+
+    def get_connection(self):
+        """
+        Returns the calling thread's connection, opening it on first use.
+        
+        Returns:
+            Database connection object.
+            
+        Raises:
+            sqlite3.Error: If the connection cannot be opened.
+        """
+        conn = getattr(self.__myLocal, 'connection', None)
+        if conn is not None:
+            return conn
+
+        conn = sqlite3.connect(self.__myPath,
+                               cached_statements=self.__myStatementCacheSize,
+                               check_same_thread=False)
+        try:
+            self.__apply_pragmas(conn)
+            with self.__myLock:
+                if not self.__myMigrated:
+                    _migrate(conn)
+                    self.__myMigrated = True
+                self.__myConnections.append(conn)
+        except sqlite3.Error:
+            conn.close()
+            raise
+        self.__myLocal.connection = conn
+        return conn
+
+    def __apply_pragmas(self, theConnection):
+        """
+        Tunes a freshly opened connection.
+        
+        Args:
+            theConnection: The connection to configure.
+        """
+        theConnection.execute('PRAGMA journal_mode=WAL')
+        theConnection.execute('PRAGMA synchronous=NORMAL')
+        theConnection.execute(f'PRAGMA cache_size=-{int(self.__myCacheSizeKb)}')
+        theConnection.execute(f'PRAGMA mmap_size={int(self.__myMmapSize)}')
+        theConnection.execute('PRAGMA temp_store=MEMORY')
+
+    def close_connection(self):
+        """
+        Closes the calling thread's connection if it has one.
+        """
+        conn = getattr(self.__myLocal, 'connection', None)
+        if conn is None:
+            return
+        self.__myLocal.connection = None
+        with self.__myLock:
+            if conn in self.__myConnections:
+                self.__myConnections.remove(conn)
+        conn.close()
+
+    def close_all(self):
+        """
+        Closes every connection opened by this manager.
+        
+        Note:
+            Threads that keep running will transparently reopen a connection
+            on their next call to get_connection().
+        """
+        with self.__myLock:
+            connections = self.__myConnections
+            self.__myConnections = []
+        self.__myLocal = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+class DataGeneration:
+    """
+    Counts changes to the database so cached query results can be invalidated.
+    
+    Writes made by this process bump the counter directly. Commits made by
+    any other connection, including other processes, are noticed through
+    PRAGMA data_version on the reading thread's connection, once that
+    connection has recorded the version it started from.
+    
+    Attributes:
+        __myLock: Guards __myValue.
+        __myValue: The current generation.
+        __myLocal: Per-thread (connection, data_version) last seen.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the counter.
+        """
+        self.__myLock = threading.Lock()
+        self.__myValue = 0
+        self.__myLocal = threading.local()
+    
+    def bump(self):
+        """
+        Record that the database changed.
+        """
+        with self.__myLock:
+            self.__myValue += 1
+    
+    def get(self, theConnection=None):
+        """
+        Gets the current generation, first checking for changes committed elsewhere.
+        
+        Args:
+            theConnection: The calling thread's connection. Defaults to None
+                (only writes reported by bump() are considered).
+        
+        Returns:
+            int: A number that changes whenever the data may have changed.
+        """
+        if theConnection is not None:
+            version = theConnection.execute('PRAGMA data_version').fetchone()
+            seen = getattr(self.__myLocal, 'seen', None)
+            # The first check of a connection only records its version, so
+            # opening a connection does not invalidate every cached result
+            if seen is None or seen[0] is not theConnection:
+                self.__myLocal.seen = (theConnection, version)
+            elif seen[1] != version:
+                self.__myLocal.seen = (theConnection, version)
+                self.bump()
+        return self.__myValue
+
+__myManager = ConnectionManager()
+__myGeneration = DataGeneration()
+
+def configure_database(thePath=DATABASE_PATH, theCacheSizeKb=16384,
+                       theMmapSize=268435456, theStatementCacheSize=256):
+    """
+    Replaces the connection manager with one using the given settings.
+    
+    Existing connections are closed; callers reconnect on their next query.
+    
+    Args:
+        thePath: Path of the SQLite database file. Defaults to 'database.db'.
+        theCacheSizeKb: Page cache size in KiB. Defaults to 16 MiB.
+        theMmapSize: Bytes to memory-map. Defaults to 256 MiB.
+        theStatementCacheSize: Prepared statements cached per connection.
+            Defaults to 256.
+    """
+    global __myManager
+    __myManager.close_all()
+    __myManager = ConnectionManager(thePath, theCacheSizeKb, theMmapSize,
+                                    theStatementCacheSize)
+    __myGeneration.bump()
 
 def get_connection():
     """
-    Establish and return a connection to the SQLite database.
+    Return the calling thread's pooled connection to the SQLite database.
+    
+    The connection stays open between calls, so `with get_connection() as conn`
+    only scopes a transaction and never closes it.
     
     Returns:
         Database connection object if successful, None if connection failed.
@@ -11,16 +217,56 @@ def get_connection():
         sqlite3.Error: If there's an error connecting to the database.
     """
     try:
-        return sqlite3.connect('database.db')
+        return __myManager.get_connection()
     except sqlite3.Error as e:
         print(f"An error occurred while connecting to the database: {e}")
         return None
 
-def _init_db():
+def get_database_path():
     """
-    Initialize the database.
+    Gets the path of the configured database file.
     
-    Creates the 'events' table with the following schema:
+    Returns:
+        str: Path of the SQLite database file.
+    """
+    return __myManager.get_path()
+
+def notify_data_changed():
+    """
+    Invalidate cached query results after this process changed the database.
+    """
+    __myGeneration.bump()
+
+def get_data_generation(theConnection=None):
+    """
+    Gets a number that changes whenever the database contents may have changed.
+    
+    Args:
+        theConnection: The calling thread's connection, used to notice
+            commits made by other connections. Defaults to None.
+    
+    Returns:
+        int: The current data generation.
+    """
+    return __myGeneration.get(theConnection)
+
+def close_connection():
+    """
+    Close the calling thread's pooled connection.
+    
+    Worker threads call this before exiting so their connection is released.
+    """
+    __myManager.close_connection()
+
+def close_all_connections():
+    """
+    Close every pooled connection.
+    """
+    __myManager.close_all()
+
+def _create_events_table(theConnection):
+    """
+    Migration 1: creates the 'events' table with the following schema:
     - id: Primary key (auto-increment)
     - filename: Name of the file (TEXT, NOT NULL)
     - file_path: Full path to the file (TEXT, NOT NULL) 
@@ -30,23 +276,576 @@ def _init_db():
     - file_size: Size of the file in bytes (INTEGER)
     - user: User who triggered the event (TEXT)
     
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_extension TEXT NOT NULL,
+            event TEXT NOT NULL,
+            event_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            file_size INTEGER,
+            user TEXT
+        )
+    ''')
+
+def _add_query_indexes(theConnection):
+    """
+    Migration 2: adds indexes backing the filters and ordering used by queries.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute(
+        'CREATE INDEX IF NOT EXISTS idx_events_timestamp '
+        'ON events (event_timestamp)')
+    theConnection.execute(
+        'CREATE INDEX IF NOT EXISTS idx_events_event_timestamp '
+        'ON events (event, event_timestamp)')
+    theConnection.execute(
+        'CREATE INDEX IF NOT EXISTS idx_events_extension_timestamp '
+        'ON events (file_extension, event_timestamp)')
+
+def _add_dest_path(theConnection):
+    """
+    Migration 3: adds the dest_path column holding the destination of moves.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('ALTER TABLE events ADD COLUMN dest_path TEXT')
+
+def _store_timestamps_as_ns(theConnection):
+    """
+    Migration 4: stores event_timestamp as INTEGER epoch nanoseconds.
+    
+    SQLite cannot change a column's type in place, so the table is rebuilt.
+    Existing local-time TEXT timestamps are converted to UTC epoch
+    nanoseconds, and the indexes are recreated on the new table. Rows
+    inserted without a timestamp default to the current time with
+    millisecond resolution.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE events_ns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_extension TEXT NOT NULL,
+            event TEXT NOT NULL,
+            event_timestamp INTEGER NOT NULL
+                DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER) * 1000000),
+            file_size INTEGER,
+            user TEXT,
+            dest_path TEXT
+        )
+    ''')
+    theConnection.execute('''
+        INSERT INTO events_ns
+        SELECT id, filename, file_path, file_extension, event,
+               CASE typeof(event_timestamp)
+                   WHEN 'integer' THEN event_timestamp
+                   ELSE COALESCE(CAST(strftime('%s', event_timestamp, 'utc') AS INTEGER), 0) * 1000000000
+               END,
+               file_size, user, dest_path
+        FROM events
+    ''')
+    theConnection.execute('DROP TABLE events')
+    theConnection.execute('ALTER TABLE events_ns RENAME TO events')
+    _add_query_indexes(theConnection)
+
+def _directory_sql(theColumn):
+    """
+    Builds the SQL expression for the directory part of a path column.
+    
+    Args:
+        theColumn: SQL expression of the path.
+    
+    Returns:
+        str: Expression for everything before the path's last separator.
+    """
+    separators = f"replace(replace({theColumn}, '/', ''), '\\', '')"
+    return f"rtrim(rtrim({theColumn}, {separators}), '/\\')"
+
+# Hourly rollup upserts, run as part of every insert so the counts are
+# always in step with the events
+ROLLUP_TRIGGER = f'''
+    CREATE TRIGGER events_rollup AFTER INSERT ON events
+    BEGIN
+        INSERT INTO event_rollups (hour, event, file_extension, directory, count)
+        VALUES (NEW.event_timestamp / 3600000000000 * 3600000000000, NEW.event,
+                NEW.file_extension, {_directory_sql('NEW.file_path')}, 1)
+        ON CONFLICT (hour, event, file_extension, directory) DO UPDATE SET count = count + 1;
+    END
+'''
+
+COMPACT_ROLLUP_TRIGGER = f'''
+    CREATE TRIGGER event_rows_rollup AFTER INSERT ON event_rows
+    BEGIN
+        INSERT INTO event_rollups (hour, event, file_extension, directory, count)
+        SELECT NEW.event_timestamp / 3600000000000 * 3600000000000, t.name,
+               p.file_extension, {_directory_sql('p.path')}, 1
+        FROM paths p, event_types t
+        WHERE p.id = NEW.path_id AND t.id = NEW.event_type_id
+        ON CONFLICT (hour, event, file_extension, directory) DO UPDATE SET count = count + 1;
+    END
+'''
+
+def _add_event_rollups(theConnection):
+    """
+    Migration 5: adds event_rollups, hourly event counts kept up to date on insert.
+    
+    Existing events are counted once, then a trigger counts every new
+    event in the transaction that inserts it. Rollups are not decremented
+    when events are deleted, so trends outlive retention.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE event_rollups (
+            hour INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            file_extension TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (hour, event, file_extension, directory)
+        ) WITHOUT ROWID
+    ''')
+    theConnection.execute(f'''
+        INSERT INTO event_rollups (hour, event, file_extension, directory, count)
+        SELECT event_timestamp / 3600000000000 * 3600000000000, event, file_extension,
+               {_directory_sql('file_path')}, COUNT(*)
+        FROM events GROUP BY 1, 2, 3, 4
+    ''')
+    if is_compact_schema(theConnection):
+        theConnection.execute(COMPACT_ROLLUP_TRIGGER)
+    else:
+        theConnection.execute(ROLLUP_TRIGGER)
+
+# Paths are interned into search_paths as events are inserted, and the
+# trigram index over them answers substring searches without scanning
+SEARCH_TRIGGER = '''
+    CREATE TRIGGER events_search AFTER INSERT ON events
+    BEGIN
+        INSERT OR IGNORE INTO search_paths (path) VALUES (NEW.file_path);
+    END
+'''
+
+COMPACT_SEARCH_TRIGGER = '''
+    CREATE TRIGGER paths_search AFTER INSERT ON paths
+    BEGIN
+        INSERT OR IGNORE INTO search_paths (path) VALUES (NEW.path);
+    END
+'''
+
+def _add_path_search(theConnection):
+    """
+    Migration 6: adds search_paths, every distinct event path, with a trigram index.
+    
+    The trigram index is an FTS5 table kept in step with search_paths by a
+    trigger. Builds of SQLite without FTS5 trigram support still get
+    search_paths, which is then searched with LIKE.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE search_paths (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE)
+    ''')
+    try:
+        theConnection.execute('''
+            CREATE VIRTUAL TABLE path_search USING fts5(
+                path, content='search_paths', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Path search falls back to LIKE scans: {e}")
+    else:
+        theConnection.execute('''
+            CREATE TRIGGER search_paths_index AFTER INSERT ON search_paths
+            BEGIN
+                INSERT INTO path_search (rowid, path) VALUES (NEW.id, NEW.path);
+            END
+        ''')
+    theConnection.execute('INSERT OR IGNORE INTO search_paths (path) SELECT DISTINCT file_path FROM events')
+    if is_compact_schema(theConnection):
+        theConnection.execute(COMPACT_SEARCH_TRIGGER)
+    else:
+        theConnection.execute('CREATE INDEX idx_events_path ON events (file_path)')
+        theConnection.execute(SEARCH_TRIGGER)
+
+# Per-extension event counts, kept in step with inserts and deletes
+CATALOG_TRIGGERS = [
+    '''
+    CREATE TRIGGER events_catalog_insert AFTER INSERT ON events
+    BEGIN
+        INSERT INTO extension_catalog (file_extension, count) VALUES (NEW.file_extension, 1)
+        ON CONFLICT (file_extension) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER events_catalog_delete AFTER DELETE ON events
+    BEGIN
+        UPDATE extension_catalog SET count = count - 1 WHERE file_extension = OLD.file_extension;
+        DELETE FROM extension_catalog WHERE file_extension = OLD.file_extension AND count <= 0;
+    END
+    ''',
+]
+
+COMPACT_CATALOG_TRIGGERS = [
+    '''
+    CREATE TRIGGER event_rows_catalog_insert AFTER INSERT ON event_rows
+    BEGIN
+        INSERT INTO extension_catalog (file_extension, count)
+        SELECT file_extension, 1 FROM paths WHERE id = NEW.path_id
+        ON CONFLICT (file_extension) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER event_rows_catalog_delete AFTER DELETE ON event_rows
+    BEGIN
+        UPDATE extension_catalog SET count = count - 1
+        WHERE file_extension = (SELECT file_extension FROM paths WHERE id = OLD.path_id);
+        DELETE FROM extension_catalog
+        WHERE file_extension = (SELECT file_extension FROM paths WHERE id = OLD.path_id)
+          AND count <= 0;
+    END
+    ''',
+]
+
+def _add_extension_catalog(theConnection):
+    """
+    Migration 7: adds extension_catalog, the number of events per file extension.
+    
+    Triggers keep it in step with every insert and delete, so listing the
+    extensions reads a handful of rows instead of scanning the events.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE extension_catalog (
+            file_extension TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    theConnection.execute('''
+        INSERT INTO extension_catalog (file_extension, count)
+        SELECT file_extension, COUNT(*) FROM events GROUP BY file_extension
+    ''')
+    triggers = COMPACT_CATALOG_TRIGGERS if is_compact_schema(theConnection) else CATALOG_TRIGGERS
+    for statement in triggers:
+        theConnection.execute(statement)
+
+def _add_snapshots(theConnection):
+    """
+    Migration 8: adds the directory snapshots used to find offline changes.
+    
+    snapshot_roots records which watched roots have a snapshot, and
+    snapshot_files the size, modification time and inode of every file
+    below them, keyed by the path relative to the root.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE snapshot_roots (
+            root TEXT PRIMARY KEY,
+            scanned_at INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    theConnection.execute('''
+        CREATE TABLE snapshot_files (
+            root TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            PRIMARY KEY (root, path)
+        ) WITHOUT ROWID
+    ''')
+
+def _add_partition_extensions(theConnection):
+    """
+    Migration 9: adds partition_extensions, the number of events per file
+    extension across every partition.
+    
+    Rolling, trimming and dropping partitions keep it up to date, so
+    listing the extensions never opens the partition files. It is filled
+    from the partitions that already exist.
+    
+    Args:
+        theConnection: Connection inside the migration transaction.
+    """
+    theConnection.execute('''
+        CREATE TABLE partition_extensions (
+            file_extension TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    path = theConnection.execute('PRAGMA database_list').fetchone()[2]
+    if path:
+        # Imported here since partitions depends on this module
+        from .partitions import count_partition_extensions
+        theConnection.executemany(
+            'INSERT INTO partition_extensions (file_extension, count) VALUES (?, ?)',
+            count_partition_extensions(f"{path}.partitions").items())
+
+# Ordered schema migrations. Applying MIGRATIONS[i] brings a database
+# to PRAGMA user_version i + 1. Only ever append to this list.
+MIGRATIONS = [
+    _create_events_table,
+    _add_query_indexes,
+    _add_dest_path,
+    _store_timestamps_as_ns,
+    _add_event_rollups,
+    _add_path_search,
+    _add_extension_catalog,
+    _add_snapshots,
+    _add_partition_extensions,
+]
+
+def _migrate(theConnection):
+    """
+    Upgrade a database in place to the latest schema version.
+    
+    Each pending migration runs in its own transaction together with the
+    PRAGMA user_version bump, so an interrupted upgrade resumes cleanly.
+    
+    Args:
+        theConnection: The connection to upgrade.
+    
+    Returns:
+        int: The schema version after migrating.
+    """
+    version = theConnection.execute('PRAGMA user_version').fetchone()[0]
+    while version < len(MIGRATIONS):
+        theConnection.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have migrated while we waited for the lock
+            version = theConnection.execute('PRAGMA user_version').fetchone()[0]
+            if version < len(MIGRATIONS):
+                MIGRATIONS[version](theConnection)
+                version += 1
+                theConnection.execute(f'PRAGMA user_version = {version}')
+            theConnection.commit()
+        except Exception:
+            theConnection.rollback()
+            raise
+    return version
+
+# Compact layout: each distinct path, event type and user is stored once
+# and event_rows refers to them by integer id. The events view joins them
+# back into the row layout, so every query keeps working unchanged, and
+# its triggers intern new values on insert.
+COMPACT_TABLES = [
+    '''
+    CREATE TABLE paths (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        filename TEXT,
+        file_extension TEXT
+    )
+    ''',
+    'CREATE TABLE event_types (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+    'CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)',
+    '''
+    CREATE TABLE event_rows (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path_id INTEGER NOT NULL REFERENCES paths (id),
+        event_type_id INTEGER NOT NULL REFERENCES event_types (id),
+        event_timestamp INTEGER NOT NULL,
+        file_size INTEGER,
+        user_id INTEGER REFERENCES users (id),
+        dest_path_id INTEGER REFERENCES paths (id)
+    )
+    ''',
+]
+
+COMPACT_VIEW = [
+    '''
+    CREATE VIEW events (
+        id, filename, file_path, file_extension, event,
+        event_timestamp, file_size, user, dest_path
+    ) AS
+    SELECT r.id, p.filename, p.path, p.file_extension, t.name,
+           r.event_timestamp, r.file_size, u.name, d.path
+    FROM event_rows r
+    JOIN paths p ON p.id = r.path_id
+    JOIN event_types t ON t.id = r.event_type_id
+    LEFT JOIN users u ON u.id = r.user_id
+    LEFT JOIN paths d ON d.id = r.dest_path_id
+    ''',
+    '''
+    CREATE TRIGGER events_insert INSTEAD OF INSERT ON events
+    BEGIN
+        INSERT INTO paths (path, filename, file_extension)
+        VALUES (NEW.file_path, NEW.filename, NEW.file_extension)
+        ON CONFLICT (path) DO UPDATE SET
+            filename = excluded.filename, file_extension = excluded.file_extension
+        WHERE paths.filename IS NULL;
+        INSERT OR IGNORE INTO paths (path) SELECT NEW.dest_path WHERE NEW.dest_path IS NOT NULL;
+        INSERT OR IGNORE INTO event_types (name) VALUES (NEW.event);
+        INSERT OR IGNORE INTO users (name) SELECT NEW.user WHERE NEW.user IS NOT NULL;
+        INSERT INTO event_rows (
+            id, path_id, event_type_id, event_timestamp, file_size, user_id, dest_path_id
+        )
+        VALUES (
+            NEW.id,
+            (SELECT id FROM paths WHERE path = NEW.file_path),
+            (SELECT id FROM event_types WHERE name = NEW.event),
+            COALESCE(NEW.event_timestamp,
+                     CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER) * 1000000),
+            NEW.file_size,
+            (SELECT id FROM users WHERE name = NEW.user),
+            (SELECT id FROM paths WHERE path = NEW.dest_path)
+        );
+    END
+    ''',
+    '''
+    CREATE TRIGGER events_delete INSTEAD OF DELETE ON events
+    BEGIN
+        DELETE FROM event_rows WHERE id = OLD.id;
+    END
+    ''',
+    'CREATE INDEX idx_event_rows_timestamp ON event_rows (event_timestamp)',
+    'CREATE INDEX idx_event_rows_type_timestamp ON event_rows (event_type_id, event_timestamp)',
+    'CREATE INDEX idx_event_rows_path ON event_rows (path_id)',
+    'CREATE INDEX idx_paths_extension ON paths (file_extension)',
+    COMPACT_ROLLUP_TRIGGER,
+    COMPACT_SEARCH_TRIGGER,
+] + COMPACT_CATALOG_TRIGGERS
+
+def is_compact_schema(theConnection):
+    """
+    Check whether a database uses the compact layout.
+    
+    Args:
+        theConnection: The connection to inspect.
+    
+    Returns:
+        bool: True if events is a view over the dictionary-encoded tables.
+    """
+    row = theConnection.execute(
+        "SELECT type FROM sqlite_master WHERE name = 'events'").fetchone()
+    return row is not None and row[0] == 'view'
+
+def _convert_to_compact(theConnection):
+    """
+    Move the rows of the events table into the compact layout.
+    
+    Runs in a single transaction, so a failed conversion leaves the
+    database untouched. Row ids are kept.
+    
+    Args:
+        theConnection: Connection to a database at the latest schema version.
+    """
+    theConnection.execute('BEGIN IMMEDIATE')
+    try:
+        for statement in COMPACT_TABLES:
+            theConnection.execute(statement)
+        theConnection.execute('''
+            INSERT INTO paths (path, filename, file_extension)
+            SELECT file_path, MAX(filename), MAX(file_extension) FROM events GROUP BY file_path
+        ''')
+        theConnection.execute('''
+            INSERT OR IGNORE INTO paths (path)
+            SELECT DISTINCT dest_path FROM events WHERE dest_path IS NOT NULL
+        ''')
+        theConnection.execute('INSERT INTO event_types (name) SELECT DISTINCT event FROM events')
+        theConnection.execute(
+            'INSERT INTO users (name) SELECT DISTINCT user FROM events WHERE user IS NOT NULL')
+        theConnection.execute('''
+            INSERT INTO event_rows (
+                id, path_id, event_type_id, event_timestamp, file_size, user_id, dest_path_id
+            )
+            SELECT e.id, p.id, t.id, e.event_timestamp, e.file_size, u.id, d.id
+            FROM events e
+            JOIN paths p ON p.path = e.file_path
+            JOIN event_types t ON t.name = e.event
+            LEFT JOIN users u ON u.name = e.user
+            LEFT JOIN paths d ON d.path = e.dest_path
+        ''')
+        theConnection.execute('DROP TABLE events')
+        for statement in COMPACT_VIEW:
+            theConnection.execute(statement)
+        theConnection.commit()
+    except Exception:
+        theConnection.rollback()
+        raise
+
+def enable_compact_schema(theVacuum=True):
+    """
+    Switch the database to the compact, dictionary-encoded layout.
+    
+    Existing events are converted in place. Queries keep working unchanged
+    because events becomes a view with the same columns.
+    
+    Args:
+        theVacuum: Whether to VACUUM afterwards so the file shrinks. Defaults to True.
+    
+    Returns:
+        bool: True if the database uses the compact layout, False if an error occurred.
+    """
+    with get_connection() as conn:
+        if conn is None:
+            return False
+        try:
+            if not is_compact_schema(conn):
+                _convert_to_compact(conn)
+                if theVacuum:
+                    conn.execute('VACUUM')
+            return True
+        except Exception as e:
+            print(f"Error converting to the compact schema: {e}")
+            return False
+
+def _drop_schema(theConnection):
+    """
+    Drop every table created by the migrations and reset the schema version.
+    
+    Args:
+        theConnection: The connection to clear.
+    
+    Returns:
+        bool: True if the dropped schema used the compact layout.
+    """
+    compact = is_compact_schema(theConnection)
+    if compact:
+        theConnection.execute('DROP VIEW events')
+        for table in ('event_rows', 'paths', 'event_types', 'users'):
+            theConnection.execute(f'DROP TABLE IF EXISTS {table}')
+    else:
+        theConnection.execute('DROP TABLE IF EXISTS events')
+    for table in ('event_rollups', 'path_search', 'search_paths', 'extension_catalog',
+                  'snapshot_roots', 'snapshot_files', 'partition_extensions'):
+        theConnection.execute(f'DROP TABLE IF EXISTS {table}')
+    theConnection.execute('PRAGMA user_version = 0')
+    return compact
+
+def _init_db(theCompact=False):
+    """
+    Initialize the database.
+    
+    Applies every pending migration in MIGRATIONS, creating the schema
+    for new files and upgrading existing database files in place.
+    
+    Args:
+        theCompact: Whether to convert the schema to the compact layout.
+            Defaults to False.
     """
     with get_connection() as conn:
         if conn is None:
             return
-        with conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    filename TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    file_extension TEXT NOT NULL,
-                    event TEXT NOT NULL,
-                    event_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    file_size INTEGER,
-                    user TEXT
-                )
-            ''')
+        _migrate(conn)
+        if theCompact and not is_compact_schema(conn):
+            _convert_to_compact(conn)
 
 if __name__ == "__main__":
     """
@@ -1,39 +1,174 @@
-import csv
+import heapq
+import json
 import os
-from datetime import datetime
-import getpass
-from .database import get_connection
+import time
+from datetime import datetime, timedelta
+from .database import get_connection, get_data_generation, notify_data_changed
+from .event_enricher import build_event_row
+from .partitions import (
+    drop_all_partitions, open_partitions, query_partitions
+)
+from .query_cache import QueryCache
 
+INSERT_EVENT_SQL = """
+    INSERT INTO events (
+        filename, file_path, file_extension, event,
+        event_timestamp, file_size, user, dest_path
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+NANOSECONDS = 1000000000
+HOUR_NS = 3600 * NANOSECONDS
+
+# Columns that get_events_per_hour can group the rollups by
+ROLLUP_GROUPS = ('event', 'file_extension', 'directory', None)
+
+# Most paths a path filter is resolved to before it is checked row by row instead
+PATH_MATCH_LIMIT = 1000
+
+# Rolling date ranges are cached per minute, so a cached 'Last 7 days'
+# result may reach back up to a minute further than a fresh one
+DATE_RANGE_BUCKET_NS = 60 * NANOSECONDS
+
+__myQueryCache = QueryCache()
+
+def format_timestamp(theTimestamp):
+    """
+    Formats a stored event timestamp as local time for display.
+    
+    Args:
+        theTimestamp: Epoch nanoseconds as stored in event_timestamp.
+    
+    Returns:
+        str: The timestamp as 'YYYY-MM-DD HH:MM:SS'.
+    """
+    if not isinstance(theTimestamp, int):
+        return theTimestamp
+    return datetime.fromtimestamp(theTimestamp / NANOSECONDS).strftime("%Y-%m-%d %H:%M:%S")
+
+def _date_range_start(theDateRange):
+    """
+    Computes the earliest timestamp included in a date range filter.
+    
+    Args:
+        theDateRange: 'Today', 'Last 7 days' or 'Last 30 days'.
+    
+    Returns:
+        int: Epoch nanoseconds of the start of the range, or None for
+            any other value.
+    """
+    now = datetime.now()
+    if theDateRange == 'Today':
+        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif theDateRange == 'Last 7 days':
+        start = now - timedelta(days=7)
+    elif theDateRange == 'Last 30 days':
+        start = now - timedelta(days=30)
+    else:
+        return None
+    return int(start.timestamp()) * NANOSECONDS
+
+def _to_timestamp(theValue):
+    """
+    Converts a filter bound to epoch nanoseconds.
+    
+    Args:
+        theValue: A naive local datetime, epoch nanoseconds, or None.
+    
+    Returns:
+        int: Epoch nanoseconds, or None if theValue is None.
+    """
+    if theValue is None or isinstance(theValue, int):
+        return theValue
+    return int(theValue.timestamp()) * NANOSECONDS + theValue.microsecond * 1000
+
+def _filter_values(theValue):
+    """
+    Normalizes an event type or extension filter to the values it selects.
+    
+    Args:
+        theValue: A single value, a list of values, 'All', or None.
+    
+    Returns:
+        tuple: The selected values, sorted, or an empty tuple if the
+            filter selects everything.
+    """
+    if not theValue:
+        return ()
+    values = (theValue,) if isinstance(theValue, str) else tuple(theValue)
+    if 'All' in values:
+        return ()
+    return tuple(sorted({value for value in values if value}))
+
+def _time_bounds(theFilters):
+    """
+    Computes the event timestamp range selected by a filter dictionary.
+    
+    Args:
+        theFilters: Dictionary of filter criteria as accepted by query_events,
+            or None for no filtering.
+    
+    Returns:
+        tuple: (start, end) in epoch nanoseconds, start inclusive and end
+            exclusive. Either is None when unbounded.
+    """
+    filters = theFilters or {}
+    starts = [bound for bound in (_date_range_start(filters.get('date_range')),
+                                  _to_timestamp(filters.get('start'))) if bound is not None]
+    return max(starts) if starts else None, _to_timestamp(filters.get('end'))
 
-def insert_event(theEvent, thePath):
+def insert_event(theEvent, thePath, theDestPath=None, theTimestamp=None):
     """
     Inserts a single event into the database.
     
     Args:
-        theEvent: The type of event ('created', 'modified', 'deleted').
+        theEvent: The type of event ('created', 'modified', 'deleted', 'moved').
         thePath: The file path where the event occurred.
+        theDestPath: Destination path of a move. Defaults to None.
+        theTimestamp: Epoch nanoseconds when the event was observed.
+            Defaults to None (the current time).
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    abs_path = os.path.abspath(thePath)
-    file_name = os.path.basename(abs_path)
-    file_extension = os.path.splitext(file_name)[1]
-    file_size = os.path.getsize(abs_path) if os.path.isfile(abs_path) else None
-    user = getpass.getuser()
+    timestamp = theTimestamp or time.time_ns()
+    row = build_event_row(theEvent, thePath, timestamp, theDestPath)
 
     with get_connection() as conn:
         if conn is None:
             return
         with conn:
-            conn.execute("""
-                INSERT INTO events (
-                    filename, file_path, file_extension, event,
-                    event_timestamp, file_size, user
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                file_name, abs_path, file_extension, theEvent,
-                timestamp, file_size, user
-            ))
+            conn.execute(INSERT_EVENT_SQL, row)
+        notify_data_changed()
+
+def insert_events(theEvents):
+    """
+    Inserts a batch of events into the database in a single transaction.
+    
+    Args:
+        theEvents: List of (event_type, path, dest_path, timestamp) tuples,
+            where dest_path is None for everything but moves and timestamp
+            is the epoch nanoseconds when the event was observed, or None
+            for the current time.
+    
+    Returns:
+        bool: True if the batch was written, False if an error occurred.
+    """
+    if not theEvents:
+        return True
+
+    try:
+        now = time.time_ns()
+        rows = [build_event_row(event_type, path, timestamp or now, dest_path)
+                for event_type, path, dest_path, timestamp in theEvents]
+        with get_connection() as conn:
+            if conn is None:
+                return False
+            with conn:
+                conn.executemany(INSERT_EVENT_SQL, rows)
+            notify_data_changed()
+            return True
+    except Exception as e:
+        print(f"Error writing event batch: {e}")
+        return False
 
 def delete_event(theEventId: int):
     """
@@ -47,6 +182,7 @@ def delete_event(theEventId: int):
             return
         with conn:
             conn.execute('DELETE FROM events WHERE id = ?', (theEventId,))
+        notify_data_changed()
 
 def reset_database():
     """
@@ -62,10 +198,12 @@ def reset_database():
         if conn is None:
             return False
         try:
-            cursor = conn.cursor()
-            cursor.execute('DROP TABLE IF EXISTS events')
-            from .database import _init_db
-            _init_db()
+            from .database import _drop_schema, _init_db
+            # Keep the compact layout if the database was using it
+            compact = _drop_schema(conn)
+            _init_db(compact)
+            drop_all_partitions()
+            notify_data_changed()
             return True
         except Exception as e:
             print(f"Error resetting database: {e}")
@@ -160,14 +298,12 @@ def fetch_event_by_after_date(theDateRange='All'):
             return []
         cursor = conn.cursor()
         
-        if theDateRange == 'All':
+        start = _date_range_start(theDateRange)
+        if start is None:
             cursor.execute('SELECT * FROM events ORDER BY event_timestamp DESC')
-        elif theDateRange == 'Today':
-            cursor.execute('SELECT * FROM events WHERE DATE(event_timestamp) = DATE("now") ORDER BY event_timestamp DESC')
-        elif theDateRange == 'Last 7 days':
-            cursor.execute('SELECT * FROM events WHERE event_timestamp >= datetime("now", "-7 days") ORDER BY event_timestamp DESC')
-        elif theDateRange == 'Last 30 days':
-            cursor.execute('SELECT * FROM events WHERE event_timestamp >= datetime("now", "-30 days") ORDER BY event_timestamp DESC')
+        else:
+            cursor.execute('SELECT * FROM events WHERE event_timestamp >= ? ORDER BY event_timestamp DESC',
+                           (start,))
         
         return cursor.fetchall()
 
@@ -183,7 +319,47 @@ def get_event_count():
             return 0
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM events')
-        return cursor.fetchone()[0]
+        count = cursor.fetchone()[0]
+        for rows in query_partitions('SELECT COUNT(*) FROM events'):
+            count += rows[0][0]
+        return count
+
+def get_events_per_hour(theDays=30, theGroupBy='event'):
+    """
+    Gets hourly event counts from the pre-aggregated rollups.
+    
+    Reads event_rollups, which is kept up to date as events are inserted,
+    so the cost depends on the number of hours and groups rather than the
+    number of events.
+    
+    Args:
+        theDays: Number of days back to include. Defaults to 30.
+        theGroupBy: 'event', 'file_extension', 'directory', or None for
+            a single total per hour. Defaults to 'event'.
+    
+    Returns:
+        list: (hour, group, count) tuples ordered by hour, where hour is the
+            epoch nanoseconds starting the hour and group is None when not grouping.
+    
+    Raises:
+        ValueError: If theGroupBy is not a rollup column.
+    """
+    if theGroupBy not in ROLLUP_GROUPS:
+        raise ValueError(f"Cannot group rollups by {theGroupBy}")
+    group = theGroupBy or 'NULL'
+    start = (time.time_ns() - theDays * 86400 * NANOSECONDS) // HOUR_NS * HOUR_NS
+    
+    with get_connection() as conn:
+        if conn is None:
+            return []
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT hour, {group}, SUM(count) FROM event_rollups
+            WHERE hour >= ?
+            GROUP BY hour, {group}
+            ORDER BY hour, {group}
+        ''', (start,))
+        return cursor.fetchall()
 
 def get_event_by_id(theEventId: int):
     """
@@ -202,72 +378,383 @@ def get_event_by_id(theEventId: int):
         cursor.execute('SELECT * FROM events WHERE id = ?', (theEventId,))
         return cursor.fetchone()
 
+def _like_pattern(theFragment):
+    """
+    Builds a LIKE pattern matching paths that contain a fragment.
+    
+    Args:
+        theFragment: Text to look for anywhere in the path.
+    
+    Returns:
+        str: The pattern, for use with ESCAPE '\\'.
+    """
+    escaped = theFragment.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def find_paths(theFragment, theLimit=None):
+    """
+    Finds every recorded path containing a fragment, ignoring case.
+    
+    Fragments of three or more characters are answered from the trigram
+    index over search_paths. Shorter fragments, and databases without the
+    index, fall back to a LIKE scan of the distinct paths, which is still
+    far smaller than the events table.
+    
+    Args:
+        theFragment: Text to look for anywhere in the path.
+        theLimit: Maximum number of paths to return. Defaults to None (no limit).
+    
+    Returns:
+        list: Matching paths.
+    """
+    with get_connection() as conn:
+        if conn is None:
+            return []
+        indexed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'path_search'").fetchone() is not None
+        if indexed and len(theFragment) >= 3:
+            # A quoted phrase matches the fragment literally
+            query = '''
+                SELECT path FROM search_paths WHERE id IN (
+                    SELECT rowid FROM path_search WHERE path_search MATCH ?
+                )
+            '''
+            params = ['"' + theFragment.replace('"', '""') + '"']
+        else:
+            query = "SELECT path FROM search_paths WHERE path LIKE ? ESCAPE '\\'"
+            params = [_like_pattern(theFragment)]
+        if theLimit is not None:
+            query += " LIMIT ?"
+            params.append(theLimit)
+        return [row[0] for row in conn.execute(query, params)]
+
+def _build_filter_clause(theFilters):
+    """
+    Builds the WHERE clause shared by the filtered event queries.
+    
+    Every predicate compares a bare column with parameters (equality, IN
+    lists and precomputed timestamp bounds), so SQLite can answer it from
+    the event, extension and timestamp indexes. A path filter matching at
+    most PATH_MATCH_LIMIT paths drives the query from the path index
+    instead: the other columns are written as +column so the planner
+    cannot pick their indexes and probe the path list for every row.
+    
+    Args:
+        theFilters: Dictionary of filter criteria as accepted by query_events,
+            or None for no filtering.
+    
+    Returns:
+        tuple: (sql, params) where sql starts with "WHERE 1=1".
+    """
+    query = "WHERE 1=1"
+    params = []
+    
+    if theFilters:
+        path_clause, path_params, prefix = '', [], ''
+        if theFilters.get('path'):
+            matches = find_paths(theFilters['path'], PATH_MATCH_LIMIT + 1)
+            if len(matches) <= PATH_MATCH_LIMIT:
+                # The matches are passed as one JSON array so the same clause
+                # also works against partitions, which have no search index
+                path_clause = " AND file_path IN (SELECT value FROM json_each(?))"
+                path_params = [json.dumps(matches)]
+                # Unary + keeps the other columns' indexes out of the plan
+                prefix = '+'
+            else:
+                # Too unselective to drive the query, so the other filters'
+                # indexes are left usable and each row's path is checked
+                path_clause = " AND file_path LIKE ? ESCAPE '\\'"
+                path_params = [_like_pattern(theFilters['path'])]
+        
+        for column, name in (('event', 'event_type'), ('file_extension', 'extension')):
+            values = _filter_values(theFilters.get(name))
+            if len(values) == 1:
+                query += f" AND {prefix}{column} = ?"
+            elif values:
+                query += f" AND {prefix}{column} IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+        
+        start, end = _time_bounds(theFilters)
+        if start is not None:
+            query += f" AND {prefix}event_timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            query += f" AND {prefix}event_timestamp < ?"
+            params.append(end)
+        
+        query += path_clause
+        params.extend(path_params)
+    
+    return query, params
+
+def _cache_key(theName, theFilters, *theArgs):
+    """
+    Builds the query cache key of a filtered query.
+    
+    Filters that select everything ('All' or empty) are dropped and the
+    date range is replaced by the minute its start falls in, so equivalent
+    filter dictionaries share one entry.
+    
+    Args:
+        theName: Name of the query function.
+        theFilters: Dictionary of filter criteria as accepted by query_events.
+        *theArgs: Any other arguments the result depends on.
+    
+    Returns:
+        tuple: A hashable key.
+    """
+    filters = theFilters or {}
+    date_range = _date_range_start(filters.get('date_range'))
+    if date_range is not None:
+        date_range //= DATE_RANGE_BUCKET_NS
+    normalized = (_filter_values(filters.get('event_type')),
+                  _filter_values(filters.get('extension')),
+                  filters.get('path') or None, date_range,
+                  _to_timestamp(filters.get('start')), _to_timestamp(filters.get('end')))
+    return (theName, normalized) + theArgs
+
+def get_query_cache_stats():
+    """
+    Gets the hit and miss counts of the query result cache.
+    
+    Returns:
+        dict: 'hits', 'misses', 'size' (number of cached results) and
+            'rows' (number of rows they hold).
+    """
+    return __myQueryCache.stats()
+
+def clear_query_cache():
+    """
+    Drops every cached query result and resets the cache statistics.
+    """
+    __myQueryCache.clear()
+
+def _merge_partitions(theRows, theQuery, theParams, theStart=None, theEnd=None, theKey=None,
+                      theReverse=True):
+    """
+    Merge rows read from the main database with the same query run against
+    the partitions overlapping a time range.
+    
+    Args:
+        theRows: Rows already read from the main database, sorted by theKey.
+        theQuery: The query that produced them.
+        theParams: Parameters of the query.
+        theStart: Epoch nanoseconds from which partitions are read. Defaults to None.
+        theEnd: Epoch nanoseconds before which partitions are read. Defaults to None.
+        theKey: Sort key of the rows. Defaults to the event timestamp.
+        theReverse: Whether the rows are sorted newest first. Defaults to True.
+    
+    Returns:
+        list: Rows from every source, in the same order.
+    """
+    results = query_partitions(theQuery, theParams, theStart, theEnd)
+    if not results:
+        return theRows
+    key = theKey or (lambda row: row[5])
+    return list(heapq.merge(theRows, *results, key=key, reverse=theReverse))
+
 def query_events(theFilters=None):
     """
     Query events with multiple filter criteria.
     
     Args:
         theFilters: Dictionary containing filter criteria:
-            - 'event_type': Filter by event type
-            - 'extension': Filter by file extension  
+            - 'event_type': Event type, or a list of event types
+            - 'extension': File extension, or a list of extensions
             - 'date_range': Filter by date range
+            - 'start': Only events at or after this datetime or epoch nanoseconds
+            - 'end': Only events before this datetime or epoch nanoseconds
+            - 'path': Only events whose path contains this text
             Defaults to None (no filters applied).
     
     Returns:
         list: List of events matching all specified filters,
+    
+    Note:
+        Results are cached until the next write to the database, so
+        repeating a query without new events does not touch the events.
     """
     with get_connection() as conn:
         if conn is None:
             return []
         try:
-            cursor = conn.cursor()
-            query = "SELECT * FROM events WHERE 1=1"
-            params = []
-            
-            if theFilters:
-                if theFilters.get('event_type') and theFilters['event_type'] != 'All':
-                    query += " AND event LIKE ?"
-                    params.append(f"%{theFilters['event_type']}%")
-                
-                if theFilters.get('extension') and theFilters['extension'] != 'All':
-                    query += " AND file_extension = ?"
-                    params.append(theFilters['extension'])
-                
-                if theFilters.get('date_range') and theFilters['date_range'] != 'All':
-                    if theFilters['date_range'] == 'Today':
-                        query += " AND DATE(event_timestamp) = DATE('now')"
-                    elif theFilters['date_range'] == 'Last 7 days':
-                        query += " AND event_timestamp >= datetime('now', '-7 days')"
-                    elif theFilters['date_range'] == 'Last 30 days':
-                        query += " AND event_timestamp >= datetime('now', '-30 days')"
+            key = _cache_key('query_events', theFilters)
+            generation = get_data_generation(conn)
+            cached = __myQueryCache.get(key, generation)
+            if cached is not None:
+                return list(cached)
             
-            query += " ORDER BY event_timestamp DESC"
+            cursor = conn.cursor()
+            where, params = _build_filter_clause(theFilters)
+            query = f"SELECT * FROM events {where} ORDER BY event_timestamp DESC"
             print(f"DEBUG - Query: {query}")
             print(f"DEBUG - Params: {params}")
             
             cursor.execute(query, params)
-            results = cursor.fetchall()
+            start, end = _time_bounds(theFilters)
+            results = _merge_partitions(cursor.fetchall(), query, params, start, end)
             print(f"DEBUG - Found {len(results)} results")
+            __myQueryCache.put(key, generation, list(results), len(results))
             return results
             
         except Exception as e:
             print(f"Database error: {e}")
             return []
 
-def get_unique_extensions():
+def fetch_event_page(theFilters=None, thePageToken=None, thePageSize=500):
     """
-    Gets all unique file extensions from the events table.
+    Fetch one page of filtered events, newest first, using keyset pagination.
+    
+    Pages are keyed on (event_timestamp, id), so each page is an index range
+    scan no matter how deep into the history it is, and rows inserted while
+    paging do not shift page boundaries.
+    
+    Args:
+        theFilters: Dictionary of filter criteria as accepted by query_events.
+        thePageToken: A next or previous token returned by an earlier call,
+            or None for the first (newest) page.
+        thePageSize: Maximum number of rows per page. Defaults to 500.
     
     Returns:
-        list: List of unique file extensions found in the database,
+        tuple: (rows, next_token, prev_token). next_token is None on the last
+            page and prev_token is None on the first page.
     """
     with get_connection() as conn:
         if conn is None:
-            return []
+            return [], None, None
+        try:
+            key = _cache_key('fetch_event_page', theFilters, thePageToken, thePageSize)
+            generation = get_data_generation(conn)
+            cached = __myQueryCache.get(key, generation)
+            if cached is not None:
+                return (list(cached[0]),) + cached[1:]
+            
+            where, params = _build_filter_clause(theFilters)
+            direction = thePageToken[0] if thePageToken else None
+            
+            if direction == 'before':
+                where += " AND (event_timestamp, id) > (?, ?)"
+                order = "ASC"
+            else:
+                if direction == 'after':
+                    where += " AND (event_timestamp, id) < (?, ?)"
+                order = "DESC"
+            if thePageToken:
+                params.extend(thePageToken[1:])
+            
+            # Only partitions that can hold rows beyond the token are read
+            start, end = _time_bounds(theFilters)
+            if direction == 'before':
+                start = max(start or 0, thePageToken[1])
+            elif direction == 'after':
+                end = thePageToken[1] + 1 if end is None else min(end, thePageToken[1] + 1)
+            
+            query = (f"SELECT * FROM events {where} "
+                     f"ORDER BY event_timestamp {order}, id {order} LIMIT ?")
+            params.append(thePageSize + 1)
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            rows = _merge_partitions(cursor.fetchall(), query, params, start, end,
+                                     lambda row: (row[5], row[0]), order == "DESC")
+            rows = rows[:thePageSize + 1]
+            has_more = len(rows) > thePageSize
+            rows = rows[:thePageSize]
+            
+            if direction == 'before':
+                rows.reverse()
+                has_newer, has_older = has_more, True
+            else:
+                has_newer, has_older = direction == 'after', has_more
+            
+            if not rows:
+                return [], None, None
+            next_token = ('after', rows[-1][5], rows[-1][0]) if has_older else None
+            prev_token = ('before', rows[0][5], rows[0][0]) if has_newer else None
+            __myQueryCache.put(key, generation, (list(rows), next_token, prev_token), len(rows))
+            return rows, next_token, prev_token
+            
+        except Exception as e:
+            print(f"Database error: {e}")
+            return [], None, None
+
+def iter_events(theFilters=None, thePageSize=500):
+    """
+    Stream filtered events, newest first, one page at a time.
+    
+    Args:
+        theFilters: Dictionary of filter criteria as accepted by query_events.
+        thePageSize: Number of rows fetched per query. Defaults to 500.
+    
+    Yields:
+        tuple: Event records in the same layout as query_events.
+    """
+    token = None
+    while True:
+        rows, token, _ = fetch_event_page(theFilters, token, thePageSize)
+        yield from rows
+        if token is None:
+            return
+
+def stream_events(theFilters=None):
+    """
+    Stream filtered events, newest first, straight from open cursors.
+    
+    Unlike iter_events, a single query is stepped through row by row, so
+    nothing but the current row is held in memory. Partitions overlapping
+    the date range are read through cursors of their own and merged in.
+    
+    Args:
+        theFilters: Dictionary of filter criteria as accepted by query_events.
+    
+    Yields:
+        tuple: Event records in the same layout as query_events.
+    """
+    with get_connection() as conn:
+        if conn is None:
+            return
+        where, params = _build_filter_clause(theFilters)
+        query = f"SELECT * FROM events {where} ORDER BY event_timestamp DESC, id DESC"
+        with open_partitions(*_time_bounds(theFilters)) as partitions:
+            cursors = [conn.execute(query, params)]
+            cursors += [partition.execute(query, params) for partition in partitions]
+            if len(cursors) == 1:
+                yield from cursors[0]
+            else:
+                yield from heapq.merge(*cursors, key=lambda row: (row[5], row[0]), reverse=True)
+
+def get_extension_counts():
+    """
+    Gets the number of events per file extension, partitions included.
+    
+    Reads the extension catalog and the partition totals, which are kept up
+    to date as events are inserted, rolled and deleted, instead of scanning
+    the events or opening the partitions.
+    
+    Returns:
+        dict: Event count keyed by file extension, '' for files without one.
+    """
+    with get_connection() as conn:
+        if conn is None:
+            return {}
         cursor = conn.cursor()
-        cursor.execute('SELECT DISTINCT file_extension FROM events WHERE file_extension != ""')
-        extensions = cursor.fetchall()
-        return ['All'] + [ext[0] for ext in extensions if ext[0]]
+        cursor.execute("""
+            SELECT file_extension, SUM(count) FROM (
+                SELECT file_extension, count FROM extension_catalog
+                UNION ALL
+                SELECT file_extension, count FROM partition_extensions
+            )
+            GROUP BY file_extension
+        """)
+        return dict(cursor.fetchall())
+
+def get_unique_extensions():
+    """
+    Gets all unique file extensions from the extension catalog.
+    
+    Returns:
+        list: 'All' followed by every file extension with recorded events, sorted.
+    """
+    return ['All'] + sorted(ext for ext, count in get_extension_counts().items() if ext and count > 0)
 
 def save_multiple_events(theEvents):
     """
@@ -277,6 +764,7 @@ def save_multiple_events(theEvents):
         theEvents: List of event dictionaries, each containing:
             - 'filepath': Path to the file
             - 'event_type': Type of file system event
+            - 'timestamp': Optional epoch nanoseconds when the event was observed
     
     Returns:
         bool: True if all events were saved successfully, False otherwise.
@@ -289,32 +777,66 @@ def save_multiple_events(theEvents):
             if conn is None:
                 return False
             
+            now = time.time_ns()
+            rows = [build_event_row(event['event_type'], event['filepath'],
+                                    event.get('timestamp') or now)
+                    for event in theEvents]
             cursor = conn.cursor()
-            for event in theEvents:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                file_path = event['filepath']
-                filename = os.path.basename(file_path)
-                extension = os.path.splitext(filename)[1]
-                file_size = os.path.getsize(file_path) if os.path.isfile(file_path) else None
-                user = getpass.getuser()
-
-                cursor.execute("""
-                    INSERT INTO events (
-                        filename, file_path, file_extension, event,
-                        event_timestamp, file_size, user
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    filename, file_path, extension, event['event_type'],
-                    timestamp, file_size, user
-                ))
+            cursor.executemany(INSERT_EVENT_SQL, rows)
             
             conn.commit()
+            notify_data_changed()
             return True
     except Exception as e:
         print(f"Error saving events to database: {e}")
         return False
 
+def display_formatter():
+    """
+    Builds a formatter that turns database event records into display rows.
+    
+    Relative paths and formatted timestamps are remembered by the
+    formatter, since the same paths and seconds repeat across many rows
+    and os.path.relpath and strftime dominate the cost of each row. Use
+    one formatter per export or listing.
+    
+    Returns:
+        function: Maps an event record to the tuple described in
+            format_event_for_display.
+    """
+    start = os.getcwd()
+    relpaths = {}
+    last_second = [None, None]
+
+    def relpath(thePath):
+        """
+        Gets a path relative to the working directory, remembering the result.
+        """
+        display = relpaths.get(thePath)
+        if display is None:
+            if len(relpaths) >= 100000:
+                relpaths.clear()
+            display = relpaths[thePath] = os.path.relpath(thePath, start)
+        return display
+
+    def format_row(theEvent):
+        """
+        Formats one event record for display.
+        """
+        file_path = theEvent[2]
+        filename = os.path.basename(file_path)
+        display_path = relpath(file_path)
+        if len(theEvent) > 8 and theEvent[8]:
+            display_path = f"{display_path} -> {relpath(theEvent[8])}"
+        timestamp = theEvent[5]
+        second = timestamp // 1000000000 if isinstance(timestamp, int) else timestamp
+        if second != last_second[0]:
+            last_second[:] = [second, format_timestamp(timestamp)]
+        return (filename, os.path.splitext(filename)[1] or "(none)", display_path,
+                theEvent[4], last_second[1])
+
+    return format_row
+
 def format_event_for_display(theEvent):
     """
     Format a database event record for display.
@@ -326,43 +848,9 @@ def format_event_for_display(theEvent):
         tuple: Formatted event data containing:
             - filename: Base filename without path
             - extension: File extension or "(none)" if empty
-            - display_path: Relative path for display
+            - display_path: Relative path for display, "source -> destination"
+              for moves
             - event_type: Type of file system event
-            - timestamp: When the event occurred
-    """
-    file_path = theEvent[2]
-    filename = os.path.basename(file_path)
-    extension = os.path.splitext(filename)[1] or "(none)"
-    display_path = os.path.relpath(file_path)
-    
-    return (
-        filename,
-        extension,
-        display_path,
-        theEvent[4],
-        theEvent[5]
-    )
-
-def export_events_to_csv(thePath, theEvents):
-    """
-    Exports event data to a CSV file.
-    
-    Args:
-        thePath: Full path where the CSV file should be saved.
-        theEvents: List of events to export.
-    
-    Returns:
-        bool: True if export was successful, False if an error occurred.
+            - timestamp: When the event occurred, in local time
     """
-    try:
-        with open(thePath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Filename', 'Extension', 'Path', 'Event', 'Timestamp'])
-            
-            for event in theEvents:
-                formatted_event = format_event_for_display(event)
-                writer.writerow(formatted_event)
-        return True
-    except Exception as e:
-        print(f"Error exporting to CSV: {e}")
-        return False
\ No newline at end of file
+    return display_formatter()(theEvent)
@@ -1,10 +1,6 @@
 import base64
 import os.path
 from email.message import EmailMessage
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
@@ -14,7 +10,16 @@ def __gmail_authenticate():
     
     Returns:
         googleapiclient.discovery.Resource: Gmail service object for API calls.
+    
+    Note:
+        The Google client libraries are imported here rather than at module
+        level, since they are slow to import and only needed to send email.
     """
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import build
+
     creds = None
     
     if os.path.exists('token.json'):
@@ -1,11 +1,46 @@
 import logging
-from watchdog.events import FileSystemEventHandler
-from .db_handler import insert_event
+import threading
+import time
+from watchdog.events import (
+    FileSystemEventHandler, EVENT_TYPE_MOVED,
+    FileCreatedEvent, FileDeletedEvent, DirCreatedEvent, DirDeletedEvent
+)
+from .coalescer import EventCoalescer
+from .path_filter import PathFilter
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(message)s',
                     datefmt='%Y-%m-%d %H:%M:%S')
 
+def filter_event(theFilter, theEvent):
+    """
+    Apply a path filter to a file system event.
+    
+    A move with only its source matching is reported as a deletion and a
+    move with only its destination matching as a creation.
+    
+    Args:
+        theFilter: The PathFilter to apply.
+        theEvent: The file system event.
+        
+    Returns:
+        The event to handle, or None if it is filtered out.
+    """
+    if theEvent.event_type != EVENT_TYPE_MOVED:
+        return theEvent if theFilter.matches(theEvent.src_path, theEvent.is_directory) else None
+    
+    src_matches = theFilter.matches(theEvent.src_path, theEvent.is_directory)
+    dest_matches = theFilter.matches(theEvent.dest_path, theEvent.is_directory)
+    if src_matches and dest_matches:
+        return theEvent
+    if src_matches:
+        event_class = DirDeletedEvent if theEvent.is_directory else FileDeletedEvent
+        return event_class(theEvent.src_path)
+    if dest_matches:
+        event_class = DirCreatedEvent if theEvent.is_directory else FileCreatedEvent
+        return event_class(theEvent.dest_path)
+    return None
+
 class MyEventHandler(FileSystemEventHandler):
     """
     Custom file system event handler that monitors and logs file changes.
@@ -14,25 +49,68 @@ class MyEventHandler(FileSystemEventHandler):
     custom handling of file system events.
     """
     
-    def __init__(self, logToTextbox=None):
+    def __init__(self, logToTextbox=None, theEventWriter=None, theCoalesceWindow=0):
         """
         Initialize the event handler.
         
         Args:
-            logToTextbox: Function to call for logging events to the View.
+            logToTextbox: Function called with (event_type, path, dest_path,
+                timestamp) to log events to the View, where dest_path is None
+                unless the event is a move and timestamp is the epoch
+                nanoseconds at which the event was dispatched. It is called
+                from the observer thread.
+            theEventWriter: EventWriter used to persist events. Defaults to
+                None, in which case events are only logged.
+            theCoalesceWindow: Seconds during which events for the same path
+                are merged before being handled. Defaults to 0 (disabled).
         """
         super().__init__()
         self.__myLogToTextbox = logToTextbox
-        self.__myExtensionFilter = ''
+        self.__myEventWriter = theEventWriter
+        self.__myFilter = None
+        # Dispatch time of the event being delivered on the current thread
+        self.__myDelivery = threading.local()
+        self.__myCoalescer = None
+        if theCoalesceWindow > 0:
+            self.__myCoalescer = EventCoalescer(self.__deliver, theCoalesceWindow)
+            self.__myCoalescer.start()
 
     def set_extension_filter(self, theExtension):
         """
         Sets the file extension filter.
         
         Args:
-            theExtension: File extension to filter by ('.txt', '.png').
+            theExtension: File extension to filter by ('.txt', '.png'), or a
+                comma separated list of extensions and glob patterns.
         """
-        self.__myExtensionFilter = theExtension
+        self.set_filter(PathFilter(PathFilter.parse_patterns(theExtension)))
+
+    def set_filter(self, theFilter):
+        """
+        Sets the include/exclude filter applied to every event.
+        
+        Args:
+            theFilter: A PathFilter, or None to report every event.
+        """
+        self.__myFilter = None if theFilter is None or theFilter.is_empty() else theFilter
+
+    def __record(self, theEventType, theEvent):
+        """
+        Sends an event to the View and queues it for persistence.
+        
+        The event keeps the timestamp captured when it was dispatched, or the
+        current time when an on_* method is called directly.
+        
+        Args:
+            theEventType: The type of event ('created', 'modified', 'deleted', 'moved').
+            theEvent: The file system event object.
+        """
+        dest_path = theEvent.dest_path or None
+        timestamp = getattr(self.__myDelivery, 'timestamp', None) or time.time_ns()
+        if self.__myLogToTextbox:
+            self.__myLogToTextbox(theEventType, theEvent.src_path, dest_path, timestamp)
+        if self.__myEventWriter:
+            self.__myEventWriter.put(theEventType, theEvent.src_path, dest_path, timestamp)
 
     def on_modified(self, theEvent):
         """
@@ -44,9 +122,7 @@ class MyEventHandler(FileSystemEventHandler):
         Returns:
             The result of calling the parent class' on_modified method.
         """
-        msg = f'Modified: {theEvent.src_path}'
-        if self.__myLogToTextbox:
-            self.__myLogToTextbox(msg)
+        self.__record('modified', theEvent)
         return super().on_modified(theEvent)
 
     def on_created(self, theEvent):
@@ -59,9 +135,7 @@ class MyEventHandler(FileSystemEventHandler):
         Returns:
             The result of calling the parent class' on_created method.
         """
-        msg = f'Created: {theEvent.src_path}'
-        if self.__myLogToTextbox:
-            self.__myLogToTextbox(msg)
+        self.__record('created', theEvent)
         return super().on_created(theEvent)
 
     def on_deleted(self, theEvent):
@@ -74,23 +148,90 @@ class MyEventHandler(FileSystemEventHandler):
         Returns:
             The result of calling the parent class' on_deleted method.
         """
-        msg = f'Deleted: {theEvent.src_path}'
-        if self.__myLogToTextbox:
-            self.__myLogToTextbox(msg)
+        self.__record('deleted', theEvent)
         return super().on_deleted(theEvent)
 
+    def on_moved(self, theEvent):
+        """
+        Handles file move and rename events as a single event.
+        
+        Args:
+            theEvent: The file system event object.
+            
+        Returns:
+            The result of calling the parent class' on_moved method.
+        """
+        self.__record('moved', theEvent)
+        return super().on_moved(theEvent)
+
     def dispatch(self, theEvent):
         """
-        Dispatch file system events with optional extension filtering.
+        Dispatch file system events with optional include/exclude filtering.
         
         Args:
             theEvent: The file system event to dispatch.
             
         Returns:
             The result of calling the parent class' dispatch method or None.
+        
+        Note:
+            The event's timestamp is captured here, before filtering and
+            coalescing, and carried with it until it is recorded.
+        """
+        timestamp = time.time_ns()
+        if self.__myFilter:
+            theEvent = filter_event(self.__myFilter, theEvent)
+            if theEvent is None:
+                return None
+        return self.__coalesce(theEvent, timestamp)
+
+    def __coalesce(self, theEvent, theTimestamp):
+        """
+        Hand an event to the coalescer, or deliver it directly if coalescing is disabled.
+        
+        Args:
+            theEvent: The file system event that passed the filters.
+            theTimestamp: Epoch nanoseconds at which the event was dispatched.
+            
+        Returns:
+            The result of delivering the event, or None if it was held.
+        """
+        if self.__myCoalescer:
+            self.__myCoalescer.add(theEvent, theTimestamp)
+            return None
+        return self.__deliver(theEvent, theTimestamp)
+
+    def __deliver(self, theEvent, theTimestamp=None):
         """
-        if self.__myExtensionFilter and self.__myExtensionFilter != 'None':
-            if theEvent.src_path.lower().endswith(self.__myExtensionFilter.lower()):
-                return super().dispatch(theEvent)
-        else: 
+        Route an event to the matching on_* method.
+        
+        Args:
+            theEvent: The file system event to handle.
+            theTimestamp: Epoch nanoseconds at which the event was dispatched.
+                Defaults to None (the current time).
+            
+        Returns:
+            The result of calling the parent class' dispatch method.
+        """
+        self.__myDelivery.timestamp = theTimestamp
+        try:
             return super().dispatch(theEvent)
+        finally:
+            self.__myDelivery.timestamp = None
+
+    def flush(self):
+        """
+        Emit any events currently held for coalescing.
+        """
+        if self.__myCoalescer:
+            self.__myCoalescer.flush()
+
+    def close(self):
+        """
+        Emit any events still held for coalescing and stop the coalescer.
+        
+        Note:
+            It's safe to call this method when coalescing is disabled.
+        """
+        if self.__myCoalescer:
+            self.__myCoalescer.stop()
@@ -0,0 +1,84 @@
+import functools
+import getpass
+import os
+import stat
+
+# Distinct paths whose derived fields are remembered
+PATH_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=1)
+def current_user():
+    """
+    Gets the user that events are attributed to.
+
+    The user cannot change during the life of the process, so it is
+    resolved once and reused.
+
+    Returns:
+        str: Login name of the current user.
+    """
+    return getpass.getuser()
+
+@functools.lru_cache(maxsize=PATH_CACHE_SIZE)
+def path_fields(thePath):
+    """
+    Gets the fields derived from a path alone.
+
+    Hot files produce events over and over, so the results are kept in a
+    bounded LRU cache keyed by path.
+
+    Args:
+        thePath: The file path as reported by the watcher.
+
+    Returns:
+        tuple: (absolute_path, file_name, file_extension).
+    """
+    abs_path = os.path.abspath(thePath)
+    file_name = os.path.basename(abs_path)
+    return abs_path, file_name, os.path.splitext(file_name)[1]
+
+def file_size(thePath):
+    """
+    Gets the size of a regular file with a single stat call.
+
+    Args:
+        thePath: Absolute path of the file.
+
+    Returns:
+        int: Size in bytes, or None if the path is missing or not a regular file.
+    """
+    try:
+        info = os.stat(thePath)
+    except (OSError, ValueError):
+        return None
+    return info.st_size if stat.S_ISREG(info.st_mode) else None
+
+def build_event_row(theEvent, thePath, theTimestamp, theDestPath=None):
+    """
+    Builds the column values stored for a single event.
+
+    Args:
+        theEvent: The type of event ('created', 'modified', 'deleted', 'moved').
+        thePath: The file path where the event occurred.
+        theTimestamp: Epoch nanoseconds when the event was observed.
+        theDestPath: Destination path of a move, None for other events.
+
+    Returns:
+        tuple: Values matching the columns of db_handler.INSERT_EVENT_SQL.
+    """
+    abs_path, file_name, file_extension = path_fields(thePath)
+    dest_path = path_fields(theDestPath)[0] if theDestPath else None
+    # A moved file now lives at its destination
+    size = file_size(dest_path or abs_path)
+
+    return (
+        file_name, abs_path, file_extension, theEvent,
+        theTimestamp, size, current_user(), dest_path
+    )
+
+def clear_caches():
+    """
+    Forget the cached user and path fields.
+    """
+    current_user.cache_clear()
+    path_fields.cache_clear()
@@ -0,0 +1,253 @@
+import json
+import queue
+import threading
+import time
+from .database import close_connection, get_database_path
+from .db_handler import insert_events
+
+class EventWriter:
+    """
+    Background writer that persists file system events in batches.
+
+    Events are pushed onto a bounded queue by the event handler and drained
+    by a dedicated thread, which writes them with a single executemany per
+    batch. A batch is written once it reaches the batch size or once the
+    oldest queued event has waited for the flush interval. A batch that
+    cannot be written, e.g. while maintenance holds the database lock, is
+    retried with exponential backoff. A batch that still fails after
+    MAX_RETRIES retries is appended to a dead-letter file next to the
+    database and reported through the failure callback, so a database that
+    stays unavailable never blocks put() or flush().
+
+    Attributes:
+        __myQueue: Bounded queue of pending (event_type, path, dest_path, timestamp) tuples.
+        __myBatchSize: Maximum number of events written per transaction.
+        __myFlushInterval: Maximum seconds an event waits before being written.
+        __myThread: The writer thread, None when not running.
+        __myStopEvent: Signals the writer thread to drain and exit.
+        __myDeadLetterPath: JSON Lines file that receives batches that could not be written.
+        __myOnFailure: Called with (failed_count, error) when a batch is dead-lettered.
+        __myFailedCount: Number of events moved to the dead-letter file so far.
+        __myLastError: Message of the last write error, None if every write succeeded.
+        __myFailing: Whether the last batch was dead-lettered. Later batches
+            are then tried once before being dead-lettered, so a backlog drains
+            without waiting out the backoff for every batch.
+    """
+
+    # Seconds before the first retry of a failed batch, doubled up to the maximum
+    RETRY_DELAY = 0.1
+    MAX_RETRY_DELAY = 5.0
+    # Retries of a failed batch before it is moved to the dead-letter file
+    MAX_RETRIES = 5
+
+    def __init__(self, theBatchSize=500, theFlushInterval=0.5, theMaxQueueSize=10000,
+                 theDeadLetterPath=None, theOnFailure=None):
+        """
+        Initialize the writer.
+
+        Args:
+            theBatchSize: Maximum number of events per batch. Defaults to 500.
+            theFlushInterval: Maximum seconds before a partial batch is written.
+                Defaults to 0.5.
+            theMaxQueueSize: Capacity of the pending queue. When full, put()
+                blocks until the writer catches up. Defaults to 10000.
+            theDeadLetterPath: File that batches which could not be written are
+                appended to. Defaults to None (the database path + '.failed.jsonl').
+            theOnFailure: Callable taking (failed_count, error), called from the
+                writer thread whenever a batch is dead-lettered. Defaults to None.
+        """
+        self.__myQueue = queue.Queue(maxsize=theMaxQueueSize)
+        self.__myBatchSize = theBatchSize
+        self.__myFlushInterval = theFlushInterval
+        self.__myThread = None
+        self.__myStopEvent = threading.Event()
+        self.__myDeadLetterPath = theDeadLetterPath
+        self.__myOnFailure = theOnFailure
+        self.__myFailedCount = 0
+        self.__myLastError = None
+        self.__myFailing = False
+
+    def start(self):
+        """
+        Start the writer thread.
+
+        Note:
+            Calling start() on a running writer has no effect.
+        """
+        if self.__myThread and self.__myThread.is_alive():
+            return
+        self.__myStopEvent.clear()
+        self.__myThread = threading.Thread(target=self.__run, name='EventWriter', daemon=True)
+        self.__myThread.start()
+
+    def stop(self):
+        """
+        Stop the writer thread after writing every queued event.
+
+        Note:
+            It's safe to call this method even if the writer is not running.
+        """
+        if self.__myThread:
+            self.__myStopEvent.set()
+            self.__myThread.join()
+            self.__myThread = None
+
+    def put(self, theEventType, thePath, theDestPath=None, theTimestamp=None):
+        """
+        Queue an event for persistence.
+
+        Args:
+            theEventType: The type of event ('created', 'modified', 'deleted', 'moved').
+            thePath: The file path where the event occurred.
+            theDestPath: Destination path of a move. Defaults to None.
+            theTimestamp: Epoch nanoseconds when the event was observed.
+                Defaults to None (the time it is written).
+        """
+        self.__myQueue.put((theEventType, thePath, theDestPath, theTimestamp))
+
+    def flush(self):
+        """
+        Block until every event queued so far has been written.
+        """
+        if self.__myThread and self.__myThread.is_alive():
+            self.__myQueue.join()
+
+    def pending(self):
+        """
+        Gets the number of events waiting to be written.
+
+        Returns:
+            int: Approximate number of queued events.
+        """
+        return self.__myQueue.qsize()
+
+    def get_failed_count(self):
+        """
+        Gets the number of events that could not be written to the database.
+
+        Returns:
+            int: Number of events moved to the dead-letter file.
+        """
+        return self.__myFailedCount
+
+    def get_last_error(self):
+        """
+        Gets the last error raised while writing a batch.
+
+        Returns:
+            str: The error message, or None if no write has failed.
+        """
+        return self.__myLastError
+
+    def get_dead_letter_path(self):
+        """
+        Gets the file that batches which could not be written are appended to.
+
+        Returns:
+            str: Path of the JSON Lines dead-letter file.
+        """
+        return self.__myDeadLetterPath or f"{get_database_path()}.failed.jsonl"
+
+    def __next_batch(self):
+        """
+        Collect the next batch from the queue.
+
+        Waits for a first event, then keeps collecting until the batch is
+        full or the flush interval since the first event has elapsed.
+
+        Returns:
+            list: The collected (event_type, path, dest_path, timestamp) tuples, possibly empty.
+        """
+        try:
+            batch = [self.__myQueue.get(timeout=self.__myFlushInterval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.__myFlushInterval
+        while len(batch) < self.__myBatchSize:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self.__myQueue.get_nowait())
+                else:
+                    batch.append(self.__myQueue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def __run(self):
+        """
+        Writer thread loop. Drains the queue until stopped and empty,
+        then releases the thread's database connection.
+        """
+        while not (self.__myStopEvent.is_set() and self.__myQueue.empty()):
+            batch = []
+            try:
+                batch = self.__next_batch()
+                if batch:
+                    self.__write(batch)
+            except Exception as e:
+                print(f"Event writer error: {e}")
+            finally:
+                for _ in batch:
+                    self.__myQueue.task_done()
+        close_connection()
+
+    def __write(self, theBatch):
+        """
+        Write a batch, retrying with exponential backoff up to MAX_RETRIES times.
+
+        A batch that still fails is moved to the dead-letter file. While the
+        previous batch was dead-lettered, a batch is tried only once.
+
+        Args:
+            theBatch: List of (event_type, path, dest_path, timestamp) tuples.
+
+        Returns:
+            bool: True if the batch was written, False if it was dead-lettered.
+        """
+        delay = self.RETRY_DELAY
+        retries = 0 if self.__myFailing else self.MAX_RETRIES
+        while True:
+            try:
+                if insert_events(theBatch):
+                    self.__myFailing = False
+                    return True
+                self.__myLastError = "the database rejected the batch"
+            except Exception as e:
+                print(f"Error writing event batch: {e}")
+                self.__myLastError = str(e)
+            if retries == 0:
+                break
+            retries -= 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+        self.__myFailing = True
+        self.__dead_letter(theBatch)
+        return False
+
+    def __dead_letter(self, theBatch):
+        """
+        Append a batch that could not be written to the dead-letter file and
+        report the failure.
+
+        Args:
+            theBatch: List of (event_type, path, dest_path, timestamp) tuples.
+        """
+        path = self.get_dead_letter_path()
+        now = time.time_ns()
+        try:
+            with open(path, 'a', encoding='utf-8') as file:
+                for event_type, file_path, dest_path, timestamp in theBatch:
+                    file.write(json.dumps({'event_type': event_type, 'file_path': file_path,
+                                           'dest_path': dest_path,
+                                           'event_timestamp': timestamp or now}) + '\n')
+            print(f"Moved {len(theBatch)} events that could not be written to {path}")
+        except OSError as e:
+            print(f"Dropping {len(theBatch)} events that could not be written: {e}")
+        self.__myFailedCount += len(theBatch)
+        if self.__myOnFailure:
+            try:
+                self.__myOnFailure(self.__myFailedCount, self.__myLastError)
+            except Exception as e:
+                print(f"Event writer error: {e}")
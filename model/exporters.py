@@ -0,0 +1,427 @@
+import contextlib
+import csv
+import gzip
+import importlib.util
+import itertools
+import json
+import os
+import threading
+import zipfile
+from .database import close_connection
+from .db_handler import display_formatter, stream_events
+
+# Rows formatted and written per batch
+CHUNK_SIZE = 5000
+
+CSV_HEADER = ['Filename', 'Extension', 'Path', 'Event', 'Timestamp']
+
+# Full event schema carried by the JSON Lines and columnar formats
+COLUMNS = ('id', 'filename', 'file_path', 'file_extension', 'event',
+           'event_timestamp', 'file_size', 'user', 'dest_path')
+
+# Integer columns of the .npz format, where a missing file_size is stored as -1
+NPZ_INT_COLUMNS = ('id', 'event_timestamp', 'file_size')
+
+# Optional package each binary format needs. Neither is in requirements.txt.
+FORMAT_DEPENDENCIES = {'parquet': 'pyarrow', 'npz': 'numpy'}
+
+def write_csv(theFile, theEvents, theChunkSize=CHUNK_SIZE, theProgress=None, theCancel=None):
+    """
+    Write events to an open text file as CSV, one chunk at a time.
+
+    Args:
+        theFile: Text file opened with newline=''.
+        theEvents: Iterable of event records.
+        theChunkSize: Rows formatted and written per batch. Defaults to CHUNK_SIZE.
+        theProgress: Function called with the number of rows written after
+            each chunk. Defaults to None.
+        theCancel: threading.Event that stops the export between chunks.
+            Defaults to None.
+
+    Returns:
+        int: Number of rows written, or None if cancelled.
+    """
+    writer = csv.writer(theFile)
+    writer.writerow(CSV_HEADER)
+    format_row = display_formatter()
+    return _write_chunks(theEvents, theChunkSize, theProgress, theCancel,
+                         lambda chunk: writer.writerows([format_row(event) for event in chunk]))
+
+def _write_chunks(theEvents, theChunkSize, theProgress, theCancel, theWriteChunk):
+    """
+    Feed events to a format writer in chunks, reporting progress and honouring cancellation.
+
+    Args:
+        theEvents: Iterable of event records.
+        theChunkSize: Rows per chunk.
+        theProgress: Function called with the rows written so far, or None.
+        theCancel: threading.Event that stops the export between chunks, or None.
+        theWriteChunk: Function writing a list of event records.
+
+    Returns:
+        int: Number of rows written, or None if cancelled.
+    """
+    events = iter(theEvents)
+    count = 0
+    while True:
+        if theCancel is not None and theCancel.is_set():
+            return None
+        chunk = list(itertools.islice(events, theChunkSize))
+        if not chunk:
+            return count
+        theWriteChunk(chunk)
+        count += len(chunk)
+        if theProgress:
+            theProgress(count)
+
+def write_jsonl(theFile, theEvents, theChunkSize=CHUNK_SIZE, theProgress=None, theCancel=None):
+    """
+    Write events to an open text file as JSON Lines with the full schema.
+
+    Timestamps are written as integer epoch nanoseconds.
+
+    Args:
+        theFile: Text file to write to.
+        theEvents: Iterable of event records.
+        theChunkSize: Rows written per batch. Defaults to CHUNK_SIZE.
+        theProgress: Function called with the rows written after each chunk. Defaults to None.
+        theCancel: threading.Event that stops the export between chunks. Defaults to None.
+
+    Returns:
+        int: Number of rows written, or None if cancelled.
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    return _write_chunks(
+        theEvents, theChunkSize, theProgress, theCancel,
+        lambda chunk: theFile.writelines(encode(dict(zip(COLUMNS, row))) + '\n' for row in chunk))
+
+def write_parquet(theFile, theEvents, theChunkSize=CHUNK_SIZE, theProgress=None, theCancel=None):
+    """
+    Write events to an open binary file as Parquet, one row group per chunk.
+
+    Requires pyarrow. Timestamps are stored as UTC nanosecond timestamps.
+
+    Args:
+        theFile: Binary file to write to.
+        theEvents: Iterable of event records.
+        theChunkSize: Rows per row group. Defaults to CHUNK_SIZE.
+        theProgress: Function called with the rows written after each chunk. Defaults to None.
+        theCancel: threading.Event that stops the export between chunks. Defaults to None.
+
+    Returns:
+        int: Number of rows written, or None if cancelled.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('filename', pa.string()),
+        ('file_path', pa.string()),
+        ('file_extension', pa.string()),
+        ('event', pa.string()),
+        ('event_timestamp', pa.timestamp('ns', tz='UTC')),
+        ('file_size', pa.int64()),
+        ('user', pa.string()),
+        ('dest_path', pa.string()),
+    ])
+
+    with pq.ParquetWriter(theFile, schema) as writer:
+        def write_chunk(theChunk):
+            """
+            Write one chunk as a row group.
+            """
+            columns = zip(*theChunk)
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema))
+
+        return _write_chunks(theEvents, theChunkSize, theProgress, theCancel, write_chunk)
+
+def write_npz(theFile, theEvents, theChunkSize=CHUNK_SIZE, theProgress=None, theCancel=None):
+    """
+    Write events to an open binary file as a compressed NumPy .npz archive.
+
+    Every chunk is stored as one typed array per column, named
+    '<column>_<chunk number>': int64 for NPZ_INT_COLUMNS, with -1 for a
+    missing file_size, and unicode strings otherwise, with '' for missing
+    values. Chunks are written to the archive as they are read, so memory
+    use does not grow with the size of the export. read_npz joins the
+    chunks back into whole columns.
+
+    Args:
+        theFile: Binary file to write to.
+        theEvents: Iterable of event records.
+        theChunkSize: Rows per chunk. Defaults to CHUNK_SIZE.
+        theProgress: Function called with the rows written after each chunk. Defaults to None.
+        theCancel: threading.Event that stops the export between chunks. Defaults to None.
+
+    Returns:
+        int: Number of rows written, or None if cancelled.
+    """
+    import numpy as np
+
+    index = itertools.count()
+
+    with zipfile.ZipFile(theFile, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        def write_chunk(theChunk):
+            """
+            Write one chunk as typed column arrays.
+            """
+            number = next(index)
+            for name, values in zip(COLUMNS, zip(*theChunk)):
+                if name in NPZ_INT_COLUMNS:
+                    array = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+                else:
+                    array = np.array(['' if v is None else v for v in values], dtype=str)
+                with archive.open(f"{name}_{number}.npy", 'w', force_zip64=True) as member:
+                    np.lib.format.write_array(member, array, allow_pickle=False)
+
+        return _write_chunks(theEvents, theChunkSize, theProgress, theCancel, write_chunk)
+
+def read_npz(thePath):
+    """
+    Load an archive written by write_npz into whole columns.
+
+    Args:
+        thePath: Path of the .npz file.
+
+    Returns:
+        dict: One array per name in COLUMNS.
+    """
+    import numpy as np
+
+    with np.load(thePath) as archive:
+        chunks = {}
+        for key in archive.files:
+            name, number = key.rsplit('_', 1)
+            chunks.setdefault(name, []).append((int(number), archive[key]))
+    return {
+        name: np.concatenate([array for _, array in sorted(chunks[name], key=lambda c: c[0])])
+        if name in chunks else np.array([], dtype=np.int64 if name in NPZ_INT_COLUMNS else str)
+        for name in COLUMNS
+    }
+
+def missing_dependency(theFormat):
+    """
+    Gets the optional package an export format needs but cannot import.
+
+    Args:
+        theFormat: Key of FORMATS.
+
+    Returns:
+        str: Name of the missing package, or None if the format can be written.
+    """
+    package = FORMAT_DEPENDENCIES.get(theFormat)
+    if package and importlib.util.find_spec(package) is None:
+        return package
+    return None
+
+def columnar_format():
+    """
+    Gets the columnar format available in this environment.
+
+    Returns:
+        str: 'parquet' when pyarrow is installed, otherwise 'npz' when numpy
+            is, otherwise None.
+    """
+    for format_name in ('parquet', 'npz'):
+        if missing_dependency(format_name) is None:
+            return format_name
+    return None
+
+# Writer and file mode of each export format. Writers take the arguments of write_csv.
+FORMATS = {
+    'csv': (write_csv, 'wt'),
+    'jsonl': (write_jsonl, 'wt'),
+    'parquet': (write_parquet, 'wb'),
+    'npz': (write_npz, 'wb'),
+}
+
+def format_for_path(thePath):
+    """
+    Picks the export format from a file name.
+
+    Args:
+        thePath: Path of the file to export to.
+
+    Returns:
+        str: Key of FORMATS, 'csv' unless the extension names another format.
+    """
+    name = thePath.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for extension, format_name in (('.jsonl', 'jsonl'), ('.ndjson', 'jsonl'),
+                                   ('.parquet', 'parquet'), ('.npz', 'npz')):
+        if name.endswith(extension):
+            return format_name
+    return 'csv'
+
+def export_events(thePath, theFilters=None, theFormat='csv', theCompress=None,
+                  theChunkSize=CHUNK_SIZE, theProgress=None, theCancel=None):
+    """
+    Stream every event matching the filters into a file.
+
+    Rows are read from a database cursor and written in chunks, so memory
+    use does not grow with the size of the export.
+
+    Args:
+        thePath: Path of the file to write.
+        theFilters: Dictionary of filter criteria as accepted by query_events.
+            Defaults to None.
+        theFormat: Key of FORMATS. Defaults to 'csv'.
+        theCompress: Whether to gzip the file. Defaults to None, which
+            compresses when thePath ends with '.gz'. Only applies to the
+            text formats, as the binary ones are compressed internally.
+        theChunkSize: Rows written per batch. Defaults to CHUNK_SIZE.
+        theProgress: Function called with the number of rows written so far.
+            Defaults to None.
+        theCancel: threading.Event that stops the export. Defaults to None.
+
+    Returns:
+        int: Number of rows exported, or -1 if the export failed or was
+            cancelled, in which case the partial file is removed, or if the
+            package the format needs is not installed.
+    """
+    package = missing_dependency(theFormat)
+    if package:
+        print(f"Error exporting events: {theFormat} exports require the optional "
+              f"'{package}' package (pip install {package})")
+        return -1
+    try:
+        writer, mode = FORMATS[theFormat]
+        if theCompress is None:
+            theCompress = thePath.endswith('.gz')
+        if mode == 'wb':
+            opener, options = open, {}
+        elif theCompress:
+            # A lower level than gzip's default keeps compression from becoming the bottleneck
+            opener, options = gzip.open, {'compresslevel': 6, 'newline': '', 'encoding': 'utf-8'}
+        else:
+            opener, options = open, {'newline': '', 'encoding': 'utf-8'}
+
+        with opener(thePath, mode, **options) as f, \
+                contextlib.closing(stream_events(theFilters)) as events:
+            count = writer(f, events, theChunkSize, theProgress, theCancel)
+    except Exception as e:
+        print(f"Error exporting events: {e}")
+        count = None
+    if count is None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(thePath)
+        return -1
+    return count
+
+class ExportJob:
+    """
+    Runs export_events on a background thread.
+
+    The caller polls get_progress() and is_running(), for example from a
+    Tk after() loop, and may cancel the export at any time.
+
+    Attributes:
+        __myArgs: Keyword arguments passed to export_events.
+        __myCancel: Set to stop the export.
+        __myProgress: Number of rows written so far.
+        __myResult: Return value of export_events, None while running.
+        __myThread: The export thread.
+    """
+
+    def __init__(self, thePath, theFilters=None, theFormat='csv', theCompress=None,
+                 theChunkSize=CHUNK_SIZE):
+        """
+        Initialize the job.
+
+        Args:
+            thePath: Path of the file to write.
+            theFilters: Dictionary of filter criteria as accepted by query_events.
+            theFormat: Key of FORMATS. Defaults to 'csv'.
+            theCompress: Whether to gzip the file, None to decide from the extension.
+            theChunkSize: Rows written per batch. Defaults to CHUNK_SIZE.
+        """
+        self.__myCancel = threading.Event()
+        self.__myProgress = 0
+        self.__myResult = None
+        self.__myArgs = dict(thePath=thePath, theFilters=theFilters, theFormat=theFormat,
+                             theCompress=theCompress, theChunkSize=theChunkSize,
+                             theProgress=self.__set_progress, theCancel=self.__myCancel)
+        self.__myThread = threading.Thread(target=self.__run, name='ExportJob', daemon=True)
+
+    def start(self):
+        """
+        Start the export thread.
+        """
+        self.__myThread.start()
+
+    def cancel(self):
+        """
+        Ask the export to stop after the current chunk.
+        """
+        self.__myCancel.set()
+
+    def wait(self, theTimeout=None):
+        """
+        Block until the export has finished.
+
+        Args:
+            theTimeout: Maximum seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            int: The result of export_events, or None if still running.
+        """
+        self.__myThread.join(theTimeout)
+        return self.__myResult
+
+    def is_running(self):
+        """
+        Check whether the export is still in progress.
+
+        Returns:
+            bool: True until the export thread has finished.
+        """
+        return self.__myThread.is_alive()
+
+    def is_cancelled(self):
+        """
+        Check whether the export was cancelled.
+
+        Returns:
+            bool: True if cancel() was called.
+        """
+        return self.__myCancel.is_set()
+
+    def get_progress(self):
+        """
+        Gets the number of rows written so far.
+
+        Returns:
+            int: Rows written.
+        """
+        return self.__myProgress
+
+    def get_result(self):
+        """
+        Gets the outcome of the export.
+
+        Returns:
+            int: Rows exported, -1 if it failed or was cancelled, or None while running.
+        """
+        return self.__myResult
+
+    def __set_progress(self, theCount):
+        """
+        Record the number of rows written.
+
+        Args:
+            theCount: Rows written so far.
+        """
+        self.__myProgress = theCount
+
+    def __run(self):
+        """
+        Export thread body. Releases the thread's database connection when done.
+        """
+        try:
+            self.__myResult = export_events(**self.__myArgs)
+        finally:
+            close_connection()
@@ -1,53 +1,314 @@
+import os
+import threading
 import time
 from watchdog.observers import Observer
-from watchdog.events import LoggingEventHandler
+from watchdog.events import FileSystemEventHandler, LoggingEventHandler, EVENT_TYPE_CREATED, EVENT_TYPE_MOVED
+from .database import close_connection
+from .eventHandler import filter_event
+from .snapshot import reconcile_root, take_snapshot
+
+class _RootHandler(FileSystemEventHandler):
+    """
+    Applies one root's filter before handing events to the shared handler.
+    
+    Attributes:
+        __myEventHandler: The event handler shared by every root.
+        __myFilter: PathFilter of the root.
+    """
+    
+    def __init__(self, theEventHandler, theFilter):
+        """
+        Initialize the root handler.
+        
+        Args:
+            theEventHandler: The event handler shared by every root.
+            theFilter: PathFilter of the root.
+        """
+        super().__init__()
+        self.__myEventHandler = theEventHandler
+        self.__myFilter = theFilter
+    
+    def dispatch(self, theEvent):
+        """
+        Forward the event to the shared handler if it passes the root's filter.
+        
+        Args:
+            theEvent: The file system event.
+        """
+        theEvent = filter_event(self.__myFilter, theEvent)
+        if theEvent is not None:
+            self.__myEventHandler.dispatch(theEvent)
+
+class _SubtreeScheduler(FileSystemEventHandler):
+    """
+    Schedules directories created under a partially excluded directory.
+    
+    Directories that contain excluded subtrees are watched non-recursively,
+    so new subdirectories created inside them need their own watch.
+    
+    Attributes:
+        __mySchedule: Function planning and scheduling the watches of a new directory.
+        __myFilter: PathFilter deciding which new directories are watched.
+    """
+    
+    def __init__(self, theSchedule, theFilter):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            theSchedule: Function planning and scheduling the watches of a new directory.
+            theFilter: PathFilter deciding which new directories are watched.
+        """
+        super().__init__()
+        self.__mySchedule = theSchedule
+        self.__myFilter = theFilter
+    
+    def dispatch(self, theEvent):
+        """
+        Watch newly created or moved-in directories that are not excluded.
+        
+        Args:
+            theEvent: The file system event.
+        """
+        if not theEvent.is_directory:
+            return
+        if theEvent.event_type == EVENT_TYPE_CREATED:
+            path = theEvent.src_path
+        elif theEvent.event_type == EVENT_TYPE_MOVED:
+            path = theEvent.dest_path
+        else:
+            return
+        if not self.__myFilter.excludes_directory(path):
+            self.__mySchedule(path)
+
+class _WatchedRoot:
+    """
+    One watched directory tree and the watches scheduled for it.
+    
+    Attributes:
+        path: The directory being watched.
+        recursive: Whether subdirectories are watched.
+        filter: PathFilter of the root, or None.
+        handler: Handler scheduled for the root's watches.
+        scheduler: _SubtreeScheduler for pruned trees, or None.
+        watches: (handler, ObservedWatch) pairs currently scheduled.
+    """
+    
+    def __init__(self, thePath, theRecursive, theFilter, theHandler):
+        """
+        Initialize the root.
+        
+        Args:
+            thePath: The directory being watched.
+            theRecursive: Whether subdirectories are watched.
+            theFilter: PathFilter of the root, or None.
+            theHandler: Handler scheduled for the root's watches.
+        """
+        self.path = thePath
+        self.recursive = theRecursive
+        self.filter = theFilter
+        self.handler = theHandler
+        self.scheduler = None
+        self.watches = []
+
+def plan_watches(thePath, theFilter):
+    """
+    Plan the watches needed to cover a tree while skipping excluded subtrees.
+    
+    Subtrees without excluded directories get one recursive watch. Directories
+    that contain excluded subtrees are watched non-recursively and their
+    remaining children are planned the same way, so excluded directories are
+    never handed to the observer.
+    
+    Args:
+        thePath: Root of the tree to watch.
+        theFilter: PathFilter providing the directory exclusions.
+    
+    Returns:
+        list: (path, recursive) tuples to schedule.
+    """
+    clean, watches = _plan_directory(thePath, theFilter)
+    return [(thePath, True)] if clean else watches
+
+def _plan_directory(thePath, theFilter):
+    """
+    Plan the watches for one directory.
+    
+    Args:
+        thePath: The directory to plan.
+        theFilter: PathFilter providing the directory exclusions.
+    
+    Returns:
+        tuple: (clean, watches) where clean is True if nothing below the
+            directory is excluded.
+    """
+    children = []
+    clean = True
+    try:
+        with os.scandir(thePath) as entries:
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if theFilter.excludes_directory(entry.path):
+                    clean = False
+                else:
+                    children.append(entry.path)
+    except OSError:
+        return True, []
+    
+    planned = [(child, _plan_directory(child, theFilter)) for child in children]
+    if clean and all(child_clean for _, (child_clean, _) in planned):
+        return True, []
+    
+    watches = [(thePath, False)]
+    for child, (child_clean, child_watches) in planned:
+        watches.extend([(child, True)] if child_clean else child_watches)
+    return False, watches
 
 class FileWatcher:
     """
     A file system watcher that monitors directory changes using the watchdog library.
     
+    Any number of root directories can be watched, each with its own
+    recursion flag and filter. Every root is scheduled on one shared
+    Observer, so all events arrive on a single dispatch thread, and roots
+    can be added or removed while the watcher is running.
+    
+    With reconciliation enabled, every root is scanned when it starts being
+    watched and compared with the snapshot stored when it was last stopped,
+    so changes made while nobody was watching are reported as synthetic
+    created, modified, deleted and moved events.
+    
     Attributes:
-        __myPath: The directory path to monitor.
-        __myEventHandler: The event handler to process file system events.
-        __myRecursive: Whether to monitor subdirectories recursively.
-        __myObserver: The watchdog Observer instance for monitoring.
+        __myPath: The directory given to the constructor, or None.
+        __myEventHandler: The event handler shared by every root.
+        __myRecursive: Whether the constructor's directory is watched recursively.
+        __myObserver: The watchdog Observer instance, None until started.
+        __myFilter: PathFilter whose excluded directories are never watched.
+        __myRoots: _WatchedRoot instances keyed by normalized path.
+        __myWatchCounts: Number of roots using each scheduled ObservedWatch.
+        __myLock: Guards the roots and watch bookkeeping.
+        __myReconcile: Whether offline changes are reported on start.
+        __myReconcilers: Threads reconciling roots with their snapshots.
     """
     
-    def __init__(self, thePath, theEventHandler=LoggingEventHandler(), theRecursive=True):
+    def __init__(self, thePath=None, theEventHandler=LoggingEventHandler(), theRecursive=True, theFilter=None,
+                 theReconcile=False):
         """
-        Initialize the FileWatcher with specified path and event handler.
+        Initialize the FileWatcher with an optional first directory and an event handler.
         
         Args:
-            thePath: The directory path to monitor.
+            thePath: The first directory path to monitor. Defaults to None.
             theEventHandler: Custom event handler. Defaults to LoggingEventHandler().
             theRecursive: Whether to monitor subdirectories recursively. Defaults to True.
+            theFilter: PathFilter whose excluded directories are pruned from
+                recursive watches. Defaults to None.
+            theReconcile: Whether to report the changes made since the
+                watcher was last stopped, using snapshots stored in the
+                database. Defaults to False.
+        
+        Note:
+            The constructor's filter only prunes watches; the handler is
+            expected to filter the events itself. Roots added with add_root()
+            have their filter applied to their events as well.
         """
         self.__myPath = thePath
         self.__myEventHandler = theEventHandler
         self.__myRecursive = theRecursive
         self.__myObserver = None
+        self.__myFilter = theFilter
+        self.__myRoots = {}
+        self.__myWatchCounts = {}
+        self.__myLock = threading.RLock()
+        self.__myReconcile = theReconcile
+        self.__myReconcilers = []
+        if thePath:
+            self.__add(thePath, theRecursive, theFilter, theEventHandler)
+    
+    def add_root(self, thePath, theRecursive=True, theFilter=None):
+        """
+        Watch another directory, immediately if the watcher is running.
+        
+        Args:
+            thePath: The directory path to monitor.
+            theRecursive: Whether to monitor subdirectories recursively. Defaults to True.
+            theFilter: PathFilter applied to the directory's events and used to
+                prune excluded subdirectories. Defaults to None.
+        
+        Returns:
+            bool: True if the directory was added, False if it is already watched.
+        """
+        handler = _RootHandler(self.__myEventHandler, theFilter) if theFilter else self.__myEventHandler
+        return self.__add(thePath, theRecursive, theFilter, handler)
+    
+    def remove_root(self, thePath):
+        """
+        Stop watching a directory.
+        
+        Args:
+            thePath: The directory path to stop monitoring.
+        
+        Returns:
+            bool: True if the directory was removed, False if it was not watched.
+        """
+        with self.__myLock:
+            root = self.__myRoots.pop(os.path.normpath(thePath), None)
+            if root is None:
+                return False
+            self.__unschedule_root(root)
+        return True
+    
+    def get_roots(self):
+        """
+        Gets the watched directories.
+        
+        Returns:
+            list: The watched directory paths, in the order they were added.
+        """
+        with self.__myLock:
+            return [root.path for root in self.__myRoots.values()]
     
     def start(self):
         """
-        Start monitoring the specified directory.
+        Start monitoring every root directory.
         
         Note:
-            This method is non-blocking. The observer runs in a separate thread.
+            This method is non-blocking. The observer runs in a separate thread,
+            and roots are reconciled with their snapshots on another one once
+            they are watched, so no change is missed in between.
         """
-        self.__myObserver = Observer()
-        self.__myObserver.schedule(self.__myEventHandler, self.__myPath, recursive=self.__myRecursive)
-        self.__myObserver.start()
+        with self.__myLock:
+            self.__myObserver = Observer()
+            for root in self.__myRoots.values():
+                self.__schedule_root(root)
+            self.__myObserver.start()
+            self.__start_reconcile(list(self.__myRoots.values()))
         
     def stop(self):
         """
-        Stop monitoring the directory and clean up resources.
+        Stop monitoring the directories and clean up resources.
         
         Note:
             It's safe to call this method even if the observer is not running.
+            The roots are kept, so the watcher can be started again. With
+            reconciliation enabled, every root is scanned again and its
+            snapshot stored for the next start.
         """
         if self.__myObserver:
             self.__myObserver.stop()
             self.__myObserver.join()
+            for thread in self.__myReconcilers:
+                thread.join()
+            self.__myReconcilers = []
+            with self.__myLock:
+                self.__myObserver = None
+                self.__myWatchCounts.clear()
+                for root in self.__myRoots.values():
+                    root.watches = []
+                roots = list(self.__myRoots.values())
+            if self.__myReconcile:
+                for root in roots:
+                    take_snapshot(root.path, root.filter, root.recursive)
     
     def run(self):
         """
@@ -65,4 +326,126 @@ class FileWatcher:
             while True:
                 time.sleep(1)
         except KeyboardInterrupt:
-            self.stop()
\ No newline at end of file
+            self.stop()
+    
+    def __add(self, thePath, theRecursive, theFilter, theHandler):
+        """
+        Register a root and schedule it if the observer is running.
+        
+        Args:
+            thePath: The directory path to monitor.
+            theRecursive: Whether to monitor subdirectories recursively.
+            theFilter: PathFilter of the root, or None.
+            theHandler: Handler scheduled for the root's watches.
+        
+        Returns:
+            bool: True if the root was added, False if it is already watched.
+        """
+        key = os.path.normpath(thePath)
+        with self.__myLock:
+            if key in self.__myRoots:
+                return False
+            root = _WatchedRoot(thePath, theRecursive, theFilter, theHandler)
+            self.__myRoots[key] = root
+            if self.__myObserver:
+                self.__schedule_root(root)
+                self.__start_reconcile([root])
+        return True
+    
+    def __start_reconcile(self, theRoots):
+        """
+        Reconcile newly watched roots with their snapshots on a background thread.
+        
+        Args:
+            theRoots: The _WatchedRoot instances to reconcile.
+        """
+        if not self.__myReconcile or not theRoots:
+            return
+        thread = threading.Thread(target=self.__reconcile, args=(theRoots,),
+                                  name='FileWatcherReconcile', daemon=True)
+        self.__myReconcilers.append(thread)
+        thread.start()
+    
+    def __reconcile(self, theRoots):
+        """
+        Reconciler body. Dispatches the offline changes of each root to its handler.
+        
+        Args:
+            theRoots: The _WatchedRoot instances to reconcile.
+        """
+        try:
+            for root in theRoots:
+                for event in reconcile_root(root.path, root.filter, root.recursive):
+                    root.handler.dispatch(event)
+        except Exception as e:
+            print(f"Error reconciling watched directories: {e}")
+        finally:
+            close_connection()
+    
+    def __schedule_root(self, theRoot):
+        """
+        Schedule the watches of a root, pruning its excluded directories.
+        
+        Args:
+            theRoot: The _WatchedRoot to schedule.
+        """
+        if theRoot.recursive and theRoot.filter and theRoot.filter.has_excludes():
+            theRoot.scheduler = _SubtreeScheduler(
+                lambda thePath: self.__schedule_tree(theRoot, thePath), theRoot.filter)
+            self.__schedule_tree(theRoot, theRoot.path)
+        else:
+            self.__schedule(theRoot, theRoot.handler, theRoot.path, theRoot.recursive)
+    
+    def __schedule_tree(self, theRoot, thePath):
+        """
+        Schedule the planned watches for a directory tree of a root.
+        
+        Args:
+            theRoot: The _WatchedRoot the tree belongs to.
+            thePath: Directory at the top of the tree.
+        """
+        with self.__myLock:
+            if self.__myRoots.get(os.path.normpath(theRoot.path)) is not theRoot:
+                # The root was removed while the directory was being created
+                return
+            for path, recursive in plan_watches(thePath, theRoot.filter):
+                self.__schedule(theRoot, theRoot.handler, path, recursive)
+                if not recursive:
+                    self.__schedule(theRoot, theRoot.scheduler, path, False)
+    
+    def __schedule(self, theRoot, theHandler, thePath, theRecursive):
+        """
+        Schedule one watch for a root and count its users.
+        
+        Args:
+            theRoot: The _WatchedRoot the watch belongs to.
+            theHandler: The handler receiving the watch's events.
+            thePath: The directory to watch.
+            theRecursive: Whether the watch is recursive.
+        """
+        watch = self.__myObserver.schedule(theHandler, thePath, recursive=theRecursive)
+        theRoot.watches.append((theHandler, watch))
+        self.__myWatchCounts[watch] = self.__myWatchCounts.get(watch, 0) + 1
+    
+    def __unschedule_root(self, theRoot):
+        """
+        Remove a root's handlers, unscheduling watches no other root uses.
+        
+        Args:
+            theRoot: The _WatchedRoot to unschedule.
+        """
+        if not self.__myObserver:
+            return
+        for handler, watch in theRoot.watches:
+            count = self.__myWatchCounts.get(watch, 0) - 1
+            try:
+                if count > 0:
+                    self.__myWatchCounts[watch] = count
+                    self.__myObserver.remove_handler_for_watch(handler, watch)
+                else:
+                    self.__myWatchCounts.pop(watch, None)
+                    self.__myObserver.unschedule(watch)
+            except KeyError:
+                # Already gone, e.g. after its directory was deleted
+                pass
+        theRoot.watches = []
@@ -0,0 +1,535 @@
+import collections
+import contextlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from .database import get_connection, get_database_path, notify_data_changed
+
+NANOSECONDS = 1000000000
+
+# Length in days of each supported partition period
+PERIODS = {'day': 1, 'week': 7}
+
+PARTITION_PATTERN = re.compile(r'^events-(\d{8})-(\d{8})\.db$')
+
+PARTITION_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS part.events (
+        id INTEGER PRIMARY KEY,
+        filename TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        file_extension TEXT NOT NULL,
+        event TEXT NOT NULL,
+        event_timestamp INTEGER NOT NULL,
+        file_size INTEGER,
+        user TEXT,
+        dest_path TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS part.idx_events_timestamp ON events (event_timestamp)',
+    'CREATE INDEX IF NOT EXISTS part.idx_events_event_timestamp ON events (event, event_timestamp)',
+    'CREATE INDEX IF NOT EXISTS part.idx_events_extension_timestamp ON events (file_extension, event_timestamp)',
+    'CREATE INDEX IF NOT EXISTS part.idx_events_path ON events (file_path)',
+]
+
+# Per-extension counts of a partition, maintained like the main database's
+PARTITION_CATALOG = [
+    '''
+    CREATE TABLE part.extension_catalog (
+        file_extension TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    '''
+    INSERT INTO part.extension_catalog (file_extension, count)
+    SELECT file_extension, COUNT(*) FROM part.events GROUP BY file_extension
+    ''',
+    '''
+    CREATE TRIGGER part.events_catalog_insert AFTER INSERT ON events
+    BEGIN
+        INSERT INTO extension_catalog (file_extension, count) VALUES (NEW.file_extension, 1)
+        ON CONFLICT (file_extension) DO UPDATE SET count = count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER part.events_catalog_delete AFTER DELETE ON events
+    BEGIN
+        UPDATE extension_catalog SET count = count - 1 WHERE file_extension = OLD.file_extension;
+        DELETE FROM extension_catalog WHERE file_extension = OLD.file_extension AND count <= 0;
+    END
+    ''',
+]
+
+# A partition file and the [start, end) range of epoch nanoseconds it holds
+Partition = collections.namedtuple('Partition', ['path', 'start', 'end'])
+
+def _to_ns(theDateTime):
+    """
+    Convert a local datetime to epoch nanoseconds.
+
+    Args:
+        theDateTime: Naive local datetime.
+
+    Returns:
+        int: Epoch nanoseconds.
+    """
+    return int(theDateTime.timestamp()) * NANOSECONDS
+
+def _period_start(theDateTime, thePeriod):
+    """
+    Find the start of the period containing a moment.
+
+    Days start at local midnight and weeks on Monday.
+
+    Args:
+        theDateTime: Naive local datetime.
+        thePeriod: 'day' or 'week'.
+
+    Returns:
+        datetime: Local midnight starting the period.
+    """
+    start = theDateTime.replace(hour=0, minute=0, second=0, microsecond=0)
+    if thePeriod == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+def partition_directory():
+    """
+    Gets the directory holding the partitions of the configured database.
+
+    Returns:
+        str: '<database path>.partitions'.
+    """
+    return f"{get_database_path()}.partitions"
+
+def list_partitions(theStart=None, theEnd=None):
+    """
+    List the partition files, optionally only those overlapping a time range.
+
+    Args:
+        theStart: Epoch nanoseconds of the start of the range. Defaults to None (unbounded).
+        theEnd: Epoch nanoseconds of the end of the range, exclusive. Defaults to None (unbounded).
+
+    Returns:
+        list: Partition tuples, oldest first.
+    """
+    directory = partition_directory()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if not match:
+            continue
+        start = _to_ns(datetime.strptime(match.group(1), '%Y%m%d'))
+        end = _to_ns(datetime.strptime(match.group(2), '%Y%m%d'))
+        if theStart is not None and end <= theStart:
+            continue
+        if theEnd is not None and start >= theEnd:
+            continue
+        partitions.append(Partition(os.path.join(directory, name), start, end))
+    partitions.sort(key=lambda partition: partition.start)
+    return partitions
+
+@contextlib.contextmanager
+def open_partitions(theStart=None, theEnd=None):
+    """
+    Open read-only connections to every partition overlapping a time range.
+
+    Args:
+        theStart: Epoch nanoseconds of the start of the range. Defaults to None (unbounded).
+        theEnd: Epoch nanoseconds of the end of the range, exclusive. Defaults to None (unbounded).
+
+    Yields:
+        list: Connections, newest partition first. They are closed on exit.
+    """
+    connections = []
+    try:
+        for partition in reversed(list_partitions(theStart, theEnd)):
+            try:
+                connections.append(sqlite3.connect(f"file:{partition.path}?mode=ro", uri=True))
+            except sqlite3.Error as e:
+                print(f"Error reading partition {partition.path}: {e}")
+        yield connections
+    finally:
+        for conn in connections:
+            conn.close()
+
+def query_partitions(theSql, theParams=(), theStart=None, theEnd=None):
+    """
+    Run a read-only query against every partition overlapping a time range.
+
+    Args:
+        theSql: SELECT statement over the events table.
+        theParams: Parameters of the statement.
+        theStart: Epoch nanoseconds of the start of the range. Defaults to None (unbounded).
+        theEnd: Epoch nanoseconds of the end of the range, exclusive. Defaults to None (unbounded).
+
+    Returns:
+        list: One list of result rows per partition, newest partition first.
+    """
+    results = []
+    with open_partitions(theStart, theEnd) as connections:
+        for conn in connections:
+            try:
+                results.append(conn.execute(theSql, theParams).fetchall())
+            except sqlite3.Error as e:
+                print(f"Error reading partition: {e}")
+    return results
+
+def _extension_rows(theConnection):
+    """
+    Read the number of events per file extension of one partition.
+
+    Partitions written before they carried an extension catalog are
+    counted from their events instead.
+
+    Args:
+        theConnection: Connection to the partition.
+
+    Returns:
+        list: (file_extension, count) rows.
+    """
+    try:
+        return theConnection.execute('SELECT file_extension, count FROM extension_catalog').fetchall()
+    except sqlite3.OperationalError:
+        return theConnection.execute(
+            'SELECT file_extension, COUNT(*) FROM events GROUP BY file_extension').fetchall()
+
+def _partition_extension_rows(thePath):
+    """
+    Read the number of events per file extension of a partition file.
+
+    Args:
+        thePath: Path of the partition file.
+
+    Returns:
+        list: (file_extension, count) rows, empty if the file cannot be read.
+    """
+    try:
+        with contextlib.closing(sqlite3.connect(f"file:{thePath}?mode=ro", uri=True)) as conn:
+            return _extension_rows(conn)
+    except sqlite3.Error as e:
+        print(f"Error reading partition {thePath}: {e}")
+        return []
+
+def count_partition_extensions(theDirectory):
+    """
+    Count the events per file extension of every partition file in a directory.
+
+    Only used to fill partition_extensions when it is created; the table
+    is kept up to date from then on.
+
+    Args:
+        theDirectory: The partition directory.
+
+    Returns:
+        dict: Event count keyed by file extension.
+    """
+    counts = {}
+    try:
+        names = os.listdir(theDirectory)
+    except FileNotFoundError:
+        return counts
+    for name in names:
+        if PARTITION_PATTERN.match(name):
+            for extension, count in _partition_extension_rows(os.path.join(theDirectory, name)):
+                counts[extension] = counts.get(extension, 0) + count
+    return counts
+
+def _adjust_partition_extensions(theConnection, theRows, theSign=1):
+    """
+    Add events moved into partitions to partition_extensions, or subtract removed ones.
+
+    Args:
+        theConnection: Connection to the main database. The caller commits.
+        theRows: (file_extension, count) rows of the events.
+        theSign: 1 when the events were added to partitions, -1 when removed.
+    """
+    theConnection.executemany('''
+        INSERT INTO partition_extensions (file_extension, count) VALUES (?, ?)
+        ON CONFLICT (file_extension) DO UPDATE SET count = count + excluded.count
+    ''', [(extension, theSign * count) for extension, count in theRows])
+    theConnection.execute('DELETE FROM partition_extensions WHERE count <= 0')
+
+def _forget_partition_events(theRows):
+    """
+    Subtract events removed from a partition from partition_extensions.
+
+    Args:
+        theRows: (file_extension, count) rows of the removed events.
+    """
+    if not theRows:
+        return
+    with get_connection() as conn:
+        if conn is None:
+            return
+        with conn:
+            _adjust_partition_extensions(conn, theRows, -1)
+
+def roll_partitions(thePeriod='day'):
+    """
+    Move events from before the current period into per-period partition files.
+
+    The main database keeps only the current period, so it stays small,
+    while older periods become files that retention can drop without a
+    DELETE or VACUUM.
+
+    Args:
+        thePeriod: 'day' or 'week'. Defaults to 'day'.
+
+    Returns:
+        int: Number of events moved, or -1 if an error occurred.
+
+    Note:
+        Rows are copied with INSERT OR IGNORE before being deleted, so a
+        roll interrupted between the two steps is completed by the next one.
+    """
+    if thePeriod not in PERIODS:
+        raise ValueError(f"Unknown partition period: {thePeriod}")
+    cutoff = _to_ns(_period_start(datetime.now(), thePeriod))
+    moved = 0
+
+    with get_connection() as conn:
+        if conn is None:
+            return -1
+        try:
+            while True:
+                oldest = conn.execute(
+                    'SELECT MIN(event_timestamp) FROM events WHERE event_timestamp < ?',
+                    (cutoff,)).fetchone()[0]
+                if oldest is None:
+                    return moved
+                start = _period_start(datetime.fromtimestamp(oldest / NANOSECONDS), thePeriod)
+                end = start + timedelta(days=PERIODS[thePeriod])
+                moved += _move_range(conn, start, end)
+        except Exception as e:
+            print(f"Error rolling partitions: {e}")
+            return -1
+
+def _move_range(theConnection, theStart, theEnd):
+    """
+    Move the events of one period from the main database into its partition.
+
+    Args:
+        theConnection: Connection to the main database.
+        theStart: Local datetime starting the period.
+        theEnd: Local datetime ending the period, exclusive.
+
+    Returns:
+        int: Number of events moved.
+    """
+    os.makedirs(partition_directory(), exist_ok=True)
+    name = f"events-{theStart:%Y%m%d}-{theEnd:%Y%m%d}.db"
+    bounds = (_to_ns(theStart), _to_ns(theEnd))
+
+    theConnection.execute('ATTACH DATABASE ? AS part', (os.path.join(partition_directory(), name),))
+    try:
+        for statement in PARTITION_SCHEMA:
+            theConnection.execute(statement)
+        if not theConnection.execute(
+                "SELECT 1 FROM part.sqlite_master WHERE name = 'extension_catalog'").fetchall():
+            for statement in PARTITION_CATALOG:
+                theConnection.execute(statement)
+            theConnection.commit()
+        theConnection.execute('BEGIN IMMEDIATE')
+        try:
+            # Rows already in the partition are skipped by the copy below
+            extensions = theConnection.execute('''
+                SELECT file_extension, COUNT(*) FROM main.events
+                WHERE event_timestamp >= ? AND event_timestamp < ?
+                  AND id NOT IN (SELECT id FROM part.events)
+                GROUP BY file_extension
+            ''', bounds).fetchall()
+            # The copy's row count is used since DELETE through the compact
+            # layout's view trigger reports no changes
+            moved = theConnection.execute('''
+                INSERT OR IGNORE INTO part.events
+                SELECT id, filename, file_path, file_extension, event,
+                       event_timestamp, file_size, user, dest_path
+                FROM main.events WHERE event_timestamp >= ? AND event_timestamp < ?
+            ''', bounds).rowcount
+            theConnection.execute(
+                'DELETE FROM main.events WHERE event_timestamp >= ? AND event_timestamp < ?',
+                bounds)
+            _adjust_partition_extensions(theConnection, extensions)
+            theConnection.commit()
+            notify_data_changed()
+        except Exception:
+            theConnection.rollback()
+            raise
+    finally:
+        theConnection.execute('DETACH DATABASE part')
+    return moved
+
+def _count_partition(thePartition):
+    """
+    Count the events held by a partition.
+
+    Args:
+        thePartition: The Partition to count.
+
+    Returns:
+        int: Number of events, 0 if the file cannot be read.
+    """
+    rows = query_partitions('SELECT COUNT(*) FROM events', (), thePartition.start, thePartition.end)
+    return rows[0][0][0] if rows else 0
+
+def _drop_partition(thePartition):
+    """
+    Delete a partition file together with its journal files.
+
+    Args:
+        thePartition: The Partition to delete.
+
+    Returns:
+        int: Number of events the partition held.
+    """
+    rows = _partition_extension_rows(thePartition.path)
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(thePartition.path + suffix)
+    _forget_partition_events(rows)
+    notify_data_changed()
+    return sum(count for _, count in rows)
+
+def drop_all_partitions():
+    """
+    Delete every partition file.
+
+    Returns:
+        int: Number of partitions deleted.
+    """
+    partitions = list_partitions()
+    for partition in partitions:
+        _drop_partition(partition)
+    return len(partitions)
+
+def _delete_where(theConnection, theWhere, theParams):
+    """
+    Delete the events of one database matching a condition.
+
+    Args:
+        theConnection: Connection to the database.
+        theWhere: SQL condition over the events table.
+        theParams: Parameters of the condition.
+
+    Returns:
+        int: Number of events deleted.
+    """
+    return sum(count for _, count in _delete_extensions_where(theConnection, theWhere, theParams))
+
+def _delete_extensions_where(theConnection, theWhere, theParams):
+    """
+    Delete the events of one database matching a condition, counting them per extension.
+
+    Args:
+        theConnection: Connection to the database.
+        theWhere: SQL condition over the events table.
+        theParams: Parameters of the condition.
+
+    Returns:
+        list: (file_extension, count) rows of the deleted events.
+    """
+    with theConnection:
+        # Counted first since DELETE through the compact layout's view reports no changes
+        rows = theConnection.execute(
+            f'SELECT file_extension, COUNT(*) FROM events WHERE {theWhere} GROUP BY file_extension',
+            theParams).fetchall()
+        if rows:
+            theConnection.execute(f'DELETE FROM events WHERE {theWhere}', theParams)
+    if rows:
+        notify_data_changed()
+    return rows
+
+def _delete_from_partition(thePartition, theWhere, theParams):
+    """
+    Delete the events of a partition matching a condition.
+
+    Args:
+        thePartition: The Partition to delete from.
+        theWhere: SQL condition over the events table.
+        theParams: Parameters of the condition.
+
+    Returns:
+        int: Number of events deleted.
+    """
+    with contextlib.closing(sqlite3.connect(thePartition.path)) as conn:
+        rows = _delete_extensions_where(conn, theWhere, theParams)
+    _forget_partition_events(rows)
+    return sum(count for _, count in rows)
+
+def apply_retention(theMaxAgeDays=None, theMaxRows=None, theMaxBytes=None):
+    """
+    Expire old events by age, total row count and total size.
+
+    Whole partitions are dropped wherever possible. Rows are only deleted
+    individually from the single partition, or the main database, that
+    straddles an age or row count limit.
+
+    Args:
+        theMaxAgeDays: Keep only events newer than this many days. Defaults to None.
+        theMaxRows: Keep at most this many of the newest events. Defaults to None.
+        theMaxBytes: Drop the oldest partitions while the main database and
+            its partitions together exceed this many bytes. Defaults to None.
+
+    Returns:
+        int: Number of events removed, or -1 if an error occurred.
+
+    Note:
+        The size limit only drops partitions; the main database file is not
+        shrunk, so it should be rolled into partitions regularly.
+    """
+    removed = 0
+    try:
+        if theMaxAgeDays is not None:
+            cutoff = _to_ns(datetime.now() - timedelta(days=theMaxAgeDays))
+            for partition in list_partitions(theEnd=cutoff):
+                if partition.end <= cutoff:
+                    removed += _drop_partition(partition)
+                else:
+                    removed += _delete_from_partition(partition, 'event_timestamp < ?', (cutoff,))
+            with get_connection() as conn:
+                if conn is None:
+                    return -1
+                removed += _delete_where(conn, 'event_timestamp < ?', (cutoff,))
+
+        if theMaxRows is not None:
+            with get_connection() as conn:
+                if conn is None:
+                    return -1
+                total = conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+            partitions = list_partitions()
+            counts = [_count_partition(partition) for partition in partitions]
+            total += sum(counts)
+            # Drop whole partitions, oldest first, while the rest still fits
+            while partitions and total - counts[0] >= theMaxRows:
+                total -= counts.pop(0)
+                removed += _drop_partition(partitions.pop(0))
+            excess = total - theMaxRows
+            if excess > 0:
+                oldest = 'id IN (SELECT id FROM events ORDER BY event_timestamp, id LIMIT ?)'
+                if partitions:
+                    removed += _delete_from_partition(partitions[0], oldest, (excess,))
+                else:
+                    with get_connection() as conn:
+                        removed += _delete_where(conn, oldest, (excess,))
+
+        if theMaxBytes is not None:
+            database_path = get_database_path()
+            total = sum(os.path.getsize(database_path + suffix)
+                        for suffix in ('', '-wal') if os.path.exists(database_path + suffix))
+            partitions = list_partitions()
+            total += sum(os.path.getsize(partition.path) for partition in partitions)
+            while partitions and total > theMaxBytes:
+                partition = partitions.pop(0)
+                total -= os.path.getsize(partition.path)
+                removed += _drop_partition(partition)
+        return removed
+    except Exception as e:
+        print(f"Error applying retention: {e}")
+        return -1
@@ -0,0 +1,264 @@
+import os
+import re
+
+def _glob_to_regex(thePattern):
+    """
+    Translate a gitignore-style glob into a regular expression fragment.
+
+    '*' and '?' never match a path separator, while '**' matches across
+    directories.
+
+    Args:
+        thePattern: Glob using '/' as the separator.
+
+    Returns:
+        str: Regular expression fragment without anchors.
+    """
+    parts = []
+    i = 0
+    while i < len(thePattern):
+        char = thePattern[i]
+        if thePattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if thePattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            parts.append('[^/]*')
+        elif char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = thePattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = thePattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return ''.join(parts)
+
+def _has_wildcard(thePattern):
+    """
+    Check whether a pattern uses glob wildcards.
+
+    Args:
+        thePattern: The pattern to inspect.
+
+    Returns:
+        bool: True if the pattern contains '*', '?' or '['.
+    """
+    return any(char in thePattern for char in '*?[')
+
+class PathFilter:
+    """
+    Precompiled include/exclude matcher for file system event paths.
+
+    Includes select which files are reported: plain extensions ('.txt')
+    and simple '*.ext' globs become a set of suffixes, other globs are
+    combined into one regular expression over the file name, or over the
+    path relative to the root when they contain '/'. An empty include
+    list accepts every path.
+
+    Excludes follow gitignore conventions: 'node_modules/' matches a
+    directory of that name at any depth, 'build' matches any path
+    component, and patterns containing '/' are anchored to the root.
+    Literal names are checked with a set lookup over the path components,
+    and everything else is combined into a single regular expression.
+    Negated patterns ('!') are not supported.
+
+    Attributes:
+        __myRoot: Directory that anchored patterns are relative to.
+        __mySuffixes: Lower-case suffixes accepted by the includes.
+        __myIncludeRegex: Combined regex for glob includes, or None.
+        __myExcludedNames: Path components excluded wherever they appear.
+        __myExcludedDirNames: Directory names excluded wherever they appear.
+        __myExcludeRegex: Combined regex for the remaining excludes, or None.
+        __myHasIncludes: Whether any include pattern was given.
+    """
+
+    def __init__(self, theIncludes=(), theExcludes=(), theRoot=''):
+        """
+        Compile the include and exclude patterns.
+
+        Args:
+            theIncludes: Extensions or glob patterns of files to report.
+            theExcludes: Gitignore-style patterns of paths to ignore.
+            theRoot: Directory that anchored patterns are relative to.
+                Defaults to '' (patterns match absolute paths).
+        """
+        self.__myRoot = os.path.normpath(theRoot) if theRoot else ''
+        self.__myHasIncludes = False
+        suffixes = set()
+        include_name_regexes = []
+        include_path_regexes = []
+        for pattern in theIncludes:
+            pattern = pattern.strip().replace(os.sep, '/')
+            if not pattern or pattern == 'None':
+                continue
+            self.__myHasIncludes = True
+            if pattern.startswith('*.') and not _has_wildcard(pattern[2:]) and '.' not in pattern[2:]:
+                suffixes.add(pattern[1:].lower())
+            elif pattern.startswith('.') and not _has_wildcard(pattern) and '/' not in pattern:
+                if '.' in pattern[1:]:
+                    # Multi-dot suffixes such as '.tar.gz' are longer than
+                    # the extension splitext() returns, so they match by name
+                    include_name_regexes.append(_glob_to_regex('*' + pattern))
+                else:
+                    suffixes.add(pattern.lower())
+            elif '/' in pattern:
+                include_path_regexes.append(_glob_to_regex(pattern.lstrip('/')))
+            else:
+                include_name_regexes.append(_glob_to_regex(pattern))
+
+        self.__mySuffixes = frozenset(suffixes)
+        include_regexes = [f'(?:.*/)?{regex}' for regex in include_name_regexes]
+        include_regexes += include_path_regexes
+        self.__myIncludeRegex = (
+            re.compile('|'.join(f'(?:{regex})' for regex in include_regexes), re.IGNORECASE)
+            if include_regexes else None
+        )
+
+        names = set()
+        dir_names = set()
+        exclude_regexes = []
+        for pattern in theExcludes:
+            pattern = pattern.strip().replace(os.sep, '/')
+            if not pattern or pattern.startswith('#') or pattern.startswith('!'):
+                continue
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            anchored = '/' in pattern
+            pattern = pattern.lstrip('/')
+            if not pattern:
+                continue
+            if not anchored and not _has_wildcard(pattern):
+                (dir_names if dir_only else names).add(pattern)
+                continue
+            prefix = '^' if anchored else '(?:^|/)'
+            suffix = '/' if dir_only else '(?:/|$)'
+            exclude_regexes.append(prefix + _glob_to_regex(pattern) + suffix)
+
+        self.__myExcludedNames = frozenset(names)
+        self.__myExcludedDirNames = frozenset(dir_names)
+        self.__myExcludeRegex = (
+            re.compile('|'.join(f'(?:{regex})' for regex in exclude_regexes))
+            if exclude_regexes else None
+        )
+
+    @staticmethod
+    def parse_patterns(theText):
+        """
+        Split a comma or whitespace separated list of patterns.
+
+        Args:
+            theText: Text such as '.py, .txt' or 'node_modules/ .git/'.
+
+        Returns:
+            list: The individual patterns, or an empty list for empty text.
+        """
+        if not theText:
+            return []
+        return [pattern for pattern in re.split(r'[,\s]+', theText) if pattern]
+
+    def has_excludes(self):
+        """
+        Check whether any exclude pattern was given.
+
+        Returns:
+            bool: True if the filter excludes anything.
+        """
+        return bool(self.__myExcludedNames or self.__myExcludedDirNames or self.__myExcludeRegex)
+
+    def is_empty(self):
+        """
+        Check whether the filter accepts every path.
+
+        Returns:
+            bool: True if there are neither includes nor excludes.
+        """
+        return not self.__myHasIncludes and not self.has_excludes()
+
+    def matches(self, thePath, theIsDirectory=False):
+        """
+        Check whether an event path should be reported.
+
+        Args:
+            thePath: Path of the file or directory.
+            theIsDirectory: Whether the path is a directory.
+
+        Returns:
+            bool: True if the path is included and not excluded.
+        """
+        relative = self.__relative(thePath)
+        if self.__is_excluded(relative, theIsDirectory):
+            return False
+        if not self.__myHasIncludes:
+            return True
+
+        name = relative.rpartition('/')[2]
+        if os.path.splitext(name)[1].lower() in self.__mySuffixes:
+            return True
+        return bool(self.__myIncludeRegex and self.__myIncludeRegex.fullmatch(relative))
+
+    def excludes_directory(self, thePath):
+        """
+        Check whether a directory and everything below it is excluded.
+
+        Args:
+            thePath: Path of the directory.
+
+        Returns:
+            bool: True if the directory is excluded.
+        """
+        return self.__is_excluded(self.__relative(thePath), True)
+
+    def __relative(self, thePath):
+        """
+        Convert a path to a '/' separated path relative to the root.
+
+        Args:
+            thePath: The path to convert.
+
+        Returns:
+            str: The relative path, or the whole path if it is outside the root.
+        """
+        path = os.fsdecode(thePath)
+        root = self.__myRoot
+        if root and path.startswith(root) and path[len(root):len(root) + 1] in (os.sep, ''):
+            path = path[len(root) + 1:]
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        return path.lstrip('/')
+
+    def __is_excluded(self, theRelative, theIsDirectory):
+        """
+        Check a relative path against the exclude patterns.
+
+        Args:
+            theRelative: '/' separated path relative to the root.
+            theIsDirectory: Whether the path is a directory.
+
+        Returns:
+            bool: True if any exclude pattern matches.
+        """
+        if not theRelative:
+            return False
+        components = theRelative.split('/')
+        if self.__myExcludedNames and not self.__myExcludedNames.isdisjoint(components):
+            return True
+        if self.__myExcludedDirNames:
+            directories = components if theIsDirectory else components[:-1]
+            if not self.__myExcludedDirNames.isdisjoint(directories):
+                return True
+        if self.__myExcludeRegex:
+            target = theRelative + '/' if theIsDirectory else theRelative
+            return self.__myExcludeRegex.search(target) is not None
+        return False
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+class QueryCache:
+    """
+    Least recently used cache of query results, invalidated by generation.
+
+    Every entry remembers the data generation it was computed at (see
+    database.get_data_generation). A lookup made at any other generation
+    is a miss, so results never outlive a write to the database. The
+    cache is bounded by both its number of entries and the rows they
+    hold, and a result larger than the row limit is never cached.
+
+    Attributes:
+        __myMaxSize: Maximum number of entries kept.
+        __myMaxRows: Maximum number of rows held across all entries.
+        __myLock: Guards the entries and counters.
+        __myEntries: (generation, result, rows) keyed by query key, least recently used first.
+        __myRows: Number of rows held across all entries.
+        __myHits: Number of lookups answered from the cache.
+        __myMisses: Number of lookups that had to run the query.
+    """
+
+    def __init__(self, theMaxSize=64, theMaxRows=50000):
+        """
+        Initialize the cache.
+
+        Args:
+            theMaxSize: Maximum number of results kept. Defaults to 64.
+            theMaxRows: Maximum number of rows held across all results.
+                Defaults to 50000.
+        """
+        self.__myMaxSize = theMaxSize
+        self.__myMaxRows = theMaxRows
+        self.__myLock = threading.Lock()
+        self.__myEntries = OrderedDict()
+        self.__myRows = 0
+        self.__myHits = 0
+        self.__myMisses = 0
+
+    def get(self, theKey, theGeneration):
+        """
+        Look up a result.
+
+        Args:
+            theKey: Hashable key of the query.
+            theGeneration: The current data generation.
+
+        Returns:
+            The cached result, or None on a miss.
+        """
+        with self.__myLock:
+            entry = self.__myEntries.get(theKey)
+            if entry is None or entry[0] != theGeneration:
+                self.__myMisses += 1
+                return None
+            self.__myEntries.move_to_end(theKey)
+            self.__myHits += 1
+            return entry[1]
+
+    def put(self, theKey, theGeneration, theResult, theRows=1):
+        """
+        Store a result, evicting the least recently used ones while the cache is full.
+
+        Args:
+            theKey: Hashable key of the query.
+            theGeneration: The data generation read before the query ran.
+            theResult: The query's result. Must not be modified afterwards.
+            theRows: Number of rows in the result. Defaults to 1.
+        """
+        with self.__myLock:
+            previous = self.__myEntries.pop(theKey, None)
+            if previous is not None:
+                self.__myRows -= previous[2]
+            if theRows > self.__myMaxRows:
+                return
+            self.__myEntries[theKey] = (theGeneration, theResult, theRows)
+            self.__myRows += theRows
+            while len(self.__myEntries) > self.__myMaxSize or self.__myRows > self.__myMaxRows:
+                self.__myRows -= self.__myEntries.popitem(last=False)[1][2]
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self.__myLock:
+            self.__myEntries.clear()
+            self.__myRows = 0
+            self.__myHits = 0
+            self.__myMisses = 0
+
+    def stats(self):
+        """
+        Get the cache's counters.
+
+        Returns:
+            dict: 'hits', 'misses', 'size' (number of entries held) and
+                'rows' (number of rows they hold).
+        """
+        with self.__myLock:
+            return {'hits': self.__myHits, 'misses': self.__myMisses,
+                    'size': len(self.__myEntries), 'rows': self.__myRows}
@@ -0,0 +1,151 @@
+import concurrent.futures
+import threading
+from .database import get_connection
+
+class QueryCancelled(Exception):
+    """
+    Raised by the future of a query that was superseded or cancelled.
+    """
+
+class QueryRunner:
+    """
+    Runs database queries on a small worker pool, keeping only the latest.
+
+    Every submit() supersedes the queries submitted before it. Superseded
+    queries that have not started are skipped, and those already running
+    are stopped with sqlite3's Connection.interrupt() on the worker's
+    connection, which makes the running statement fail with
+    sqlite3.OperationalError. A progress handler also aborts statements
+    a superseded query starts after the interrupt was sent. The future of
+    a superseded query raises QueryCancelled, even if its function caught
+    the interruption and returned normally. Results are returned through
+    concurrent.futures.Future objects, which a Tk window can poll with
+    after() so nothing blocks the UI thread.
+
+    Attributes:
+        __myExecutor: The worker pool.
+        __myLock: Guards __myGeneration and __myActive.
+        __myGeneration: Number of the most recently submitted query.
+        __myActive: (generation, connection) of each running query, keyed by worker thread id.
+    """
+
+    # SQLite virtual machine instructions between checks for a newer query
+    PROGRESS_INTERVAL = 10000
+
+    def __init__(self, theWorkers=2):
+        """
+        Initialize the runner.
+
+        Args:
+            theWorkers: Number of worker threads. Defaults to 2, so a new
+                query can start while a superseded one is being interrupted.
+        """
+        self.__myExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=theWorkers, thread_name_prefix='QueryRunner')
+        self.__myLock = threading.Lock()
+        self.__myGeneration = 0
+        self.__myActive = {}
+
+    def submit(self, theFunction, *theArgs):
+        """
+        Run a query function on the pool, superseding every earlier query.
+
+        Args:
+            theFunction: Function performing the query on the calling
+                thread's pooled connection.
+            *theArgs: Arguments for theFunction.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's result,
+                or raises QueryCancelled if superseded or cancelled before it finished.
+        """
+        with self.__myLock:
+            self.__myGeneration += 1
+            generation = self.__myGeneration
+            self.__interrupt_before(generation)
+        future = self.__myExecutor.submit(self.__run, generation, theFunction, theArgs)
+        future.generation = generation
+        return future
+
+    def cancel(self):
+        """
+        Cancel every submitted query.
+        """
+        with self.__myLock:
+            self.__myGeneration += 1
+            self.__interrupt_before(self.__myGeneration)
+
+    def is_current(self, theFuture):
+        """
+        Check whether a future belongs to the latest submitted query.
+
+        Args:
+            theFuture: A future returned by submit().
+
+        Returns:
+            bool: True unless a later query was submitted or cancel() was called.
+        """
+        return getattr(theFuture, 'generation', None) == self.__myGeneration
+
+    def shutdown(self):
+        """
+        Cancel every query and stop the worker threads.
+        """
+        self.cancel()
+        self.__myExecutor.shutdown(wait=False, cancel_futures=True)
+
+    def __interrupt_before(self, theGeneration):
+        """
+        Interrupt the running queries older than a generation.
+
+        Must be called with __myLock held, so a worker cannot move on to a
+        newer query on the same connection while it is being interrupted.
+
+        Args:
+            theGeneration: The generation that supersedes the others.
+        """
+        for generation, conn in self.__myActive.values():
+            if generation < theGeneration:
+                conn.interrupt()
+
+    def __run(self, theGeneration, theFunction, theArgs):
+        """
+        Worker body. Registers the worker's connection so it can be interrupted.
+
+        Args:
+            theGeneration: Generation of this query.
+            theFunction: The query function.
+            theArgs: Arguments for theFunction.
+
+        Returns:
+            The function's result.
+
+        Raises:
+            QueryCancelled: If a newer query was submitted, or cancel() was
+                called, before this one finished.
+        """
+        worker = threading.get_ident()
+        with self.__myLock:
+            if theGeneration != self.__myGeneration:
+                raise QueryCancelled()
+            conn = get_connection()
+            if conn is not None:
+                self.__myActive[worker] = (theGeneration, conn)
+                conn.set_progress_handler(lambda: theGeneration != self.__myGeneration,
+                                          self.PROGRESS_INTERVAL)
+        try:
+            result = theFunction(*theArgs)
+        except Exception as e:
+            if theGeneration != self.__myGeneration:
+                raise QueryCancelled() from e
+            raise
+        finally:
+            with self.__myLock:
+                self.__myActive.pop(worker, None)
+            if conn is not None:
+                conn.set_progress_handler(None, 0)
+        # Functions such as query_events catch the interruption and return
+        # an empty result, which must not be mistaken for a real one
+        if theGeneration != self.__myGeneration:
+            raise QueryCancelled()
+        return result
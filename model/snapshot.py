@@ -0,0 +1,237 @@
+import concurrent.futures
+import os
+import time
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent
+from .database import get_connection
+
+# Directories scanned concurrently. os.scandir releases the GIL while it
+# waits on the file system, so threads overlap the directory reads.
+SCAN_WORKERS = 16
+
+def _scan_directory(thePath, thePrefixLength, theFilter):
+    """
+    List the files and subdirectories of one directory.
+
+    Args:
+        thePath: The directory to list.
+        thePrefixLength: Length of the root path prefix stripped from file paths.
+        theFilter: PathFilter whose excluded directories are skipped, or None.
+
+    Returns:
+        tuple: (files, directories, readable) where files maps relative
+            paths to (size, mtime, inode) and directories lists the
+            absolute paths of the subdirectories to scan.
+    """
+    files = {}
+    directories = []
+    try:
+        with os.scandir(thePath) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (theFilter and theFilter.excludes_directory(entry.path)):
+                            directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        files[entry.path[thePrefixLength:]] = (
+                            stat.st_size, stat.st_mtime_ns, entry.inode())
+                except OSError:
+                    # Removed while being listed
+                    continue
+    except OSError:
+        return files, directories, False
+    return files, directories, True
+
+def scan_tree(thePath, theFilter=None, theRecursive=True, theWorkers=SCAN_WORKERS):
+    """
+    Record the size, modification time and inode of every file in a tree.
+
+    Each directory is listed by its own task on a thread pool, and the
+    subdirectories it finds are queued as new tasks, so wide trees are
+    read by many workers at once.
+
+    Args:
+        thePath: Root of the tree.
+        theFilter: PathFilter whose excluded directories are skipped. Defaults to None.
+        theRecursive: Whether subdirectories are scanned. Defaults to True.
+        theWorkers: Number of directories listed concurrently. Defaults to SCAN_WORKERS.
+
+    Returns:
+        tuple: (files, unreadable) where files maps paths relative to the
+            root to (size, mtime, inode) and unreadable lists the relative
+            paths of directories that could not be listed.
+    """
+    prefix_length = len(os.path.join(thePath, ''))
+    files = {}
+    unreadable = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=theWorkers,
+                                               thread_name_prefix='Snapshot') as executor:
+        pending = {executor.submit(_scan_directory, thePath, prefix_length, theFilter): thePath}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                found, directories, readable = future.result()
+                files.update(found)
+                if not readable:
+                    unreadable.append(path[prefix_length:])
+                if theRecursive:
+                    for directory in directories:
+                        pending[executor.submit(_scan_directory, directory, prefix_length,
+                                                theFilter)] = directory
+    return files, unreadable
+
+def load_snapshot(theRoot):
+    """
+    Load the stored snapshot of a watched root.
+
+    Args:
+        theRoot: The watched directory.
+
+    Returns:
+        dict: (size, mtime, inode) keyed by relative path, or None if the
+            root has no snapshot or an error occurred.
+    """
+    root = os.path.normpath(theRoot)
+    with get_connection() as conn:
+        if conn is None:
+            return None
+        try:
+            if conn.execute('SELECT 1 FROM snapshot_roots WHERE root = ?', (root,)).fetchone() is None:
+                return None
+            rows = conn.execute('SELECT path, size, mtime, inode FROM snapshot_files WHERE root = ?',
+                                (root,))
+            return {path: (size, mtime, inode) for path, size, mtime, inode in rows}
+        except Exception as e:
+            print(f"Error loading snapshot: {e}")
+            return None
+
+def save_snapshot(theRoot, theFiles):
+    """
+    Replace the stored snapshot of a watched root.
+
+    Args:
+        theRoot: The watched directory.
+        theFiles: (size, mtime, inode) keyed by relative path, as returned by scan_tree.
+
+    Returns:
+        bool: True if the snapshot was written, False if an error occurred.
+    """
+    root = os.path.normpath(theRoot)
+    try:
+        with get_connection() as conn:
+            if conn is None:
+                return False
+            with conn:
+                conn.execute('DELETE FROM snapshot_files WHERE root = ?', (root,))
+                conn.execute('INSERT OR REPLACE INTO snapshot_roots (root, scanned_at) VALUES (?, ?)',
+                             (root, time.time_ns()))
+                conn.executemany(
+                    'INSERT INTO snapshot_files (root, path, size, mtime, inode) VALUES (?, ?, ?, ?, ?)',
+                    ((root, path, size, mtime, inode)
+                     for path, (size, mtime, inode) in theFiles.items()))
+            return True
+    except Exception as e:
+        print(f"Error saving snapshot: {e}")
+        return False
+
+def diff_snapshots(theOld, theNew):
+    """
+    Compare two snapshots of the same root.
+
+    A file that disappeared and a file that appeared with the same inode,
+    size and modification time are reported as one move.
+
+    Args:
+        theOld: The stored snapshot.
+        theNew: The current snapshot.
+
+    Returns:
+        list: (event_type, path, dest_path) tuples of relative paths, where
+            dest_path is None for everything but moves.
+    """
+    changes = []
+    created = [path for path in theNew if path not in theOld]
+    deleted = {}
+    for path, entry in theOld.items():
+        current = theNew.get(path)
+        if current is None:
+            deleted[path] = entry
+        elif current != entry:
+            changes.append(('modified', path, None))
+
+    by_inode = {entry: path for path, entry in deleted.items() if entry[2]}
+    for path in created:
+        source = by_inode.pop(theNew[path], None)
+        if source is None:
+            changes.append(('created', path, None))
+        else:
+            del deleted[source]
+            changes.append(('moved', source, path))
+    changes.extend(('deleted', path, None) for path in deleted)
+    return changes
+
+def _keep_unreadable(theFiles, theUnreadable, thePrevious):
+    """
+    Carry the previous entries below unreadable directories into a new scan.
+
+    Args:
+        theFiles: The new scan's files, updated in place.
+        theUnreadable: Relative paths of the directories that could not be listed.
+        thePrevious: The stored snapshot.
+    """
+    prefixes = tuple(os.path.join(path, '') if path else '' for path in theUnreadable)
+    theFiles.update((path, entry) for path, entry in thePrevious.items()
+                    if path.startswith(prefixes))
+
+def reconcile_root(theRoot, theFilter=None, theRecursive=True):
+    """
+    Find the changes made to a root since its snapshot and store a new one.
+
+    The first scan of a root only records its snapshot. Files below
+    directories that could not be listed keep their previous entries, so
+    an unreadable directory is not reported as deleted.
+
+    Args:
+        theRoot: The watched directory.
+        theFilter: PathFilter whose excluded directories are skipped. Defaults to None.
+        theRecursive: Whether subdirectories are scanned. Defaults to True.
+
+    Returns:
+        list: Synthetic watchdog file events describing the changes.
+    """
+    files, unreadable = scan_tree(theRoot, theFilter, theRecursive)
+    previous = load_snapshot(theRoot)
+    events = []
+    if previous is not None:
+        if unreadable:
+            _keep_unreadable(files, unreadable, previous)
+        for event_type, path, dest_path in diff_snapshots(previous, files):
+            path = os.path.join(theRoot, path)
+            if event_type == 'moved':
+                events.append(FileMovedEvent(path, os.path.join(theRoot, dest_path)))
+            elif event_type == 'created':
+                events.append(FileCreatedEvent(path))
+            elif event_type == 'modified':
+                events.append(FileModifiedEvent(path))
+            else:
+                events.append(FileDeletedEvent(path))
+    save_snapshot(theRoot, files)
+    return events
+
+def take_snapshot(theRoot, theFilter=None, theRecursive=True):
+    """
+    Scan a root and store its snapshot without comparing it to the previous one.
+
+    Args:
+        theRoot: The watched directory.
+        theFilter: PathFilter whose excluded directories are skipped. Defaults to None.
+        theRecursive: Whether subdirectories are scanned. Defaults to True.
+
+    Returns:
+        bool: True if the snapshot was written, False if an error occurred.
+    """
+    files, unreadable = scan_tree(theRoot, theFilter, theRecursive)
+    if unreadable:
+        _keep_unreadable(files, unreadable, load_snapshot(theRoot) or {})
+    return save_snapshot(theRoot, files)
@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import shutil
+import time
+
+# Add the parent directory to the path so we can import from the project root
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(ROOT)
+
+from cli import build_parser
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a directory to watch and a database outside of it."""
+        self.test_dir = tempfile.mkdtemp()
+        self.watch_dir = os.path.join(self.test_dir, 'watched')
+        os.makedirs(self.watch_dir)
+        self.db_path = os.path.join(self.test_dir, 'events.db')
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        shutil.rmtree(self.test_dir)
+
+    def test_parse_watch_arguments(self):
+        """Test parsing of the watch command."""
+        args = build_parser().parse_args(
+            ['watch', 'a', 'b', '--include', '.py', '--exclude', '.git/', '--no-recursive'])
+
+        self.assertEqual(args.command, 'watch')
+        self.assertEqual(args.paths, ['a', 'b'])
+        self.assertEqual(args.include, '.py')
+        self.assertEqual(args.exclude, '.git/')
+        self.assertFalse(args.recursive)
+        self.assertIsNone(args.partition)
+
+    def test_maintain_rolls_and_expires_events(self):
+        """Test that the maintain command partitions and applies retention."""
+        old = time.time_ns() - 10 * 86400 * 1000000000
+        # Create the schema, then add events from before the retention limit
+        subprocess.run([sys.executable, 'cli.py', 'maintain', '--db', self.db_path, '--max-rows', '10'],
+                       cwd=ROOT, check=True, capture_output=True, timeout=30)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO events (filename, file_path, file_extension, event, event_timestamp) "
+                "VALUES ('a.txt', '/a.txt', '.txt', 'created', ?)",
+                [(old,), (old + 1,), (time.time_ns(),)])
+
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'maintain', '--db', self.db_path,
+             '--partition', 'day', '--retain-days', '5'],
+            cwd=ROOT, capture_output=True, text=True, timeout=30)
+
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(os.listdir(self.db_path + '.partitions'), [])
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute('SELECT COUNT(*) FROM events').fetchone()[0], 1)
+
+    def test_export_writes_json_lines(self):
+        """Test that the export command writes the filtered events."""
+        subprocess.run([sys.executable, 'cli.py', 'maintain', '--db', self.db_path, '--max-rows', '10'],
+                       cwd=ROOT, check=True, capture_output=True, timeout=30)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO events (filename, file_path, file_extension, event) VALUES (?, ?, ?, ?)",
+                [('a.txt', '/a.txt', '.txt', 'created'), ('b.py', '/b.py', '.py', 'deleted')])
+        output = os.path.join(self.test_dir, 'events.jsonl')
+
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'export', output, '--db', self.db_path, '--extension', '.py'],
+            cwd=ROOT, capture_output=True, text=True, timeout=30)
+
+        self.assertEqual(result.returncode, 0)
+        with open(output, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['filename'] for line in f], ['b.py'])
+
+    def test_import_does_not_load_tkinter(self):
+        """Test that the headless entry point never imports tkinter."""
+        result = subprocess.run(
+            [sys.executable, '-c', "import sys, cli; print('tkinter' in sys.modules)"],
+            cwd=ROOT, capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_watch_persists_events_and_stops_on_sigterm(self):
+        """Test that events are written and SIGTERM shuts the watcher down cleanly."""
+        process = subprocess.Popen(
+            [sys.executable, 'cli.py', 'watch', self.watch_dir, '--db', self.db_path,
+             '--include', '.txt', '--coalesce', '0'],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            self.assertTrue(process.stdout.readline().startswith('Watching'))
+            with open(os.path.join(self.watch_dir, 'note.txt'), 'w') as f:
+                f.write('x')
+            self.assertTrue(process.stdout.readline().startswith('created:'))
+
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=10)
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.stderr.close()
+
+        self.assertEqual(process.returncode, 0)
+        with sqlite3.connect(self.db_path) as conn:
+            events = conn.execute('SELECT filename, event FROM events').fetchall()
+        self.assertIn(('note.txt', 'created'), events)
+
+    def test_watch_rejects_missing_directory(self):
+        """Test that a missing directory is reported with a non-zero exit code."""
+        result = subprocess.run(
+            [sys.executable, 'cli.py', 'watch', os.path.join(self.test_dir, 'missing'),
+             '--db', self.db_path],
+            cwd=ROOT, capture_output=True, text=True, timeout=30)
+
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('Not a directory', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
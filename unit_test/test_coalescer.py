@@ -0,0 +1,152 @@
+import unittest
+import os
+import sys
+import time
+from watchdog.events import (
+    FileCreatedEvent, FileModifiedEvent, FileDeletedEvent, FileClosedEvent,
+    FileMovedEvent, DirModifiedEvent
+)
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.coalescer import EventCoalescer
+
+class TestEventCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.emitted = []
+        self.timestamps = []
+        self.coalescer = EventCoalescer(self.sink, theWindow=60)
+
+    def sink(self, theEvent, theTimestamp):
+        """Helper collecting the emitted events and their timestamps."""
+        self.emitted.append(theEvent)
+        self.timestamps.append(theTimestamp)
+
+    def emitted_types(self):
+        """Helper returning (event_type, path) pairs of the emitted events."""
+        return [(event.event_type, event.src_path) for event in self.emitted]
+
+    def test_repeated_modifies_collapse(self):
+        """Test that many modifies of one path become a single modify."""
+        for _ in range(5):
+            self.coalescer.add(FileModifiedEvent('/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('modified', '/test/a.txt')])
+
+    def test_create_then_delete_cancels(self):
+        """Test that a file created and deleted within the window is dropped."""
+        self.coalescer.add(FileCreatedEvent('/test/tmp.txt'))
+        self.coalescer.add(FileModifiedEvent('/test/tmp.txt'))
+        self.coalescer.add(FileDeletedEvent('/test/tmp.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted, [])
+
+    def test_create_then_modify_stays_created(self):
+        """Test that modifies after a create are folded into the create."""
+        self.coalescer.add(FileCreatedEvent('/test/new.txt'))
+        self.coalescer.add(FileModifiedEvent('/test/new.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('created', '/test/new.txt')])
+
+    def test_modify_then_delete_becomes_delete(self):
+        """Test that a delete replaces earlier modifies."""
+        self.coalescer.add(FileModifiedEvent('/test/a.txt'))
+        self.coalescer.add(FileDeletedEvent('/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('deleted', '/test/a.txt')])
+
+    def test_delete_then_create_becomes_modify(self):
+        """Test that replacing a file is reported as a modify."""
+        self.coalescer.add(FileDeletedEvent('/test/a.txt'))
+        self.coalescer.add(FileCreatedEvent('/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('modified', '/test/a.txt')])
+        self.assertIsInstance(self.emitted[0], FileModifiedEvent)
+
+    def test_create_then_move_becomes_create_at_destination(self):
+        """Test that a file written under a temporary name is one create."""
+        self.coalescer.add(FileCreatedEvent('/test/a.tmp'))
+        self.coalescer.add(FileModifiedEvent('/test/a.tmp'))
+        self.coalescer.add(FileMovedEvent('/test/a.tmp', '/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('created', '/test/a.txt')])
+
+    def test_modify_then_move_keeps_move(self):
+        """Test that a rename supersedes earlier modifies of its source."""
+        self.coalescer.add(FileModifiedEvent('/test/a.txt'))
+        self.coalescer.add(FileMovedEvent('/test/a.txt', '/test/b.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(len(self.emitted), 1)
+        self.assertEqual(self.emitted[0].event_type, 'moved')
+        self.assertEqual(self.emitted[0].dest_path, '/test/b.txt')
+
+    def test_move_then_create_at_source_emits_both(self):
+        """Test that a new file at a renamed path follows the rename."""
+        self.coalescer.add(FileMovedEvent('/test/a.txt', '/test/a.bak'))
+        self.coalescer.add(FileCreatedEvent('/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('moved', '/test/a.txt'), ('created', '/test/a.txt')])
+
+    def test_merged_events_keep_their_timestamps(self):
+        """Test that a merged event keeps the timestamp of the event it came from."""
+        self.coalescer.add(FileCreatedEvent('/test/a.txt'), 100)
+        self.coalescer.add(FileModifiedEvent('/test/a.txt'), 200)
+        self.coalescer.add(FileModifiedEvent('/test/b.txt'), 300)
+        self.coalescer.add(FileDeletedEvent('/test/b.txt'), 400)
+        self.coalescer.flush()
+
+        self.assertEqual(self.emitted_types(), [('created', '/test/a.txt'), ('deleted', '/test/b.txt')])
+        self.assertEqual(self.timestamps, [100, 400])
+
+    def test_paths_and_directories_kept_apart(self):
+        """Test that different paths and file/directory events are not merged."""
+        self.coalescer.add(FileModifiedEvent('/test/a.txt'))
+        self.coalescer.add(FileModifiedEvent('/test/b.txt'))
+        self.coalescer.add(DirModifiedEvent('/test/a.txt'))
+        self.coalescer.flush()
+
+        self.assertEqual(len(self.emitted), 3)
+
+    def test_other_event_types_pass_through(self):
+        """Test that event types that are not coalesced are emitted immediately."""
+        self.coalescer.add(FileClosedEvent('/test/a.txt'))
+
+        self.assertEqual(self.emitted_types(), [('closed', '/test/a.txt')])
+        self.assertEqual(self.coalescer.pending(), 0)
+
+    def test_window_expiry_emits(self):
+        """Test that the flush thread emits events once their window elapses."""
+        coalescer = EventCoalescer(self.sink, theWindow=0.05)
+        coalescer.start()
+        coalescer.add(FileModifiedEvent('/test/a.txt'))
+        coalescer.add(FileModifiedEvent('/test/a.txt'))
+
+        deadline = time.monotonic() + 2
+        while not self.emitted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        coalescer.stop()
+
+        self.assertEqual(self.emitted_types(), [('modified', '/test/a.txt')])
+
+    def test_stop_emits_held_events(self):
+        """Test that stop() flushes events that are still held."""
+        self.coalescer.start()
+        self.coalescer.add(FileCreatedEvent('/test/a.txt'))
+        self.coalescer.stop()
+
+        self.assertEqual(self.emitted_types(), [('created', '/test/a.txt')])
+
+
+if __name__ == '__main__':
+    unittest.main()
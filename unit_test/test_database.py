@@ -3,12 +3,21 @@ import tempfile
 import os
 import sys
 import sqlite3
+import threading
+from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 
 # Add the parent directory to the path so we can import from model
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from model.database import get_connection, _init_db
+from model.database import (
+    get_connection, _init_db, _migrate, configure_database, close_all_connections,
+    enable_compact_schema, is_compact_schema, MIGRATIONS
+)
+from model.db_handler import (
+    insert_events, fetch_all_events, query_events, delete_event, get_event_count,
+    reset_database
+)
 
 class TestDatabase(unittest.TestCase):
     
@@ -18,10 +27,16 @@ class TestDatabase(unittest.TestCase):
         # Clean up any existing test database
         if os.path.exists(self.test_db_path):
             os.remove(self.test_db_path)
+        configure_database()
     
     def tearDown(self):
         """Clean up after each test method."""
+        close_all_connections()
+        configure_database()
         # Clean up test database
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(self.test_db_path + suffix):
+                os.remove(self.test_db_path + suffix)
         if os.path.exists(self.test_db_path):
             os.remove(self.test_db_path)
         if os.path.exists('database.db'):
@@ -30,15 +45,21 @@ class TestDatabase(unittest.TestCase):
             except (PermissionError, FileNotFoundError):
                 pass
     
+    def _mock_connection(self):
+        """Create a mock connection whose schema is already up to date."""
+        mock_conn = Mock()
+        mock_conn.execute.return_value.fetchone.return_value = (len(MIGRATIONS),)
+        return mock_conn
+    
     @patch('model.database.sqlite3.connect')
     def test_get_connection_success(self, mock_connect):
         """Test successful database connection."""
-        mock_conn = Mock()
+        mock_conn = self._mock_connection()
         mock_connect.return_value = mock_conn
         
         result = get_connection()
         
-        mock_connect.assert_called_once_with('database.db')
+        mock_connect.assert_called_once_with('database.db', cached_statements=256, check_same_thread=False)
         self.assertEqual(result, mock_conn)
     
     @patch('model.database.sqlite3.connect')
@@ -50,7 +71,7 @@ class TestDatabase(unittest.TestCase):
         
         result = get_connection()
         
-        mock_connect.assert_called_once_with('database.db')
+        mock_connect.assert_called_once_with('database.db', cached_statements=256, check_same_thread=False)
         mock_print.assert_called_once_with(f"An error occurred while connecting to the database: {error_msg}")
         self.assertIsNone(result)
     
@@ -63,7 +84,7 @@ class TestDatabase(unittest.TestCase):
         
         result = get_connection()
         
-        mock_connect.assert_called_once_with('database.db')
+        mock_connect.assert_called_once_with('database.db', cached_statements=256, check_same_thread=False)
         mock_print.assert_called_once_with(f"An error occurred while connecting to the database: {error_msg}")
         self.assertIsNone(result)
     
@@ -76,43 +97,129 @@ class TestDatabase(unittest.TestCase):
         
         result = get_connection()
         
-        mock_connect.assert_called_once_with('database.db')
+        mock_connect.assert_called_once_with('database.db', cached_statements=256, check_same_thread=False)
         mock_print.assert_called_once_with(f"An error occurred while connecting to the database: {error_msg}")
         self.assertIsNone(result)
     
-    @patch('model.database.get_connection')
-    def test_init_db_success(self, mock_get_connection):
+    def test_init_db_success(self):
         """Test successful database initialization."""
-        mock_conn = Mock()
-        mock_cursor = Mock()
-        mock_conn.cursor.return_value = mock_cursor
-        mock_conn.__enter__ = Mock(return_value=mock_conn)
-        mock_conn.__exit__ = Mock(return_value=None)
-        mock_get_connection.return_value = mock_conn
+        configure_database(self.test_db_path)
         
         _init_db()
         
-        mock_get_connection.assert_called_once()
-        mock_conn.execute.assert_called_once()
-        
-        # Check that the CREATE TABLE statement was executed
-        call_args = mock_conn.execute.call_args[0][0]
-        self.assertIn('CREATE TABLE IF NOT EXISTS events', call_args)
-        self.assertIn('id INTEGER PRIMARY KEY AUTOINCREMENT', call_args)
-        self.assertIn('filename TEXT NOT NULL', call_args)
-        self.assertIn('file_path TEXT NOT NULL', call_args)
-        self.assertIn('file_extension TEXT NOT NULL', call_args)
-        self.assertIn('event TEXT NOT NULL', call_args)
-        self.assertIn('event_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP', call_args)
-        self.assertIn('file_size INTEGER', call_args)
-        self.assertIn('user TEXT', call_args)
+        conn = get_connection()
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(events)')]
+        self.assertEqual(columns, [
+            'id', 'filename', 'file_path', 'file_extension', 'event',
+            'event_timestamp', 'file_size', 'user', 'dest_path'
+        ])
+        self.assertEqual(conn.execute('PRAGMA user_version').fetchone()[0], len(MIGRATIONS))
+    
+    def test_migrate_adds_query_indexes(self):
+        """Test that the migrations create the query indexes."""
+        configure_database(self.test_db_path)
+        conn = get_connection()
+        
+        indexes = {row[1] for row in conn.execute('PRAGMA index_list(events)')}
+        
+        self.assertIn('idx_events_timestamp', indexes)
+        self.assertIn('idx_events_event_timestamp', indexes)
+        self.assertIn('idx_events_extension_timestamp', indexes)
+    
+    def test_migrate_upgrades_existing_database(self):
+        """Test that an unversioned database keeps its rows when upgraded."""
+        legacy = sqlite3.connect(self.test_db_path)
+        legacy.execute('''
+            CREATE TABLE events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                filename TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_extension TEXT NOT NULL,
+                event TEXT NOT NULL,
+                event_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                file_size INTEGER,
+                user TEXT
+            )
+        ''')
+        legacy.execute('''
+            INSERT INTO events (filename, file_path, file_extension, event)
+            VALUES ('a.txt', '/a.txt', '.txt', 'created')
+        ''')
+        legacy.commit()
+        
+        version = _migrate(legacy)
+        
+        self.assertEqual(version, len(MIGRATIONS))
+        self.assertEqual(legacy.execute('SELECT COUNT(*) FROM events').fetchone()[0], 1)
+        self.assertEqual(legacy.execute('PRAGMA user_version').fetchone()[0], len(MIGRATIONS))
+        # Running again is a no-op
+        self.assertEqual(_migrate(legacy), len(MIGRATIONS))
+        legacy.close()
+    
+    def test_migrate_converts_text_timestamps_to_ns(self):
+        """Test that local-time TEXT timestamps become integer epoch nanoseconds."""
+        legacy = sqlite3.connect(self.test_db_path)
+        for step in MIGRATIONS[:3]:
+            step(legacy)
+        legacy.execute('PRAGMA user_version = 3')
+        legacy.execute('''
+            INSERT INTO events (filename, file_path, file_extension, event, event_timestamp)
+            VALUES ('a.txt', '/a.txt', '.txt', 'created', '2023-06-10 12:00:00')
+        ''')
+        legacy.commit()
+        
+        _migrate(legacy)
+        
+        stored = legacy.execute('SELECT event_timestamp FROM events').fetchone()[0]
+        expected = int(datetime(2023, 6, 10, 12, 0, 0).timestamp()) * 1000000000
+        self.assertEqual(stored, expected)
+        indexes = {row[1] for row in legacy.execute('PRAGMA index_list(events)')}
+        self.assertIn('idx_events_timestamp', indexes)
+        legacy.close()
+    
+    def test_compact_schema_keeps_rows_and_queries(self):
+        """Test that converting to the compact layout keeps events readable and writable."""
+        configure_database(self.test_db_path)
+        insert_events([
+            ('created', '/w/a.txt', None, 1000),
+            ('modified', '/w/a.txt', None, 2000),
+            ('moved', '/w/a.txt', '/w/b.txt', 3000),
+        ])
+        before = fetch_all_events()
+        
+        self.assertTrue(enable_compact_schema())
+        conn = get_connection()
+        
+        self.assertTrue(is_compact_schema(conn))
+        self.assertEqual(fetch_all_events(), before)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM paths').fetchone()[0], 2)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM event_types').fetchone()[0], 3)
+        
+        insert_events([('deleted', '/w/b.txt', None, 4000)])
+        rows = query_events({'event_type': 'deleted'})
+        self.assertEqual([(row[1], row[3], row[5]) for row in rows], [('b.txt', '.txt', 4000)])
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM paths').fetchone()[0], 2)
+        
+        delete_event(rows[0][0])
+        self.assertEqual(get_event_count(), 3)
+    
+    def test_reset_keeps_compact_schema(self):
+        """Test that resetting a compact database empties it without leaving the layout."""
+        configure_database(self.test_db_path)
+        insert_events([('created', '/w/a.txt', None, 1000)])
+        enable_compact_schema(theVacuum=False)
+        
+        self.assertTrue(reset_database())
+        
+        self.assertTrue(is_compact_schema(get_connection()))
+        self.assertEqual(get_event_count(), 0)
     
     def test_integration_real_database_connection(self):
         """Integration test with real SQLite database."""
         # This test uses a real database file to ensure the connection actually works
+        # Use a real SQLite connection for this test
+        real_conn = sqlite3.connect(':memory:')
         with patch('model.database.sqlite3.connect') as mock_connect:
-            # Use a real SQLite connection for this test
-            real_conn = sqlite3.connect(':memory:')
             mock_connect.return_value = real_conn
             
             # Test connection
@@ -126,8 +233,8 @@ class TestDatabase(unittest.TestCase):
     
     def test_database_default_values(self):
         """Test that default values work correctly."""
+        real_conn = sqlite3.connect(':memory:')
         with patch('model.database.sqlite3.connect') as mock_connect:
-            real_conn = sqlite3.connect(':memory:')
             mock_connect.return_value = real_conn
             
             # Initialize database
@@ -153,16 +260,50 @@ class TestDatabase(unittest.TestCase):
             
             real_conn.close()
     
+    @patch('model.database.sqlite3.connect')
+    def test_get_connection_reused_per_thread(self, mock_connect):
+        """Test that repeated calls in one thread share a single connection."""
+        mock_conn = self._mock_connection()
+        mock_connect.return_value = mock_conn
+        
+        first = get_connection()
+        second = get_connection()
+        
+        self.assertIs(first, second)
+        mock_connect.assert_called_once()
+    
+    def test_get_connection_per_thread(self):
+        """Test that each thread gets its own connection."""
+        configure_database(self.test_db_path)
+        main_conn = get_connection()
+        other = []
+        
+        thread = threading.Thread(target=lambda: other.append(get_connection()))
+        thread.start()
+        thread.join()
+        
+        self.assertIsNot(main_conn, other[0])
+    
+    def test_get_connection_pragmas(self):
+        """Test that pooled connections use WAL and the tuned pragmas."""
+        configure_database(self.test_db_path, theCacheSizeKb=2048, theMmapSize=1048576)
+        conn = get_connection()
+        
+        self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)
+        self.assertEqual(conn.execute('PRAGMA cache_size').fetchone()[0], -2048)
+        self.assertEqual(conn.execute('PRAGMA mmap_size').fetchone()[0], 1048576)
+    
     def test_database_file_path(self):
         """Test that database uses correct file path."""
         with patch('model.database.sqlite3.connect') as mock_connect:
-            mock_conn = Mock()
+            mock_conn = self._mock_connection()
             mock_connect.return_value = mock_conn
             
             get_connection()
             
             # Verify the correct database file path is used
-            mock_connect.assert_called_once_with('database.db')
+            mock_connect.assert_called_once_with('database.db', cached_statements=256, check_same_thread=False)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
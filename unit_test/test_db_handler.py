@@ -2,19 +2,28 @@ import unittest
 import tempfile
 import os
 import sys
-from unittest.mock import Mock, patch, mock_open, MagicMock, call
+from unittest.mock import Mock, patch, MagicMock, call
 from datetime import datetime
-import csv
+import shutil
+import sqlite3
+import stat
+import threading
+import time
 
 # Add the parent directory to the path so we can import from model
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from model.db_handler import (
-    insert_event, delete_event, reset_database, fetch_all_events,
+    insert_event, insert_events, delete_event, reset_database, fetch_all_events,
     fetch_event_by_type, fetch_event_by_extension, fetch_event_by_after_date,
     get_event_count, get_event_by_id, query_events, get_unique_extensions,
-    save_multiple_events, format_event_for_display, export_events_to_csv
+    save_multiple_events, format_event_for_display,
+    fetch_event_page, iter_events, get_events_per_hour, find_paths, get_extension_counts,
+    get_query_cache_stats, clear_query_cache, _build_filter_clause
 )
+from model.database import configure_database, enable_compact_schema, get_connection
+from model.event_enricher import clear_caches
+from model.query_cache import QueryCache
 
 class TestDbHandler(unittest.TestCase):
     
@@ -26,6 +35,9 @@ class TestDbHandler(unittest.TestCase):
         self.mock_conn.__enter__ = Mock(return_value=self.mock_conn)
         self.mock_conn.__exit__ = Mock(return_value=None)
         
+        clear_caches()
+        clear_query_cache()
+        
         self.test_event = "created"
         self.test_path = "/test/path/file.txt"
         self.test_timestamp = "2023-06-10 12:00:00"
@@ -38,25 +50,15 @@ class TestDbHandler(unittest.TestCase):
         ]
 
     @patch('model.db_handler.get_connection')
-    @patch('model.db_handler.getpass.getuser')
-    @patch('model.db_handler.os.path.getsize')
-    @patch('model.db_handler.os.path.isfile')
-    @patch('model.db_handler.os.path.abspath')
-    @patch('model.db_handler.os.path.basename')
-    @patch('model.db_handler.os.path.splitext')
+    @patch('model.event_enricher.getpass.getuser')
+    @patch('model.event_enricher.os.stat')
     @patch('model.db_handler.datetime')
-    def test_insert_event_success(self, mock_datetime, mock_splitext, mock_basename, 
-                                 mock_abspath, mock_isfile, mock_getsize, 
-                                 mock_getuser, mock_get_conn):
+    def test_insert_event_success(self, mock_datetime, mock_stat, mock_getuser, mock_get_conn):
         """Test successful event insertion."""
         # Setup mocks
         mock_get_conn.return_value = self.mock_conn
         mock_datetime.now.return_value.strftime.return_value = self.test_timestamp
-        mock_abspath.return_value = "/absolute/path/file.txt"
-        mock_basename.return_value = "file.txt"
-        mock_splitext.return_value = ("file", ".txt")
-        mock_isfile.return_value = True
-        mock_getsize.return_value = 1024
+        mock_stat.return_value = os.stat_result((stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, 1024, 0, 0, 0))
         mock_getuser.return_value = "testuser"
         
         # Test
@@ -68,6 +70,46 @@ class TestDbHandler(unittest.TestCase):
         self.assertIn("INSERT INTO events", call_args[0][0])
         self.assertEqual(call_args[0][1][0], "file.txt")  # filename
         self.assertEqual(call_args[0][1][3], self.test_event)  # event type
+        self.assertEqual(call_args[0][1][5], 1024)  # file size
+        self.assertEqual(call_args[0][1][6], "testuser")  # user
+        mock_stat.assert_called_once_with(os.path.abspath(self.test_path))
+    
+    @patch('model.db_handler.get_connection')
+    @patch('model.event_enricher.getpass.getuser')
+    @patch('model.event_enricher.os.stat')
+    def test_insert_events_batch(self, mock_stat, mock_getuser, mock_get_conn):
+        """Test that a batch of events is written with a single executemany."""
+        mock_get_conn.return_value = self.mock_conn
+        mock_stat.side_effect = FileNotFoundError
+        mock_getuser.return_value = "testuser"
+        
+        result = insert_events([('created', '/a/one.txt', None, 1686398400000000000),
+                                ('deleted', '/a/two.png', None, None)])
+        
+        self.assertTrue(result)
+        self.mock_conn.execute.assert_not_called()
+        self.mock_conn.executemany.assert_called_once()
+        rows = self.mock_conn.executemany.call_args[0][1]
+        self.assertEqual([row[0] for row in rows], ['one.txt', 'two.png'])
+        self.assertEqual([row[3] for row in rows], ['created', 'deleted'])
+        self.assertEqual([row[5] for row in rows], [None, None])
+        self.assertEqual([row[7] for row in rows], [None, None])
+        self.assertEqual(rows[0][4], 1686398400000000000)
+        self.assertIsInstance(rows[1][4], int)
+        mock_getuser.assert_called_once()
+    
+    @patch('model.db_handler.build_event_row', side_effect=OSError('no user name'))
+    @patch('builtins.print')
+    def test_insert_events_enrichment_error(self, mock_print, mock_build):
+        """Test that a failure while building the rows is reported instead of raised."""
+        self.assertFalse(insert_events([('created', '/a/one.txt', None, None)]))
+        mock_print.assert_called_with("Error writing event batch: no user name")
+    
+    @patch('model.db_handler.get_connection')
+    def test_insert_events_empty_batch(self, mock_get_conn):
+        """Test that an empty batch does not touch the database."""
+        self.assertTrue(insert_events([]))
+        mock_get_conn.assert_not_called()
     
     @patch('model.db_handler.get_connection')
     def test_delete_event_success(self, mock_get_conn):
@@ -85,7 +127,8 @@ class TestDbHandler(unittest.TestCase):
     
     @patch('model.db_handler.get_connection')  
     @patch('model.database._init_db')
-    def test_reset_database_success(self, mock_init_db, mock_get_conn):
+    @patch('model.database._drop_schema')
+    def test_reset_database_success(self, mock_drop_schema, mock_init_db, mock_get_conn):
         """Test successful database reset."""
         mock_get_conn.return_value = self.mock_conn
         
@@ -94,15 +137,16 @@ class TestDbHandler(unittest.TestCase):
         
         # Assertions
         self.assertTrue(result)
-        self.mock_cursor.execute.assert_called_once_with('DROP TABLE IF EXISTS events')
+        mock_drop_schema.assert_called_once_with(self.mock_conn)
         mock_init_db.assert_called_once()
     
     @patch('model.db_handler.get_connection')
+    @patch('model.database._drop_schema')
     @patch('builtins.print')
-    def test_reset_database_exception(self, mock_print, mock_get_conn):
+    def test_reset_database_exception(self, mock_print, mock_drop_schema, mock_get_conn):
         """Test reset_database when exception occurs."""
         mock_get_conn.return_value = self.mock_conn
-        self.mock_cursor.execute.side_effect = Exception("Database error")
+        mock_drop_schema.side_effect = Exception("Database error")
         
         result = reset_database()
         
@@ -248,10 +292,12 @@ class TestDbHandler(unittest.TestCase):
         query = self.mock_cursor.execute.call_args[0][0]
         params = self.mock_cursor.execute.call_args[0][1]
         
-        self.assertIn('AND event LIKE ?', query)
+        self.assertIn('AND event = ?', query)
         self.assertIn('AND file_extension = ?', query)
-        self.assertIn("AND DATE(event_timestamp) = DATE('now')", query)
-        self.assertIn('%created%', params)
+        self.assertIn("AND event_timestamp >= ?", query)
+        self.assertIn(int(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+                      * 1000000000, params)
+        self.assertIn('created', params)
         self.assertIn('.txt', params)
     
     @patch('model.db_handler.get_connection')
@@ -268,6 +314,22 @@ class TestDbHandler(unittest.TestCase):
         self.assertIn('WHERE 1=1', query)
         self.assertIn('ORDER BY event_timestamp DESC', query)
     
+    @patch('model.db_handler.get_connection')
+    @patch('builtins.print')
+    def test_query_events_multiple_values(self, mock_print, mock_get_conn):
+        """Test that lists of event types and extensions become IN lists."""
+        mock_get_conn.return_value = self.mock_conn
+        self.mock_cursor.fetchall.return_value = self.sample_events
+        
+        query_events({'event_type': ['moved', 'created'], 'extension': ['.txt'],
+                      'start': 100, 'end': 200})
+        
+        query, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn('AND event IN (?, ?)', query)
+        self.assertIn('AND file_extension = ?', query)
+        self.assertIn('AND event_timestamp >= ? AND event_timestamp < ?', query)
+        self.assertEqual(params, ['created', 'moved', '.txt', 100, 200])
+    
     @patch('model.db_handler.get_connection')
     @patch('builtins.print')
     def test_query_events_exception(self, mock_print, mock_get_conn):
@@ -282,18 +344,17 @@ class TestDbHandler(unittest.TestCase):
     
     @patch('model.db_handler.get_connection')
     def test_get_unique_extensions_success(self, mock_get_conn):
-        """Test successful retrieval of unique extensions."""
+        """Test that unique extensions are read from the extension catalog."""
         mock_get_conn.return_value = self.mock_conn
-        self.mock_cursor.fetchall.return_value = [('.txt',), ('.pdf',), ('.png',)]
+        self.mock_cursor.fetchall.return_value = [('.txt', 3), ('', 2), ('.pdf', 1), ('.png', 5)]
         
         result = get_unique_extensions()
         
-        expected = ['All', '.txt', '.pdf', '.png']
+        expected = ['All', '.pdf', '.png', '.txt']
         self.assertEqual(result, expected)
         
         query = self.mock_cursor.execute.call_args[0][0]
-        self.assertIn('SELECT DISTINCT file_extension', query)
-        self.assertIn('WHERE file_extension != ""', query)
+        self.assertIn('FROM extension_catalog', query)
     
     @patch('model.db_handler.get_connection')
     def test_save_multiple_events_empty_list(self, mock_get_conn):
@@ -346,35 +407,379 @@ class TestDbHandler(unittest.TestCase):
         expected = ("testfile", "(none)", "relative/path/testfile", "created", "2023-06-10 12:00:00")
         self.assertEqual(result, expected)
     
-    @patch('model.db_handler.format_event_for_display')
-    def test_export_events_to_csv_success(self, mock_format):
-        """Test successful CSV export."""
-        mock_format.side_effect = [
-            ("file1.txt", ".txt", "path1", "created", "2023-06-10 12:00:00"),
-            ("file2.pdf", ".pdf", "path2", "modified", "2023-06-10 13:00:00")
-        ]
+    def test_format_event_for_display_ns_timestamp(self):
+        """Test that nanosecond timestamps are shown as local time."""
+        timestamp = int(datetime(2023, 6, 10, 12, 0, 0).timestamp()) * 1000000000
+        event = (1, "a.txt", "/path/a.txt", ".txt", "created", timestamp, 10, "user", None)
         
-        with patch('builtins.open', mock_open()) as mock_file:
-            with patch('model.db_handler.csv.writer') as mock_writer_class:
-                mock_writer = Mock()
-                mock_writer_class.return_value = mock_writer
-                
-                result = export_events_to_csv("/test/export.csv", self.sample_events[:2])
-                
-                self.assertTrue(result)
-                mock_file.assert_called_once_with("/test/export.csv", 'w', newline='', encoding='utf-8')
-                mock_writer.writerow.assert_any_call(['Filename', 'Extension', 'Path', 'Event', 'Timestamp'])
-                self.assertEqual(mock_writer.writerow.call_count, 3)  # Header + 2 data rows
+        self.assertEqual(format_event_for_display(event)[4], "2023-06-10 12:00:00")
+    
+    def test_format_event_for_display_moved(self):
+        """Test that moves show both the source and destination paths."""
+        event = (1, "old.txt", os.path.abspath("old.txt"), ".txt", "moved",
+                 "2023-06-10 12:00:00", 1024, "user", os.path.abspath("new.txt"))
+        
+        result = format_event_for_display(event)
+        
+        self.assertEqual(result[2], "old.txt -> new.txt")
+        self.assertEqual(result[3], "moved")
+
+
+class TestEventPagination(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database holding 25 events."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        insert_events([
+            ('created' if i % 2 else 'deleted', f'/test/file{i:02d}.txt', None, None)
+            for i in range(25)
+        ])
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    def test_first_page(self):
+        """Test that the first page holds the newest rows and a next token."""
+        rows, next_token, prev_token = fetch_event_page(thePageSize=10)
+        
+        self.assertEqual([row[0] for row in rows], list(range(25, 15, -1)))
+        self.assertIsNotNone(next_token)
+        self.assertIsNone(prev_token)
+    
+    def test_next_and_previous_pages(self):
+        """Test walking forward to the last page and back again."""
+        first, next_token, _ = fetch_event_page(thePageSize=10)
+        second, next_token, prev_token = fetch_event_page(None, next_token, 10)
+        third, last_token, _ = fetch_event_page(None, next_token, 10)
+        
+        self.assertEqual([row[0] for row in second], list(range(15, 5, -1)))
+        self.assertEqual([row[0] for row in third], list(range(5, 0, -1)))
+        self.assertIsNone(last_token)
+        
+        back, _, back_prev = fetch_event_page(None, prev_token, 10)
+        self.assertEqual(back, first)
+        self.assertIsNone(back_prev)
+    
+    def test_pages_respect_filters(self):
+        """Test that pagination only returns rows matching the filters."""
+        rows, _, _ = fetch_event_page({'event_type': 'created'}, thePageSize=100)
+        
+        self.assertEqual(len(rows), 12)
+        self.assertTrue(all(row[4] == 'created' for row in rows))
+    
+    def test_iter_events_streams_all_rows(self):
+        """Test that iter_events yields every row across pages."""
+        ids = [row[0] for row in iter_events(thePageSize=7)]
+        
+        self.assertEqual(ids, list(range(25, 0, -1)))
+
+
+class TestEventFilters(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database with events one second apart."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        self.base = (time.time_ns() // 1000000000 - 60) * 1000000000
+        insert_events([
+            (event, f'/test/file{i}{extension}', None, self.base + i * 1000000000)
+            for i, (event, extension) in enumerate([
+                ('created', '.py'), ('modified', '.py'), ('deleted', '.txt'),
+                ('created', '.md'), ('moved', '.txt')])
+        ])
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    @patch('builtins.print')
+    def test_event_type_is_exact(self, mock_print):
+        """Test that an event type no longer matches as a substring."""
+        self.assertEqual(query_events({'event_type': 'move'}), [])
+        self.assertEqual(len(query_events({'event_type': 'moved'})), 1)
+    
+    @patch('builtins.print')
+    def test_moved_filter(self, mock_print):
+        """Test that moves, stored as one event with a destination, can be selected."""
+        insert_events([('moved', '/test/old.txt', '/test/new.txt', self.base + 10000000000)])
+        
+        rows = query_events({'event_type': 'moved'})
+        
+        self.assertEqual([(row[2], row[8]) for row in rows],
+                         [('/test/old.txt', '/test/new.txt'), ('/test/file4.txt', None)])
     
     @patch('builtins.print')
-    def test_export_events_to_csv_exception(self, mock_print):
-        """Test CSV export when exception occurs."""
-        with patch('builtins.open', side_effect=IOError("File error")):
-            result = export_events_to_csv("/invalid/path.csv", self.sample_events)
-            
-            self.assertFalse(result)
-            mock_print.assert_called_with("Error exporting to CSV: File error")
+    def test_multiple_values(self, mock_print):
+        """Test that several event types and extensions can be selected at once."""
+        rows = query_events({'event_type': ['created', 'deleted'], 'extension': ['.py', '.txt']})
+        
+        self.assertEqual([row[2] for row in rows], ['/test/file2.txt', '/test/file0.py'])
+    
+    @patch('builtins.print')
+    def test_start_and_end(self, mock_print):
+        """Test that start is inclusive and end exclusive, as datetimes or nanoseconds."""
+        rows = query_events({'start': datetime.fromtimestamp(self.base // 1000000000 + 1),
+                             'end': self.base + 3000000000})
+        
+        self.assertEqual([row[2] for row in rows], ['/test/file2.txt', '/test/file1.py'])
+    
+    def test_pages_respect_end(self):
+        """Test that pagination keeps to the end bound."""
+        rows, next_token, _ = fetch_event_page({'end': self.base + 4000000000}, thePageSize=2)
+        older, _, _ = fetch_event_page({'end': self.base + 4000000000}, next_token, 2)
+        
+        self.assertEqual([row[0] for row in rows + older], [4, 3, 2, 1])
+
+
+class TestEventRollups(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database with events spread over two hours."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        self.hour = (time.time_ns() // 3600000000000 - 2) * 3600000000000
+        insert_events([
+            ('created', '/src/a.py', None, self.hour + 1),
+            ('created', '/src/b.py', None, self.hour + 2),
+            ('deleted', '/docs/c.txt', None, self.hour + 3),
+            ('modified', '/src/a.py', None, self.hour + 3600000000000),
+        ])
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    def test_counts_per_hour_by_type(self):
+        """Test that inserted events are counted per hour and type."""
+        self.assertEqual(get_events_per_hour(), [
+            (self.hour, 'created', 2),
+            (self.hour, 'deleted', 1),
+            (self.hour + 3600000000000, 'modified', 1),
+        ])
+    
+    def test_counts_by_directory_and_total(self):
+        """Test grouping by directory and ungrouped totals."""
+        self.assertEqual(get_events_per_hour(theGroupBy='directory')[:2],
+                         [(self.hour, '/docs', 1), (self.hour, '/src', 2)])
+        self.assertEqual(get_events_per_hour(theGroupBy=None),
+                         [(self.hour, None, 3), (self.hour + 3600000000000, None, 1)])
+    
+    def test_rollups_outlive_deleted_events(self):
+        """Test that deleting events keeps their rollups."""
+        delete_event(1)
+        
+        self.assertEqual(get_events_per_hour()[0], (self.hour, 'created', 2))
+    
+    def test_days_limit_window(self):
+        """Test that only hours inside the window are returned."""
+        insert_events([('created', '/old/x.py', None, self.hour - 10 * 86400000000000)])
+        
+        self.assertEqual(len(get_events_per_hour(theDays=1)), 3)
+        self.assertEqual(len(get_events_per_hour(theDays=30)), 4)
+    
+    def test_compact_schema_keeps_counting(self):
+        """Test that rollups are maintained after switching to the compact layout."""
+        self.assertTrue(enable_compact_schema(theVacuum=False))
+        insert_events([('created', '/src/d.py', None, self.hour + 5)])
+        
+        self.assertEqual(get_events_per_hour()[0], (self.hour, 'created', 3))
+    
+    def test_rejects_unknown_group(self):
+        """Test that only rollup columns can be grouped by."""
+        with self.assertRaises(ValueError):
+            get_events_per_hour(theGroupBy='user')
+
+
+class TestPathSearch(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database with events for a few paths."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        insert_events([
+            ('created', '/home/user/Project/main.py', None, None),
+            ('modified', '/home/user/Project/main.py', None, None),
+            ('created', '/home/user/notes/100%_done.txt', None, None),
+            ('deleted', '/tmp/scratch.py', None, None),
+        ])
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    def test_find_paths_by_substring(self):
+        """Test that substrings match anywhere in the path, ignoring case."""
+        self.assertEqual(find_paths('project/MAIN'), ['/home/user/Project/main.py'])
+        self.assertEqual(sorted(find_paths('.py')), ['/home/user/Project/main.py', '/tmp/scratch.py'])
+        self.assertEqual(find_paths('nothing here'), [])
+    
+    def test_find_paths_short_and_special_fragments(self):
+        """Test fragments below the trigram length and LIKE wildcards."""
+        self.assertEqual(len(find_paths('/')), 3)
+        self.assertEqual(find_paths('%_'), ['/home/user/notes/100%_done.txt'])
+        self.assertEqual(find_paths('ma', theLimit=1), ['/home/user/Project/main.py'])
+    
+    def test_query_events_path_filter(self):
+        """Test that query_events only returns events for matching paths."""
+        rows = query_events({'path': 'main.py', 'event_type': 'modified'})
+        
+        self.assertEqual([(row[2], row[4]) for row in rows],
+                         [('/home/user/Project/main.py', 'modified')])
+    
+    def test_combined_filters_use_path_index(self):
+        """Test that a path filter drives the query even with other filters."""
+        where, params = _build_filter_clause(
+            {'path': 'main.py', 'event_type': 'modified', 'extension': '.py', 'date_range': 'Today'})
+        
+        with get_connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM events {where} ORDER BY event_timestamp DESC",
+                params))
+        
+        self.assertIn('idx_events_path', plan)
+        self.assertNotIn('idx_events_event_timestamp', plan)
+        self.assertNotIn('idx_events_extension_timestamp', plan)
+    
+    @patch('model.db_handler.PATH_MATCH_LIMIT', 1)
+    @patch('builtins.print')
+    def test_unselective_path_filter(self, mock_print):
+        """Test that a fragment matching too many paths is checked per row instead."""
+        rows = query_events({'path': '.py', 'event_type': 'created'})
+        
+        self.assertEqual([row[2] for row in rows], ['/home/user/Project/main.py'])
+    
+    def test_compact_schema_indexes_new_paths(self):
+        """Test that paths inserted after switching layouts are searchable."""
+        self.assertTrue(enable_compact_schema(theVacuum=False))
+        insert_events([('created', '/srv/new_file.log', None, None)])
+        
+        self.assertEqual(find_paths('new_file'), ['/srv/new_file.log'])
+        self.assertEqual(len(query_events({'path': 'main'})), 2)
+
+
+class TestExtensionCatalog(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database with events for three extensions."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        insert_events([
+            ('created', '/a/one.py', None, None),
+            ('modified', '/a/one.py', None, None),
+            ('created', '/a/two.txt', None, None),
+            ('created', '/a/Makefile', None, None),
+        ])
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    def test_counts_follow_inserts_and_deletes(self):
+        """Test that the catalog counts inserted events and forgets deleted ones."""
+        self.assertEqual(get_extension_counts(), {'.py': 2, '.txt': 1, '': 1})
+        self.assertEqual(get_unique_extensions(), ['All', '.py', '.txt'])
+        
+        delete_event(3)
+        
+        self.assertEqual(get_extension_counts(), {'.py': 2, '': 1})
+        self.assertEqual(get_unique_extensions(), ['All', '.py'])
+    
+    def test_compact_schema_keeps_catalog(self):
+        """Test that the catalog is maintained after switching to the compact layout."""
+        self.assertTrue(enable_compact_schema(theVacuum=False))
+        insert_events([('created', '/a/three.md', None, None)])
+        delete_event(1)
+        
+        self.assertEqual(get_extension_counts(), {'.py': 1, '.txt': 1, '': 1, '.md': 1})
+    
+    def test_reset_clears_catalog(self):
+        """Test that resetting the database empties the catalog."""
+        self.assertTrue(reset_database())
+        
+        self.assertEqual(get_unique_extensions(), ['All'])
+
+class TestQueryCache(unittest.TestCase):
+    
+    def setUp(self):
+        """Create a temporary database with a few events and an empty cache."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test.db')
+        configure_database(self.db_path)
+        insert_events([('created', f'/a/file{i}.txt', None, None) for i in range(3)])
+        clear_query_cache()
+    
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+    
+    @patch('builtins.print')
+    def test_repeated_query_hits(self, mock_print):
+        """Test that equivalent filters are answered from the cache."""
+        first = query_events({'event_type': 'created', 'extension': 'All'})
+        second = query_events({'event_type': 'created', 'path': ''})
+        
+        self.assertEqual(second, first)
+        self.assertEqual(get_query_cache_stats(), {'hits': 1, 'misses': 1, 'size': 1, 'rows': 3})
+    
+    @patch('builtins.print')
+    def test_writes_invalidate(self, mock_print):
+        """Test that inserts and deletes are visible to the next query."""
+        self.assertEqual(len(query_events(None)), 3)
+        insert_event('created', '/a/new.txt')
+        self.assertEqual(len(query_events(None)), 4)
+        delete_event(1)
+        self.assertEqual(len(query_events(None)), 3)
+        
+        self.assertEqual(get_query_cache_stats()['hits'], 0)
+    
+    def test_pages_are_cached(self):
+        """Test that a repeated page is a hit and returns the same tokens."""
+        first = fetch_event_page(thePageSize=2)
+        
+        self.assertEqual(fetch_event_page(thePageSize=2), first)
+        self.assertEqual(get_query_cache_stats()['hits'], 1)
+    
+    @patch('builtins.print')
+    def test_external_writes_invalidate(self, mock_print):
+        """Test that commits made by another connection are noticed."""
+        query_events(None)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("INSERT INTO events (filename, file_path, file_extension, event) "
+                         "VALUES ('b.txt', '/b.txt', '.txt', 'created')")
+        conn.close()
+        
+        self.assertEqual(len(query_events(None)), 4)
+    
+    def test_new_connection_keeps_cache(self):
+        """Test that a thread's first check of its connection does not invalidate the cache."""
+        query_events(None)
+        thread = threading.Thread(target=query_events, args=(None,))
+        thread.start()
+        thread.join()
+        
+        self.assertEqual(get_query_cache_stats()['hits'], 1)
+    
+    def test_cache_is_bounded_by_rows(self):
+        """Test that results are evicted once the cached rows exceed the limit."""
+        cache = QueryCache(theMaxSize=10, theMaxRows=5)
+        cache.put('a', 1, ['row'] * 3, 3)
+        cache.put('b', 1, ['row'] * 2, 2)
+        cache.put('c', 1, ['row'] * 2, 2)
+        cache.put('huge', 1, ['row'] * 6, 6)
+        
+        self.assertIsNone(cache.get('a', 1))
+        self.assertIsNone(cache.get('huge', 1))
+        self.assertEqual(cache.get('c', 1), ['row'] * 2)
+        self.assertEqual(cache.stats()['rows'], 4)
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,14 +1,15 @@
 import unittest
 import tempfile
 import os
-from unittest.mock import Mock, patch, MagicMock, call
+from unittest.mock import Mock, patch, MagicMock, call, ANY
 import sys
-from watchdog.events import FileSystemEvent, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent
+from watchdog.events import FileSystemEvent, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent, FileMovedEvent
 
 # Add the parent directory to the path so we can import from model
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from model.eventHandler import MyEventHandler
+from model.path_filter import PathFilter
 
 class TestMyEventHandler(unittest.TestCase):
     
@@ -35,23 +36,24 @@ class TestMyEventHandler(unittest.TestCase):
         """Test MyEventHandler initialization with default parameters."""
         handler = MyEventHandler()
         self.assertIsNone(handler._MyEventHandler__myLogToTextbox)
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '')
+        self.assertIsNone(handler._MyEventHandler__myFilter)
     
     def test_init_with_log_callback(self):
         """Test MyEventHandler initialization with log callback."""
         handler = MyEventHandler(self.mock_log_callback)
         self.assertEqual(handler._MyEventHandler__myLogToTextbox, self.mock_log_callback)
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '')
+        self.assertIsNone(handler._MyEventHandler__myFilter)
     
     def test_set_extension_filter(self):
         """Test setting file extension filter."""
         handler = MyEventHandler()
         
         handler.set_extension_filter('.txt')
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '.txt')
+        self.assertTrue(handler._MyEventHandler__myFilter.matches('/test/file.txt'))
         
         handler.set_extension_filter('.png')
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '.png')
+        self.assertTrue(handler._MyEventHandler__myFilter.matches('/test/file.png'))
+        self.assertFalse(handler._MyEventHandler__myFilter.matches('/test/file.txt'))
     
     @patch('model.eventHandler.FileSystemEventHandler.on_modified')
     def test_on_modified_with_callback(self, mock_super_on_modified):
@@ -61,7 +63,7 @@ class TestMyEventHandler(unittest.TestCase):
         
         result = handler.on_modified(mock_event)
         
-        self.mock_log_callback.assert_called_once_with(f'Modified: {self.test_file_path}')
+        self.mock_log_callback.assert_called_once_with('modified', self.test_file_path, None, ANY)
         mock_super_on_modified.assert_called_once_with(mock_event)
     
     @patch('model.eventHandler.FileSystemEventHandler.on_modified')
@@ -82,7 +84,7 @@ class TestMyEventHandler(unittest.TestCase):
         
         result = handler.on_created(mock_event)
         
-        self.mock_log_callback.assert_called_once_with(f'Created: {self.test_file_path}')
+        self.mock_log_callback.assert_called_once_with('created', self.test_file_path, None, ANY)
         mock_super_on_created.assert_called_once_with(mock_event)
     
     @patch('model.eventHandler.FileSystemEventHandler.on_created')
@@ -103,7 +105,7 @@ class TestMyEventHandler(unittest.TestCase):
         
         result = handler.on_deleted(mock_event)
         
-        self.mock_log_callback.assert_called_once_with(f'Deleted: {self.test_file_path}')
+        self.mock_log_callback.assert_called_once_with('deleted', self.test_file_path, None, ANY)
         mock_super_on_deleted.assert_called_once_with(mock_event)
     
     @patch('model.eventHandler.FileSystemEventHandler.on_deleted')
@@ -165,18 +167,100 @@ class TestMyEventHandler(unittest.TestCase):
         handler = MyEventHandler()
         
         handler.set_extension_filter('.txt')
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '.txt')
+        self.assertTrue(handler._MyEventHandler__myFilter.matches('/test/file.txt'))
         
         handler.set_extension_filter('.png')
-        self.assertEqual(handler._MyEventHandler__myExtensionFilter, '.png')
+        self.assertTrue(handler._MyEventHandler__myFilter.matches('/test/file.png'))
+        self.assertFalse(handler._MyEventHandler__myFilter.matches('/test/file.txt'))
         
     
+    def test_events_queued_on_writer(self):
+        """Test that handled events are pushed to the event writer."""
+        mock_writer = Mock()
+        handler = MyEventHandler(theEventWriter=mock_writer)
+        
+        with patch('model.eventHandler.FileSystemEventHandler.on_created'), \
+            patch('model.eventHandler.FileSystemEventHandler.on_deleted'):
+            handler.on_created(self.create_mock_event('created', '/test/a.txt'))
+            handler.on_deleted(self.create_mock_event('deleted', '/test/b.txt'))
+        
+        mock_writer.put.assert_has_calls([
+            call('created', '/test/a.txt', None, ANY),
+            call('deleted', '/test/b.txt', None, ANY),
+        ])
+    
+    @patch('model.eventHandler.FileSystemEventHandler.dispatch')
+    def test_dispatch_with_excluded_directory(self, mock_super_dispatch):
+        """Test that events below excluded directories are dropped."""
+        handler = MyEventHandler()
+        handler.set_filter(PathFilter(theExcludes=['node_modules/'], theRoot='/test'))
+        
+        handler.dispatch(self.create_mock_event('modified', '/test/node_modules/x/index.js'))
+        mock_super_dispatch.assert_not_called()
+        
+        handler.dispatch(self.create_mock_event('modified', '/test/src/index.js'))
+        mock_super_dispatch.assert_called_once()
+    
+    def test_dispatch_coalesces_bursts(self):
+        """Test that a coalescing handler merges bursts before handling them."""
+        mock_writer = Mock()
+        handler = MyEventHandler(theEventWriter=mock_writer, theCoalesceWindow=60)
+        
+        for _ in range(3):
+            handler.dispatch(self.create_mock_event('modified', '/test/a.txt'))
+        handler.dispatch(self.create_mock_event('created', '/test/tmp.txt'))
+        handler.dispatch(self.create_mock_event('deleted', '/test/tmp.txt'))
+        mock_writer.put.assert_not_called()
+        
+        handler.close()
+        
+        mock_writer.put.assert_called_once_with('modified', '/test/a.txt', None, ANY)
+    
+    @patch('model.eventHandler.time.time_ns')
+    def test_timestamp_captured_at_dispatch(self, mock_time_ns):
+        """Test that events are recorded with the time they were dispatched, not delivered."""
+        mock_writer = Mock()
+        handler = MyEventHandler(self.mock_log_callback, mock_writer, theCoalesceWindow=60)
+        
+        mock_time_ns.return_value = 1000
+        handler.dispatch(self.create_mock_event('modified', '/test/a.txt'))
+        mock_time_ns.return_value = 2000
+        handler.close()
+        
+        self.mock_log_callback.assert_called_once_with('modified', '/test/a.txt', None, 1000)
+        mock_writer.put.assert_called_once_with('modified', '/test/a.txt', None, 1000)
+    
+    def test_on_moved_records_source_and_destination(self):
+        """Test that a rename is logged and queued with both paths."""
+        mock_writer = Mock()
+        handler = MyEventHandler(self.mock_log_callback, mock_writer)
+        
+        handler.dispatch(FileMovedEvent('/test/old.txt', '/test/new.txt'))
+        
+        self.mock_log_callback.assert_called_once_with('moved', '/test/old.txt', '/test/new.txt', ANY)
+        mock_writer.put.assert_called_once_with('moved', '/test/old.txt', '/test/new.txt', ANY)
+    
+    def test_moved_across_filter_boundary(self):
+        """Test that a move with only one end matching becomes a create or delete."""
+        mock_writer = Mock()
+        handler = MyEventHandler(theEventWriter=mock_writer)
+        handler.set_extension_filter('.txt')
+        
+        handler.dispatch(FileMovedEvent('/test/draft.tmp', '/test/final.txt'))
+        handler.dispatch(FileMovedEvent('/test/notes.txt', '/test/notes.bak'))
+        handler.dispatch(FileMovedEvent('/test/a.tmp', '/test/b.tmp'))
+        
+        self.assertEqual(mock_writer.put.call_args_list, [
+            call('created', '/test/final.txt', None, ANY),
+            call('deleted', '/test/notes.txt', None, ANY),
+        ])
+    
     def test_integration_all_event_types(self):
         """Test integration of all event types with logging."""
         log_messages = []
         
-        def capture_log(message):
-            log_messages.append(message)
+        def capture_log(event_type, path, dest_path, timestamp):
+            log_messages.append((event_type, path))
         
         handler = MyEventHandler(capture_log)
         
@@ -201,9 +285,9 @@ class TestMyEventHandler(unittest.TestCase):
                     handler.on_deleted(mock_event)
         
         expected_messages = [
-            'Modified: /test/file1.txt',
-            'Created: /test/file2.txt',
-            'Deleted: /test/file3.txt',
+            ('modified', '/test/file1.txt'),
+            ('created', '/test/file2.txt'),
+            ('deleted', '/test/file3.txt'),
         ]
         
         self.assertEqual(log_messages, expected_messages)
@@ -0,0 +1,67 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.event_enricher import build_event_row, clear_caches, current_user, file_size, path_fields
+
+class TestEventEnricher(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary directory and empty caches."""
+        clear_caches()
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, 'data.csv')
+        with open(self.test_file, 'w') as f:
+            f.write('12345')
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        clear_caches()
+        shutil.rmtree(self.test_dir)
+
+    @patch('model.event_enricher.getpass.getuser')
+    def test_user_resolved_once(self, mock_getuser):
+        """Test that the user is looked up once per process."""
+        mock_getuser.return_value = 'testuser'
+
+        for _ in range(3):
+            self.assertEqual(current_user(), 'testuser')
+
+        mock_getuser.assert_called_once()
+
+    def test_path_fields_cached(self):
+        """Test that path-derived fields are memoized per path."""
+        self.assertEqual(path_fields(self.test_file), (self.test_file, 'data.csv', '.csv'))
+        path_fields(self.test_file)
+
+        info = path_fields.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_file_size_single_stat(self):
+        """Test that the size comes from one stat and is None for directories and missing paths."""
+        with patch('model.event_enricher.os.stat', wraps=os.stat) as mock_stat:
+            self.assertEqual(file_size(self.test_file), 5)
+        mock_stat.assert_called_once()
+
+        self.assertIsNone(file_size(self.test_dir))
+        self.assertIsNone(file_size(os.path.join(self.test_dir, 'missing.txt')))
+
+    def test_build_event_row_uses_destination_for_moves(self):
+        """Test that a move takes its size from the destination."""
+        old_path = os.path.join(self.test_dir, 'old.csv')
+
+        row = build_event_row('moved', old_path, '2023-06-10 12:00:00', self.test_file)
+
+        self.assertEqual(row[:4], ('old.csv', old_path, '.csv', 'moved'))
+        self.assertEqual(row[5], 5)
+        self.assertEqual(row[7], self.test_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.event_writer import EventWriter
+
+class TestEventWriter(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.batches = []
+        patcher = patch('model.event_writer.insert_events',
+                        side_effect=lambda batch: self.batches.append(list(batch)) or True)
+        self.mock_insert = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stop_without_start(self):
+        """Test stopping a writer that was never started."""
+        writer = EventWriter()
+        # Should not raise an exception
+        writer.stop()
+
+    def test_events_written_in_single_batch(self):
+        """Test that queued events are grouped into one batch."""
+        writer = EventWriter(theBatchSize=100, theFlushInterval=0.2)
+        writer.start()
+        for i in range(10):
+            writer.put('created', f'/test/file{i}.txt')
+        writer.flush()
+        writer.stop()
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 10)
+        self.assertEqual(self.batches[0][0], ('created', '/test/file0.txt', None, None))
+
+    def test_batch_size_is_respected(self):
+        """Test that batches never exceed the configured size."""
+        writer = EventWriter(theBatchSize=4, theFlushInterval=0.2)
+        writer.start()
+        for i in range(10):
+            writer.put('modified', f'/test/file{i}.txt')
+        writer.stop()
+
+        self.assertTrue(all(len(batch) <= 4 for batch in self.batches))
+        self.assertEqual(sum(len(batch) for batch in self.batches), 10)
+
+    def test_stop_drains_queue(self):
+        """Test that stop() writes every queued event before returning."""
+        writer = EventWriter(theBatchSize=3, theFlushInterval=0.05)
+        writer.start()
+        for i in range(7):
+            writer.put('deleted', f'/test/file{i}.txt')
+        writer.stop()
+
+        written = [event for batch in self.batches for event in batch]
+        self.assertEqual(len(written), 7)
+        self.assertEqual(writer.pending(), 0)
+
+    @patch.object(EventWriter, 'RETRY_DELAY', 0.01)
+    @patch('builtins.print')
+    def test_failed_batches_are_retried(self, mock_print):
+        """Test that batches failing to write are kept and retried until they succeed."""
+        outcomes = [False, OSError('database is locked')]
+
+        def insert(theBatch):
+            if outcomes:
+                outcome = outcomes.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                return outcome
+            self.batches.append(list(theBatch))
+            return True
+
+        self.mock_insert.side_effect = insert
+        writer = EventWriter(theBatchSize=100, theFlushInterval=0.05)
+        writer.start()
+        for i in range(5):
+            writer.put('created', f'/test/file{i}.txt')
+        writer.flush()
+        writer.stop()
+
+        written = [event[1] for batch in self.batches for event in batch]
+        self.assertEqual(written, [f'/test/file{i}.txt' for i in range(5)])
+        self.assertEqual(self.mock_insert.call_count, 3)
+
+    @patch.object(EventWriter, 'RETRY_DELAY', 0.01)
+    @patch.object(EventWriter, 'MAX_RETRIES', 2)
+    @patch('builtins.print')
+    def test_failing_database_dead_letters_batches(self, mock_print):
+        """Test that batches which keep failing are dead-lettered and flush() still returns."""
+        self.mock_insert.side_effect = OSError('disk I/O error')
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        dead_letter = os.path.join(test_dir, 'failed.jsonl')
+        failures = []
+        writer = EventWriter(theBatchSize=4, theFlushInterval=0.05, theMaxQueueSize=4,
+                             theDeadLetterPath=dead_letter,
+                             theOnFailure=lambda count, error: failures.append((count, error)))
+        writer.start()
+        for i in range(10):
+            writer.put('created', f'/test/file{i}.txt', theTimestamp=i + 1)
+        writer.flush()
+        writer.stop()
+
+        with open(dead_letter, encoding='utf-8') as file:
+            events = [json.loads(line) for line in file]
+        self.assertEqual([event['file_path'] for event in events],
+                         [f'/test/file{i}.txt' for i in range(10)])
+        self.assertEqual(events[0]['event_timestamp'], 1)
+        self.assertEqual(writer.get_failed_count(), 10)
+        self.assertEqual(writer.get_last_error(), 'disk I/O error')
+        self.assertEqual(failures[-1], (10, 'disk I/O error'))
+        # Only the first batch waits out the retries
+        self.assertLess(self.mock_insert.call_count, 3 + 3 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import unittest
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import shutil
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.database import configure_database
+from model.db_handler import format_event_for_display, insert_events, query_events
+from model.exporters import (
+    COLUMNS, ExportJob, columnar_format, export_events, format_for_path, missing_dependency,
+    read_npz, write_csv
+)
+from model.partitions import roll_partitions
+
+class TestExporters(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary database holding 25 events."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        insert_events([
+            ('created' if i % 2 else 'moved', f'/test/file{i:02d}.txt',
+             None if i % 2 else f'/test/renamed{i:02d}.txt', 1686398400000000000 + i * 1000000)
+            for i in range(25)
+        ])
+
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+
+    def read_csv(self, thePath, theOpener=open):
+        """Read back an exported CSV file."""
+        with theOpener(thePath, 'rt', newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+
+    def test_export_matches_display_format(self):
+        """Test that exported rows match format_event_for_display, newest first."""
+        path = os.path.join(self.test_dir, 'events.csv')
+
+        self.assertEqual(export_events(path, theChunkSize=7), 25)
+
+        rows = self.read_csv(path)
+        self.assertEqual(rows[0], ['Filename', 'Extension', 'Path', 'Event', 'Timestamp'])
+        expected = [list(format_event_for_display(event)) for event in query_events(None)]
+        self.assertEqual(rows[1:], expected)
+
+    def test_export_gzip_by_extension(self):
+        """Test that a .gz path is written compressed."""
+        path = os.path.join(self.test_dir, 'events.csv.gz')
+
+        self.assertEqual(export_events(path, {'event_type': 'created'}), 12)
+
+        self.assertEqual(len(self.read_csv(path, gzip.open)), 13)
+
+    def test_export_spans_partitions(self):
+        """Test that rolled events are exported in order."""
+        roll_partitions()
+        path = os.path.join(self.test_dir, 'events.csv')
+
+        self.assertEqual(export_events(path), 25)
+        self.assertEqual(len(self.read_csv(path)), 26)
+
+    def test_write_csv_reports_progress_per_chunk(self):
+        """Test that progress is reported after every chunk."""
+        progress = []
+        events = query_events(None)
+
+        count = write_csv(io.StringIO(), events, 10, progress.append)
+
+        self.assertEqual(count, 25)
+        self.assertEqual(progress, [10, 20, 25])
+
+    def test_cancel_removes_partial_file(self):
+        """Test that a cancelled export stops and removes its file."""
+        path = os.path.join(self.test_dir, 'events.csv')
+        cancel = threading.Event()
+
+        result = export_events(path, theChunkSize=5, theProgress=lambda count: cancel.set(),
+                               theCancel=cancel)
+
+        self.assertEqual(result, -1)
+        self.assertFalse(os.path.exists(path))
+
+    def test_export_job_runs_in_background(self):
+        """Test that a job exports on its own thread and reports the outcome."""
+        path = os.path.join(self.test_dir, 'events.csv')
+        job = ExportJob(path, theChunkSize=10)
+
+        job.start()
+
+        self.assertEqual(job.wait(10), 25)
+        self.assertFalse(job.is_running())
+        self.assertFalse(job.is_cancelled())
+        self.assertEqual(job.get_progress(), 25)
+
+    def test_export_failure(self):
+        """Test that an unwritable path is reported as a failure."""
+        path = os.path.join(self.test_dir, 'missing', 'events.csv')
+
+        self.assertEqual(export_events(path), -1)
+
+    def test_export_jsonl_full_schema(self):
+        """Test that JSON Lines carries every column with raw values."""
+        path = os.path.join(self.test_dir, 'events.jsonl.gz')
+
+        self.assertEqual(export_events(path, theFormat='jsonl'), 25)
+
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records, [dict(zip(COLUMNS, event)) for event in query_events(None)])
+        self.assertEqual(records[0]['event_timestamp'], 1686398400000000000 + 24 * 1000000)
+        self.assertEqual(records[0]['dest_path'], '/test/renamed24.txt')
+        self.assertIsNone(records[1]['dest_path'])
+
+    def test_format_for_path(self):
+        """Test that the format follows the file extension."""
+        self.assertEqual(format_for_path('out.csv'), 'csv')
+        self.assertEqual(format_for_path('out.JSONL.gz'), 'jsonl')
+        self.assertEqual(format_for_path('out.parquet'), 'parquet')
+        self.assertEqual(format_for_path('out.npz'), 'npz')
+        self.assertEqual(format_for_path('out.txt'), 'csv')
+
+    @unittest.skipUnless(importlib.util.find_spec('numpy'), 'numpy is not installed')
+    def test_export_npz_typed_columns(self):
+        """Test that the .npz archive holds one typed array per column."""
+        import numpy as np
+        path = os.path.join(self.test_dir, 'events.npz')
+
+        self.assertEqual(export_events(path, theFormat='npz', theChunkSize=10), 25)
+
+        with np.load(path) as archive:
+            # One array per column and chunk
+            self.assertEqual(len(archive.files), len(COLUMNS) * 3)
+            self.assertEqual(len(archive['id_2']), 5)
+        columns = read_npz(path)
+        self.assertEqual(sorted(columns), sorted(COLUMNS))
+        self.assertEqual(columns['event_timestamp'].dtype, np.int64)
+        self.assertEqual(list(columns['id']), list(range(25, 0, -1)))
+        self.assertEqual(columns['dest_path'][0], '')
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_export_parquet_full_schema(self):
+        """Test that Parquet exports keep the full schema and row count."""
+        import pyarrow.parquet as pq
+        path = os.path.join(self.test_dir, 'events.parquet')
+
+        self.assertEqual(export_events(path, theFormat='parquet', theChunkSize=10), 25)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.column_names, list(COLUMNS))
+        self.assertEqual(table.num_rows, 25)
+
+    @unittest.skipIf(importlib.util.find_spec('pyarrow') or importlib.util.find_spec('numpy'),
+                     'a columnar backend is installed')
+    def test_columnar_export_without_backend(self):
+        """Test that a columnar export fails cleanly when no backend is installed."""
+        path = os.path.join(self.test_dir, 'events.npz')
+
+        self.assertIsNone(columnar_format())
+        self.assertEqual(missing_dependency('npz'), 'numpy')
+        self.assertEqual(export_events(path, theFormat='npz'), -1)
+        self.assertFalse(os.path.exists(path))
+
+    @patch('model.exporters.importlib.util.find_spec', return_value=None)
+    @patch('builtins.print')
+    def test_missing_dependency_keeps_existing_file(self, mock_print, mock_find_spec):
+        """Test that an export needing a missing package fails before touching the file."""
+        path = os.path.join(self.test_dir, 'events.parquet')
+        with open(path, 'w') as f:
+            f.write('previous export')
+
+        self.assertEqual(missing_dependency('parquet'), 'pyarrow')
+        self.assertIsNone(missing_dependency('csv'))
+        self.assertEqual(export_events(path, theFormat='parquet'), -1)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'previous export')
+        self.assertIn('pyarrow', mock_print.call_args[0][0])
+
+if __name__ == '__main__':
+    unittest.main()
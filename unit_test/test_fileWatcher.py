@@ -10,7 +10,9 @@ import shutil
 # Add the parent directory to the path so we can import from model
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from model.fileWatcher import FileWatcher
+from model.fileWatcher import FileWatcher, plan_watches
+from model.path_filter import PathFilter
+from model.database import configure_database
 
 class TestFileWatcher(unittest.TestCase):
   
@@ -104,6 +106,143 @@ class TestFileWatcher(unittest.TestCase):
     mock_observer.stop.assert_called_once()
     mock_observer.join.assert_called_once()
 
+  
+  def test_plan_watches_without_excluded_directories(self):
+    """Test that a clean tree is covered by one recursive watch."""
+    os.makedirs(os.path.join(self.test_path, 'src', 'pkg'))
+    path_filter = PathFilter(theExcludes=['node_modules/'], theRoot=self.test_path)
+    
+    self.assertEqual(plan_watches(self.test_path, path_filter), [(self.test_path, True)])
+  
+  def test_plan_watches_prunes_excluded_directories(self):
+    """Test that excluded directories are never part of the planned watches."""
+    for sub in ('src/lib', 'app/node_modules/pkg', 'app/views', 'node_modules/x'):
+      os.makedirs(os.path.join(self.test_path, *sub.split('/')))
+    path_filter = PathFilter(theExcludes=['node_modules/'], theRoot=self.test_path)
+    
+    watches = plan_watches(self.test_path, path_filter)
+    
+    self.assertCountEqual(watches, [
+      (self.test_path, False),
+      (os.path.join(self.test_path, 'src'), True),
+      (os.path.join(self.test_path, 'app'), False),
+      (os.path.join(self.test_path, 'app', 'views'), True),
+    ])
+  
+  @patch('model.fileWatcher.Observer')
+  def test_start_with_excludes_schedules_planned_watches(self, mock_observer_class):
+    """Test that starting with exclusions schedules the pruned watches."""
+    mock_observer = Mock()
+    mock_observer_class.return_value = mock_observer
+    os.makedirs(os.path.join(self.test_path, 'src'))
+    os.makedirs(os.path.join(self.test_path, '.git'))
+    path_filter = PathFilter(theExcludes=['.git/'], theRoot=self.test_path)
+    
+    watcher = FileWatcher(self.test_path, self.mock_handler, theFilter=path_filter)
+    watcher.start()
+    
+    scheduled = [(c.args[0], c.args[1], c.kwargs['recursive'])
+                 for c in mock_observer.schedule.call_args_list]
+    self.assertIn((self.mock_handler, self.test_path, False), scheduled)
+    self.assertIn((self.mock_handler, os.path.join(self.test_path, 'src'), True), scheduled)
+    self.assertNotIn(os.path.join(self.test_path, '.git'), [path for _, path, _ in scheduled])
+
+  
+  @patch('model.fileWatcher.Observer')
+  def test_add_root_shares_observer(self, mock_observer_class):
+    """Test that every root is scheduled on the same observer."""
+    mock_observer = Mock()
+    mock_observer_class.return_value = mock_observer
+    other_path = os.path.join(self.test_path, 'other')
+    os.makedirs(other_path)
+    
+    watcher = FileWatcher(theEventHandler=self.mock_handler)
+    self.assertTrue(watcher.add_root(self.test_path, theRecursive=False))
+    self.assertFalse(watcher.add_root(self.test_path))
+    watcher.start()
+    watcher.add_root(other_path)
+    
+    mock_observer_class.assert_called_once()
+    scheduled = [(c.args[1], c.kwargs['recursive']) for c in mock_observer.schedule.call_args_list]
+    self.assertEqual(scheduled, [(self.test_path, False), (other_path, True)])
+    self.assertEqual(watcher.get_roots(), [self.test_path, other_path])
+  
+  @patch('model.fileWatcher.Observer')
+  def test_remove_root_unschedules_its_watches(self, mock_observer_class):
+    """Test that removing a root only unschedules the watches it uses."""
+    mock_observer = Mock()
+    mock_observer.schedule.side_effect = lambda handler, path, recursive: (path, recursive)
+    mock_observer_class.return_value = mock_observer
+    other_path = os.path.join(self.test_path, 'other')
+    os.makedirs(other_path)
+    
+    watcher = FileWatcher(self.test_path, self.mock_handler)
+    watcher.add_root(other_path)
+    watcher.start()
+    
+    self.assertTrue(watcher.remove_root(other_path))
+    self.assertFalse(watcher.remove_root(other_path))
+    
+    mock_observer.unschedule.assert_called_once_with((other_path, True))
+    self.assertEqual(watcher.get_roots(), [self.test_path])
+  
+  def test_roots_apply_their_own_filters(self):
+    """Test that events from each root pass through that root's filter."""
+    events = []
+    handler = Mock()
+    handler.dispatch.side_effect = lambda event: events.append(event.src_path)
+    first = os.path.join(self.test_path, 'first')
+    second = os.path.join(self.test_path, 'second')
+    os.makedirs(first)
+    os.makedirs(second)
+    
+    watcher = FileWatcher(theEventHandler=handler)
+    watcher.add_root(first, theFilter=PathFilter(['.txt'], theRoot=first))
+    watcher.add_root(second, theFilter=PathFilter(['.log'], theRoot=second))
+    watcher.start()
+    try:
+      for path in (os.path.join(first, 'a.txt'), os.path.join(first, 'a.log'),
+                   os.path.join(second, 'b.txt'), os.path.join(second, 'b.log')):
+        with open(path, 'w') as f:
+          f.write('x')
+      deadline = time.monotonic() + 5
+      while len(set(events)) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    finally:
+      watcher.stop()
+    
+    self.assertEqual(set(events), {os.path.join(first, 'a.txt'), os.path.join(second, 'b.log')})
+  
+  @patch('model.fileWatcher.Observer')
+  def test_reconcile_reports_offline_changes(self, mock_observer_class):
+    """Test that changes made while stopped are dispatched on the next start."""
+    watched = os.path.join(self.test_path, 'watched')
+    os.makedirs(watched)
+    with open(os.path.join(watched, 'kept.txt'), 'w') as f:
+      f.write('x')
+    with open(os.path.join(watched, 'gone.txt'), 'w') as f:
+      f.write('x')
+    configure_database(os.path.join(self.test_path, 'test.db'))
+    try:
+      watcher = FileWatcher(theEventHandler=self.mock_handler, theReconcile=True)
+      watcher.add_root(watched)
+      watcher.start()
+      watcher.stop()
+      self.mock_handler.dispatch.assert_not_called()
+      
+      os.remove(os.path.join(watched, 'gone.txt'))
+      with open(os.path.join(watched, 'new.txt'), 'w') as f:
+        f.write('x')
+      watcher.start()
+      watcher.stop()
+    finally:
+      configure_database()
+    
+    events = {(event.event_type, event.src_path) for event in
+              (call.args[0] for call in self.mock_handler.dispatch.call_args_list)}
+    self.assertEqual(events, {('deleted', os.path.join(watched, 'gone.txt')),
+                              ('created', os.path.join(watched, 'new.txt'))})
+
 
 if __name__ == '__main__':
   unittest.main()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.database import MIGRATIONS, configure_database, enable_compact_schema, get_database_path
+from model.db_handler import (
+    insert_events, query_events, fetch_event_page, iter_events, get_event_count,
+    get_unique_extensions, get_extension_counts, reset_database
+)
+from model.partitions import apply_retention, list_partitions, roll_partitions
+
+DAY_NS = 86400 * 1000000000
+
+class TestPartitions(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary database holding 2 events per day for the last 5 days."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        noon = int(datetime.now().replace(hour=12, minute=0, second=0, microsecond=0).timestamp())
+        self.noon_ns = noon * 1000000000
+        insert_events([
+            ('created', f'/test/day{day}-{i}{".txt" if day else ".py"}', None,
+             self.noon_ns - day * DAY_NS + i)
+            for day in range(5) for i in range(2)
+        ])
+
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+
+    def test_roll_moves_old_days(self):
+        """Test that every day before today is moved into its own partition."""
+        self.assertEqual(roll_partitions(), 8)
+
+        partitions = list_partitions()
+        self.assertEqual(len(partitions), 4)
+        self.assertTrue(all(os.path.exists(partition.path) for partition in partitions))
+        self.assertEqual(get_event_count(), 10)
+        self.assertEqual(roll_partitions(), 0)
+
+    def test_roll_by_week(self):
+        """Test that weekly partitions start on Monday."""
+        roll_partitions('week')
+
+        for partition in list_partitions():
+            self.assertEqual(datetime.fromtimestamp(partition.start // 1000000000).weekday(), 0)
+            self.assertEqual(partition.end - partition.start, 7 * DAY_NS)
+
+    def test_roll_rejects_unknown_period(self):
+        """Test that only days and weeks are supported."""
+        with self.assertRaises(ValueError):
+            roll_partitions('month')
+
+    def test_queries_span_partitions(self):
+        """Test that queries and pagination see rolled events in order."""
+        before = [row[0] for row in query_events(None)]
+        roll_partitions()
+
+        self.assertEqual([row[0] for row in query_events(None)], before)
+        self.assertEqual([row[0] for row in iter_events(thePageSize=3)], before)
+        self.assertEqual(get_unique_extensions(), ['All', '.py', '.txt'])
+
+        first, next_token, _ = fetch_event_page(thePageSize=4)
+        _, _, prev_token = fetch_event_page(None, next_token, 4)
+        back, _, _ = fetch_event_page(None, prev_token, 4)
+        self.assertEqual(back, first)
+
+    def test_extension_counts_span_partitions(self):
+        """Test that rolled and expired events keep the extension counts exact."""
+        roll_partitions()
+        self.assertEqual(get_extension_counts(), {'.py': 2, '.txt': 8})
+
+        apply_retention(theMaxRows=3)
+        self.assertEqual(get_extension_counts(), {'.py': 2, '.txt': 1})
+
+    def test_extension_counts_do_not_open_partitions(self):
+        """Test that the partition totals are read from the main database."""
+        roll_partitions()
+
+        with patch('model.partitions.sqlite3.connect', side_effect=AssertionError):
+            self.assertEqual(get_extension_counts(), {'.py': 2, '.txt': 8})
+
+    def test_extension_counts_backfilled_by_migration(self):
+        """Test that upgrading fills the partition totals from existing partitions."""
+        roll_partitions()
+        path = get_database_path()
+        configure_database(path)
+        with sqlite3.connect(path) as conn:
+            conn.execute('DROP TABLE partition_extensions')
+            conn.execute(f'PRAGMA user_version = {len(MIGRATIONS) - 1}')
+        conn.close()
+        configure_database(path)
+
+        self.assertEqual(get_extension_counts(), {'.py': 2, '.txt': 8})
+
+    def test_path_filter_spans_partitions(self):
+        """Test that path searches also find rolled events."""
+        roll_partitions()
+
+        rows = query_events({'path': 'day3-'})
+
+        self.assertEqual(sorted(row[2] for row in rows), ['/test/day3-0.txt', '/test/day3-1.txt'])
+
+    def test_date_range_skips_old_partitions(self):
+        """Test that a date range only reads the partitions it overlaps."""
+        roll_partitions()
+
+        rows = query_events({'date_range': 'Today'})
+
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row[5] >= self.noon_ns for row in rows))
+
+    def test_compact_schema_rolls(self):
+        """Test that the compact layout rolls into plain partitions."""
+        self.assertTrue(enable_compact_schema(theVacuum=False))
+
+        self.assertEqual(roll_partitions(), 8)
+        self.assertEqual(len(query_events(None)), 10)
+
+    def test_retention_by_age(self):
+        """Test that partitions older than the age limit are dropped."""
+        roll_partitions()
+
+        removed = apply_retention(theMaxAgeDays=2)
+
+        self.assertGreaterEqual(removed, 4)
+        self.assertTrue(all(row[5] >= time.time_ns() - 2 * DAY_NS for row in query_events(None)))
+
+    def test_retention_by_rows(self):
+        """Test that the oldest events are removed down to the row limit."""
+        roll_partitions()
+
+        self.assertEqual(apply_retention(theMaxRows=5), 5)
+
+        rows = query_events(None)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(len(list_partitions()), 2)
+        self.assertEqual(rows[-1][5], self.noon_ns - 2 * DAY_NS + 1)
+
+    def test_retention_by_rows_without_partitions(self):
+        """Test that the row limit also applies to the main database."""
+        self.assertEqual(apply_retention(theMaxRows=3), 7)
+        self.assertEqual(get_event_count(), 3)
+
+    def test_retention_by_size(self):
+        """Test that the oldest partitions are dropped to fit the size limit."""
+        roll_partitions()
+
+        apply_retention(theMaxBytes=1)
+
+        self.assertEqual(list_partitions(), [])
+        self.assertEqual(get_event_count(), 2)
+
+    def test_reset_drops_partitions(self):
+        """Test that resetting the database also deletes its partitions."""
+        roll_partitions()
+
+        self.assertTrue(reset_database())
+
+        self.assertEqual(list_partitions(), [])
+        self.assertEqual(get_event_count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
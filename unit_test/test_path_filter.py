@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.path_filter import PathFilter
+
+class TestPathFilter(unittest.TestCase):
+
+    def test_empty_filter_accepts_everything(self):
+        """Test that a filter without patterns accepts every path."""
+        path_filter = PathFilter()
+
+        self.assertTrue(path_filter.is_empty())
+        self.assertTrue(path_filter.matches('/any/path/file.bin'))
+
+    def test_extension_includes(self):
+        """Test that extensions and '*.ext' globs match case-insensitively."""
+        path_filter = PathFilter(['.txt', '*.PY'])
+
+        self.assertTrue(path_filter.matches('/repo/notes.TXT'))
+        self.assertTrue(path_filter.matches('/repo/src/main.py'))
+        self.assertFalse(path_filter.matches('/repo/image.png'))
+        self.assertFalse(path_filter.matches('/repo/txt'))
+
+    def test_multi_dot_extension_includes(self):
+        """Test that suffixes with several dots match, given with or without '*'."""
+        for pattern in ('.tar.gz', '*.tar.gz'):
+            path_filter = PathFilter([pattern])
+
+            self.assertTrue(path_filter.matches('/x/a.tar.gz'))
+            self.assertTrue(path_filter.matches('/x/B.TAR.GZ'))
+            self.assertFalse(path_filter.matches('/x/a.gz'))
+            self.assertFalse(path_filter.matches('/x/tar.gz/a.txt'))
+
+    def test_glob_includes(self):
+        """Test that name and path globs are matched."""
+        path_filter = PathFilter(['Makefile', 'test_*.py', 'docs/**/*.md'], theRoot='/repo')
+
+        self.assertTrue(path_filter.matches('/repo/sub/Makefile'))
+        self.assertTrue(path_filter.matches('/repo/unit_test/test_cli.py'))
+        self.assertTrue(path_filter.matches('/repo/docs/guide/intro.md'))
+        self.assertFalse(path_filter.matches('/repo/README.md'))
+
+    def test_directory_excludes(self):
+        """Test that gitignore-style directory patterns exclude whole subtrees."""
+        path_filter = PathFilter(theExcludes=['node_modules/', '.git/'], theRoot='/repo')
+
+        self.assertFalse(path_filter.matches('/repo/node_modules/pkg/index.js'))
+        self.assertFalse(path_filter.matches('/repo/app/node_modules/a.js'))
+        self.assertFalse(path_filter.matches('/repo/.git/HEAD'))
+        self.assertFalse(path_filter.matches('/repo/node_modules', theIsDirectory=True))
+        # A file with the same name is not a directory
+        self.assertTrue(path_filter.matches('/repo/node_modules'))
+        self.assertTrue(path_filter.matches('/repo/src/index.js'))
+
+    def test_wildcard_and_anchored_excludes(self):
+        """Test wildcard component patterns and patterns anchored to the root."""
+        path_filter = PathFilter(theExcludes=['*.log', '/build', 'out/tmp'], theRoot='/repo')
+
+        self.assertFalse(path_filter.matches('/repo/logs/server.log'))
+        self.assertFalse(path_filter.matches('/repo/build/a.o'))
+        self.assertTrue(path_filter.matches('/repo/src/build/a.o'))
+        self.assertFalse(path_filter.matches('/repo/out/tmp/x'))
+        self.assertTrue(path_filter.matches('/repo/src/out/tmp/x'))
+
+    def test_excludes_ignore_components_above_root(self):
+        """Test that directories above the root do not trigger exclusions."""
+        path_filter = PathFilter(theExcludes=['build/'], theRoot='/home/build/repo')
+
+        self.assertTrue(path_filter.matches('/home/build/repo/src/a.c'))
+        self.assertFalse(path_filter.matches('/home/build/repo/build/a.o'))
+
+    def test_excludes_take_precedence(self):
+        """Test that an excluded path is rejected even when it is included."""
+        path_filter = PathFilter(['.js'], ['node_modules/'], theRoot='/repo')
+
+        self.assertTrue(path_filter.matches('/repo/src/a.js'))
+        self.assertFalse(path_filter.matches('/repo/node_modules/a.js'))
+        self.assertTrue(path_filter.excludes_directory('/repo/node_modules'))
+        self.assertFalse(path_filter.excludes_directory('/repo/src'))
+
+    def test_parse_patterns(self):
+        """Test splitting comma and whitespace separated pattern lists."""
+        self.assertEqual(PathFilter.parse_patterns('.py, .txt  node_modules/'),
+                         ['.py', '.txt', 'node_modules/'])
+        self.assertEqual(PathFilter.parse_patterns(''), [])
+        self.assertEqual(PathFilter.parse_patterns(None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import shutil
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.database import configure_database, get_connection
+from model.query_runner import QueryCancelled, QueryRunner
+
+# A query that runs far longer than any test unless interrupted
+ENDLESS_QUERY = '''
+    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+    SELECT COUNT(*) FROM n
+'''
+
+def run_endless_query(theStarted):
+    """Signal that the query started, then run it on the pooled connection."""
+    theStarted.set()
+    return get_connection().execute(ENDLESS_QUERY).fetchone()
+
+class TestQueryRunner(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary database and a runner."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        self.runner = QueryRunner()
+
+    def tearDown(self):
+        """Stop the runner and restore the default database."""
+        self.runner.shutdown()
+        configure_database()
+        shutil.rmtree(self.test_dir)
+
+    def test_submit_returns_result(self):
+        """Test that a query's result is delivered through its future."""
+        future = self.runner.submit(lambda a, b: a + b, 2, 3)
+
+        self.assertEqual(future.result(timeout=5), 5)
+        self.assertTrue(self.runner.is_current(future))
+
+    def test_superseded_query_is_interrupted(self):
+        """Test that a running query is interrupted when a newer one is submitted."""
+        started = threading.Event()
+        first = self.runner.submit(run_endless_query, started)
+        self.assertTrue(started.wait(5))
+
+        second = self.runner.submit(lambda: 'latest')
+
+        with self.assertRaises(QueryCancelled):
+            first.result(timeout=5)
+        self.assertIsInstance(first.exception().__cause__, sqlite3.OperationalError)
+        self.assertEqual(second.result(timeout=5), 'latest')
+        self.assertFalse(self.runner.is_current(first))
+        self.assertTrue(self.runner.is_current(second))
+
+    def test_superseded_query_is_skipped(self):
+        """Test that a query superseded before it starts never runs."""
+        runner = QueryRunner(theWorkers=1)
+        release = threading.Event()
+        ran = []
+        try:
+            blocker = runner.submit(release.wait, 5)
+            skipped = runner.submit(ran.append, 'skipped')
+            latest = runner.submit(ran.append, 'latest')
+            release.set()
+
+            with self.assertRaises(QueryCancelled):
+                skipped.result(timeout=5)
+            latest.result(timeout=5)
+            # The blocker finished after being superseded
+            with self.assertRaises(QueryCancelled):
+                blocker.result(timeout=5)
+            self.assertEqual(ran, ['latest'])
+        finally:
+            runner.shutdown()
+
+    def test_cancel_interrupts_running_query(self):
+        """Test that cancel() stops the running query."""
+        started = threading.Event()
+        future = self.runner.submit(run_endless_query, started)
+        self.assertTrue(started.wait(5))
+
+        self.runner.cancel()
+
+        with self.assertRaises(QueryCancelled):
+            future.result(timeout=5)
+        self.assertFalse(self.runner.is_current(future))
+
+    def test_interrupted_query_returning_empty_is_cancelled(self):
+        """Test that a query that swallows its interruption is still reported as cancelled."""
+        started = threading.Event()
+
+        def swallowing_query():
+            try:
+                return run_endless_query(started)
+            except sqlite3.OperationalError:
+                return []
+
+        future = self.runner.submit(swallowing_query)
+        self.assertTrue(started.wait(5))
+
+        self.runner.cancel()
+
+        with self.assertRaises(QueryCancelled):
+            future.result(timeout=5)
+
+    def test_query_error_is_raised(self):
+        """Test that errors of a current query reach its future."""
+        future = self.runner.submit(lambda: get_connection().execute('SELECT * FROM missing_table'))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            future.result(timeout=5)
+        self.assertTrue(self.runner.is_current(future))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import from model
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from model.database import configure_database
+from model.path_filter import PathFilter
+from model.snapshot import (
+    diff_snapshots, load_snapshot, reconcile_root, save_snapshot, scan_tree, take_snapshot
+)
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary database and a small tree to scan."""
+        self.test_dir = tempfile.mkdtemp()
+        configure_database(os.path.join(self.test_dir, 'test.db'))
+        self.root = os.path.join(self.test_dir, 'root')
+        for path in ('a.txt', 'src/b.py', 'src/deep/c.py', 'node_modules/d.js'):
+            self.write(path)
+
+    def tearDown(self):
+        """Restore the default database."""
+        configure_database()
+        shutil.rmtree(self.test_dir)
+
+    def write(self, thePath, theText='x'):
+        """Write a file below the root, creating its directories."""
+        path = os.path.join(self.root, thePath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(theText)
+
+    def test_scan_tree(self):
+        """Test that every file is recorded by relative path with its size."""
+        files, unreadable = scan_tree(self.root, theWorkers=4)
+
+        self.assertEqual(sorted(files), sorted(os.path.normpath(path) for path in
+                                               ('a.txt', 'src/b.py', 'src/deep/c.py',
+                                                'node_modules/d.js')))
+        self.assertEqual(files['a.txt'][0], 1)
+        self.assertEqual(unreadable, [])
+
+    def test_scan_skips_excluded_and_nested_directories(self):
+        """Test that excluded directories are pruned and recursion can be disabled."""
+        files, _ = scan_tree(self.root, PathFilter(theExcludes=['node_modules/'], theRoot=self.root))
+        self.assertNotIn(os.path.join('node_modules', 'd.js'), files)
+
+        files, _ = scan_tree(self.root, theRecursive=False)
+        self.assertEqual(list(files), ['a.txt'])
+
+    def test_save_and_load(self):
+        """Test that a stored snapshot is read back unchanged."""
+        self.assertIsNone(load_snapshot(self.root))
+        files, _ = scan_tree(self.root)
+
+        self.assertTrue(save_snapshot(self.root, files))
+
+        self.assertEqual(load_snapshot(self.root), files)
+
+    def test_diff_detects_moves(self):
+        """Test that a path reappearing with the same inode is reported as a move."""
+        old = {'a': (1, 10, 5), 'b': (2, 20, 6), 'c': (3, 30, 7)}
+        new = {'a': (1, 11, 5), 'moved': (2, 20, 6), 'd': (4, 40, 8)}
+
+        self.assertEqual(sorted(diff_snapshots(old, new)), [
+            ('created', 'd', None), ('deleted', 'c', None),
+            ('modified', 'a', None), ('moved', 'b', 'moved')])
+
+    def test_reconcile(self):
+        """Test that the first scan only stores a snapshot and the next reports changes."""
+        self.assertEqual(reconcile_root(self.root), [])
+
+        self.write('a.txt', 'longer')
+        os.rename(os.path.join(self.root, 'src', 'b.py'), os.path.join(self.root, 'src', 'e.py'))
+        events = reconcile_root(self.root)
+
+        self.assertEqual(sorted((event.event_type, event.src_path, event.dest_path) for event in events), [
+            ('modified', os.path.join(self.root, 'a.txt'), ''),
+            ('moved', os.path.join(self.root, 'src', 'b.py'), os.path.join(self.root, 'src', 'e.py'))])
+        self.assertEqual(reconcile_root(self.root), [])
+
+    def test_take_snapshot_replaces_previous(self):
+        """Test that a new snapshot hides the changes made before it."""
+        take_snapshot(self.root)
+        self.write('f.txt')
+        take_snapshot(self.root)
+
+        self.assertEqual(reconcile_root(self.root), [])
+
+    def test_unreadable_directory_keeps_entries(self):
+        """Test that files in a directory that cannot be listed are not reported deleted."""
+        reconcile_root(self.root)
+        src = os.path.join(self.root, 'src')
+        real_scandir = os.scandir
+
+        def scandir(thePath):
+            if thePath == src:
+                raise PermissionError(thePath)
+            return real_scandir(thePath)
+
+        with patch('model.snapshot.os.scandir', side_effect=scandir):
+            self.assertEqual(reconcile_root(self.root), [])
+        self.assertIn(os.path.join('src', 'deep', 'c.py'), load_snapshot(self.root))
+
+if __name__ == '__main__':
+    unittest.main()
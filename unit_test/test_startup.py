@@ -0,0 +1,28 @@
+import unittest
+import os
+import subprocess
+import sys
+
+# Add the parent directory to the path so we can import from the project root
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(ROOT)
+
+from benchmarks.bench_startup import LAZY_MODULES
+
+class TestStartup(unittest.TestCase):
+
+    def test_gui_startup_defers_heavy_imports(self):
+        """Test that importing the GUI entry point does not load lazily imported subsystems."""
+        script = (
+            "import sys, main\n"
+            f"lazy = {LAZY_MODULES!r}\n"
+            "print(','.join(m for m in lazy if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script],
+                                cwd=ROOT, capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import collections
+import time
+
+class EventBridge:
+    """
+    Hands file system events from watcher threads to the Tk thread.
+
+    Watcher threads only append to a deque, which is safe without locks.
+    A Tk after() tick drains it at a fixed frame rate and passes the
+    events to the sink as one batch. When more events arrive in a frame
+    than the sink can show, only the newest are passed on and the rest
+    are reported as a dropped count.
+
+    Attributes:
+        __myRoot: The root Tkinter window that schedules the ticks.
+        __mySink: Function called on the Tk thread with (events, dropped).
+        __myInterval: Milliseconds between ticks.
+        __myMaxRows: Maximum number of events passed to the sink per tick.
+        __myPending: Events posted since the last tick.
+        __myAfterId: Id of the scheduled tick, None when stopped.
+    """
+
+    def __init__(self, theRoot, theSink, theFrameRate=20, theMaxRows=100):
+        """
+        Initialize the bridge.
+
+        Args:
+            theRoot: The root Tkinter window.
+            theSink: Function taking a list of (event_type, path, dest_path,
+                timestamp) tuples, oldest first, and the number of events dropped.
+                Timestamps are epoch nanoseconds.
+            theFrameRate: Ticks per second. Defaults to 20.
+            theMaxRows: Maximum events passed to the sink per tick. Defaults to 100.
+        """
+        self.__myRoot = theRoot
+        self.__mySink = theSink
+        self.__myInterval = max(1, int(1000 / theFrameRate))
+        self.__myMaxRows = theMaxRows
+        self.__myPending = collections.deque()
+        self.__myAfterId = None
+
+    def post(self, theEventType, thePath, theDestPath=None, theTimestamp=None):
+        """
+        Queue an event for display. Safe to call from any thread.
+
+        Args:
+            theEventType: The type of event ('created', 'modified', 'deleted', 'moved').
+            thePath: The file path where the event occurred.
+            theDestPath: Destination path of a move. Defaults to None.
+            theTimestamp: Epoch nanoseconds when the event was observed.
+                Defaults to None (the current time).
+        """
+        self.__myPending.append((theEventType, thePath, theDestPath, theTimestamp or time.time_ns()))
+
+    def start(self):
+        """
+        Start draining events on the Tk thread.
+        """
+        if self.__myAfterId is None:
+            self.__myAfterId = self.__myRoot.after(self.__myInterval, self.__tick)
+
+    def stop(self):
+        """
+        Stop draining events.
+        """
+        if self.__myAfterId is not None:
+            self.__myRoot.after_cancel(self.__myAfterId)
+            self.__myAfterId = None
+
+    def __tick(self):
+        """
+        Pass the events posted since the last tick to the sink and reschedule.
+        """
+        count = len(self.__myPending)
+        if count:
+            dropped = max(0, count - self.__myMaxRows)
+            for _ in range(dropped):
+                self.__myPending.popleft()
+            events = [self.__myPending.popleft() for _ in range(count - dropped)]
+            self.__mySink(events, dropped)
+        self.__myAfterId = self.__myRoot.after(self.__myInterval, self.__tick)
@@ -1,5 +1,6 @@
 from view.menubar import MenuBar
 from .setup_window import SetupWindow
+from .event_bridge import EventBridge
 
 class FileWatcherGUI:
     """
@@ -10,41 +11,67 @@ class FileWatcherGUI:
         __myController: The main controller instance.
         __myWindow: The main setup window component.
         __myMenubar: The application menu bar component.
+        __myBridge: Hands events from watcher threads to the main window.
     """
     
-    def __init__(self, theRoot, theController):
+    def __init__(self, theRoot, theController, theFrameRate=20):
         """
         Initialize the FileWatcherGUI with root window and controller.
         
         Args:
             theRoot: The root Tkinter window instance.
             theController: The main controller.
+            theFrameRate: How many times per second new events are displayed.
+                Defaults to 20.
         """
         self.__myRoot = theRoot
         self.__myController = theController
         self.__myWindow = SetupWindow(theRoot, theController)
         self.__myMenubar = MenuBar(theRoot, theController)
+        self.__myBridge = EventBridge(theRoot, self.__myWindow.add_logs,
+                                      theFrameRate, SetupWindow.MAX_LOG_ROWS)
+        self.__myBridge.start()
 
         self.__myRoot.config(menu=self.__myMenubar.get_menubar())
         self.__myController.set_view(self)
 
-    def add_log(self, theMessage):
+    def add_log(self, theEventType, thePath, theDestPath=None, theTimestamp=None):
         """
-        Adds a log message to the main window display.
+        Queues an event for display in the main window.
+        
+        Safe to call from watcher threads; the event is shown on the next
+        display tick.
+        
+        Args:
+            theEventType: The type of event ('created', 'modified', 'deleted', 'moved').
+            thePath: The file path where the event occurred.
+            theDestPath: Destination path of a move. Defaults to None.
+            theTimestamp: Epoch nanoseconds when the event was observed.
+                Defaults to None (the current time).
+        """
+        self.__myBridge.post(theEventType, thePath, theDestPath, theTimestamp)
+
+    def report_write_failure(self, theFailedCount, theError):
+        """
+        Shows that events could not be written to the database.
+        
+        Safe to call from the event writer thread; the message is shown on
+        the Tk main loop.
         
         Args:
-            theMessage: The log message to display in the UI.
+            theFailedCount: Number of events moved to the dead-letter file so far.
+            theError: Message of the last write error.
         """
-        self.__myWindow.add_log(theMessage)
+        self.__myRoot.after(0, self.__myWindow.show_write_failure, theFailedCount, theError)
 
-    def update_directory_display(self, theDirectory):
+    def update_directory_display(self, theDirectories):
         """
         Updates the directory display in the main window.
         
         Args:
-            theDirectory: The directory path to display in the UI.
+            theDirectories: The watched directory paths to display in the UI.
         """
-        self.__myWindow.update_directory_display(theDirectory)
+        self.__myWindow.update_directory_display(theDirectories)
     
     def get_root(self):
         """
@@ -1,6 +1,5 @@
 import tkinter as tk
 from tkinter import Menu, messagebox
-from model import fileWatcher
 
 class MenuBar:
     """
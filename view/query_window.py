@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from .virtual_tree import VirtualTreeview
 
 class QueryWindow(tk.Toplevel):
     """
@@ -13,10 +14,19 @@ class QueryWindow(tk.Toplevel):
         __myExtCombo: Combobox for selecting file extension filter.
         __myDateVar: The date range filter selection.
         __myDateCombo: Combobox for selecting date range filter.
-        __myTree: The display of query results.
+        __myPathVar: Text the file path must contain.
+        __myTree: The virtualized display of query results.
         __email_entry: The email address input.
         __last_exported_file: Path to the last exported CSV file.
-        __db_results: List containing the current query results.
+        __myFilters: Filters of the query currently displayed.
+        __myNextToken: Token of the next page to load, None when all rows are shown.
+        __myPendingQuery: Future of the query running in the background, None when idle.
+        __myPollId: Id of the scheduled check for query results, None when idle.
+        __myStatusLabel: Shows that a query is in progress.
+        __myExportJob: The export running in the background, None when idle.
+        __myExportPath: File the running export writes to.
+        __myExportLabel: Shows the progress of the running export.
+        __myCancelButton: Cancels the running export.
     """
     
     def __init__(self, master, theController):
@@ -40,7 +50,7 @@ class QueryWindow(tk.Toplevel):
         ttk.Label(filter_frame, text="Event Type:").grid(row=0, column=0, padx=5, pady=5)
         self.__myEventTypeVar = tk.StringVar(value="All")
         self.__myEventTypeCombo = ttk.Combobox(filter_frame, textvariable=self.__myEventTypeVar)
-        self.__myEventTypeCombo['values'] = ['All', 'created', 'modified', 'deleted']
+        self.__myEventTypeCombo['values'] = ['All', 'created', 'modified', 'deleted', 'moved']
         self.__myEventTypeCombo.grid(row=0, column=1, padx=5, pady=5)
         self.__myEventTypeCombo.bind('<<ComboboxSelected>>', lambda e: self.__perform_query())
         
@@ -60,31 +70,29 @@ class QueryWindow(tk.Toplevel):
         self.__myDateCombo.grid(row=2, column=1, padx=5, pady=5)
         self.__myDateCombo.bind('<<ComboboxSelected>>', lambda e: self.__perform_query())
 
+        # Path search
+        ttk.Label(filter_frame, text="Path Contains:").grid(row=3, column=0, padx=5, pady=5)
+        self.__myPathVar = tk.StringVar()
+        path_entry = ttk.Entry(filter_frame, textvariable=self.__myPathVar, width=23)
+        path_entry.grid(row=3, column=1, padx=5, pady=5)
+        path_entry.bind('<Return>', lambda e: self.__perform_query())
+
         # Search button
         ttk.Button(filter_frame, text="Search", 
-                command=self.__perform_query).grid(row=3, column=0, columnspan=2, pady=10)
-
-        # Results treeview with simplified columns
-        cols = ("Filename", "Extension", "Path", "Event", "Timestamp")
-        self.__myTree = ttk.Treeview(self, columns=cols, show='headings')
-        
-        # Configure columns like setup_window.py
-        self.__myTree.column("Filename", width=75, anchor=tk.W)
-        self.__myTree.column("Extension", width=75, anchor=tk.W)
-        self.__myTree.column("Path", width=400, anchor=tk.W)
-        self.__myTree.column("Event", width=100, anchor=tk.W)
-        self.__myTree.column("Timestamp", width=150, anchor=tk.W)
-        
-        # Set column headings
-        for col in cols:
-            self.__myTree.heading(col, text=col)
+                command=self.__perform_query).grid(row=4, column=0, columnspan=2, pady=10)
+        self.__myStatusLabel = ttk.Label(filter_frame, text="")
+        self.__myStatusLabel.grid(row=4, column=2, padx=5)
 
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.__myTree.yview)
-        self.__myTree.configure(yscrollcommand=scrollbar.set)
-        
+        # Results grid, rendering only the visible rows and loading the
+        # next page when the view nears the end
+        self.__myTree = VirtualTreeview(
+            self,
+            ("Filename", "Extension", "Path", "Event", "Timestamp"),
+            (75, 75, 400, 100, 150),
+            self.__myController.format_event,
+            theLoadMore=self.__load_next_page
+        )
         self.__myTree.pack(fill="both", expand=True, padx=10, pady=10)
-        scrollbar.pack(side="right", fill="y")
         
         # Bottom frame for export and email
         bottom_frame = ttk.Frame(self)
@@ -101,8 +109,13 @@ class QueryWindow(tk.Toplevel):
                             foreground='red',
                             font=('Arial', 10, 'bold'))
         
-        ttk.Button(bottom_frame, text="Export to CSV", 
+        ttk.Button(bottom_frame, text="Export...", 
                 command=self.export_to_csv).pack(side="left", padx=5)
+        self.__myCancelButton = ttk.Button(bottom_frame, text="Cancel Export",
+                command=self.cancel_export, state="disabled")
+        self.__myCancelButton.pack(side="left", padx=5)
+        self.__myExportLabel = ttk.Label(bottom_frame, text="")
+        self.__myExportLabel.pack(side="left", padx=5)
         
         ttk.Label(bottom_frame, text="Email:").pack(side="left", padx=5)
         self.__email_entry = ttk.Entry(bottom_frame, width=30)
@@ -113,58 +126,177 @@ class QueryWindow(tk.Toplevel):
         
         # Initial query
         self.__last_exported_file = None
+        self.__myFilters = {}
+        self.__myNextToken = None
+        self.__myPendingQuery = None
+        self.__myPollId = None
+        self.__myExportJob = None
+        self.__myExportPath = None
+        self.protocol("WM_DELETE_WINDOW", self.__on_close)
         self.__perform_query()
     
     def __perform_query(self):
         """
-        Execute a database query based on current filter settings and update the display.
+        Start a query for the current filter settings in the background.
+        Its first page is displayed once it arrives, and any query still
+        running is cancelled.
         """
-        for item in self.__myTree.get_children():
-            self.__myTree.delete(item)
-        
-        # Update extension list
-        current_ext = self.__myExtVar.get()
-        extensions = self.__myController.get_available_extensions()
-        self.__myExtCombo['values'] = extensions
-        if current_ext in extensions:
-            self.__myExtVar.set(current_ext)
-        else:
-            self.__myExtVar.set('All')
-        
-        # Get filter values
         filters = {
             'event_type': self.__myEventTypeVar.get(),
             'extension': self.__myExtVar.get(),
-            'date_range': self.__myDateVar.get()
+            'date_range': self.__myDateVar.get(),
+            'path': self.__myPathVar.get().strip()
         }
+        self.__submit(self.__myController.submit_query(self.__fetch_first_page, filters),
+                      self.__show_first_page)
+
+    def __fetch_first_page(self, theFilters):
+        """
+        Load the extension list and the first page of results. Runs on a query worker.
         
-        # Get and display results
-        results = self.__myController.get_filtered_events(filters)
-        if results:
-            for event in results:
-                try:
-                    formatted_event = self.__myController.format_event(event)
-                    self.__myTree.insert('', 0, values=formatted_event)
-                except Exception as e:
-                    print(f"Error processing event: {e}")
-    
-        self.__db_results = results
+        Args:
+            theFilters: Filters selected in the window.
+        
+        Returns:
+            tuple: (extensions, filters, page), where filters fall back to
+                every extension if the selected one no longer exists.
+        """
+        extensions = self.__myController.get_available_extensions()
+        if theFilters['extension'] not in extensions:
+            theFilters['extension'] = 'All'
+        return extensions, theFilters, self.__myController.get_event_page(theFilters)
+
+    def __show_first_page(self, theResult):
+        """
+        Display the result of __fetch_first_page.
+        
+        Args:
+            theResult: (extensions, filters, page) tuple.
+        """
+        extensions, self.__myFilters, (results, self.__myNextToken, _) = theResult
+        self.__myExtCombo['values'] = extensions
+        self.__myExtVar.set(self.__myFilters['extension'])
+        self.__myTree.set_rows(results)
+
+    def __load_next_page(self):
+        """
+        Fetch the next page of results in the background and append it to the grid.
+        """
+        if self.__myNextToken is None or self.__myPendingQuery is not None:
+            return
+        future = self.__myController.submit_query(
+            self.__myController.get_event_page, self.__myFilters, self.__myNextToken)
+        self.__submit(future, self.__append_page)
+
+    def __append_page(self, theResult):
+        """
+        Append a page fetched by __load_next_page to the grid.
+        
+        Args:
+            theResult: (rows, next_token, prev_token) tuple.
+        """
+        results, self.__myNextToken, _ = theResult
+        self.__myTree.append_rows(results)
+
+    def __submit(self, theFuture, theCallback):
+        """
+        Show the loading state and wait for a query without blocking.
+        
+        Args:
+            theFuture: Future of the submitted query.
+            theCallback: Function called on the Tk thread with the query's result.
+        """
+        self.__myPendingQuery = (theFuture, theCallback)
+        self.__myStatusLabel.configure(text="Loading...")
+        self.configure(cursor="watch")
+        if self.__myPollId is None:
+            self.__myPollId = self.after(20, self.__poll_query)
+
+    def __poll_query(self):
+        """
+        Deliver the pending query's result once it has finished.
+        """
+        self.__myPollId = None
+        future, callback = self.__myPendingQuery
+        if not future.done():
+            self.__myPollId = self.after(20, self.__poll_query)
+            return
+
+        self.__myPendingQuery = None
+        self.__myStatusLabel.configure(text="")
+        self.configure(cursor="")
+        # Superseded queries raise QueryCancelled and are not current
+        if not self.__myController.is_current_query(future):
+            return
+        error = future.exception()
+        if error is None:
+            callback(future.result())
+        else:
+            self.__myStatusLabel.configure(text=f"Query failed: {error}")
+
+    def __on_close(self):
+        """
+        Cancel any running query and export and close the window.
+        """
+        self.__myController.cancel_queries()
+        if self.__myExportJob is not None:
+            self.__myExportJob.cancel()
+        if self.__myPollId is not None:
+            self.after_cancel(self.__myPollId)
+        self.destroy()
 
     def export_to_csv(self):
         """
-        Exports current query results to a CSV file.
+        Exports current query results to a file in the background.
         """
+        if self.__myExportJob is not None:
+            messagebox.showwarning("Export Running", "An export is already in progress.")
+            return
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")]
+            filetypes=self.__myController.get_export_filetypes()
         )
         if not file_path:
             return
+        missing = self.__myController.get_missing_export_dependency(file_path)
+        if missing:
+            messagebox.showerror("Error", f"Exporting to this format requires the optional "
+                                          f"'{missing}' package (pip install {missing}).")
+            return
+
+        self.__myExportJob = self.__myController.start_export(file_path, dict(self.__myFilters))
+        self.__myExportPath = file_path
+        self.__myCancelButton.configure(state="normal")
+        self.__poll_export()
+
+    def cancel_export(self):
+        """
+        Cancel the running export.
+        """
+        if self.__myExportJob is not None:
+            self.__myExportJob.cancel()
+
+    def __poll_export(self):
+        """
+        Show the progress of the running export and report its outcome once done.
+        """
+        if not self.winfo_exists():
+            return
+        job = self.__myExportJob
+        if job.is_running():
+            self.__myExportLabel.configure(text=f"Exported {job.get_progress():,} rows...")
+            self.after(200, self.__poll_export)
+            return
 
-        if self.__myController.export_to_csv(file_path, self.__db_results):
-            messagebox.showinfo("Success", f"CSV exported to {file_path}")
+        self.__myExportJob = None
+        self.__myCancelButton.configure(state="disabled")
+        self.__myExportLabel.configure(text="")
+        if job.is_cancelled():
+            messagebox.showinfo("Cancelled", "Export was cancelled")
+        elif job.get_result() >= 0:
+            messagebox.showinfo("Success", f"{job.get_result():,} events exported to {self.__myExportPath}")
         else:
-            messagebox.showerror("Error", "Failed to export CSV")
+            messagebox.showerror("Error", "Failed to export events")
 
     def send_email(self):
         """
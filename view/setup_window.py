@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 import os
-import datetime
+import time
 from tkinter import messagebox
 
 class SetupWindow:
@@ -11,15 +11,19 @@ class SetupWindow:
     Attributes:
         __myRoot: The root Tkinter window instance.
         __myController: The main controller.
-        __events_saved: Track if events have been saved
-        __directory_label: Label displaying the currently selected directory.
-        __fileExtensionSelection: The selected file extension filter.
-        __fileExtensionOptions: List of available file extension filter options.
-        __fileExtensionDropdown: OptionMenu for selecting file extension filters.
+        __directory_list: Listbox displaying the watched directories.
+        __fileExtensionSelection: The selected extensions or glob patterns to include.
+        __fileExtensionOptions: List of suggested file extension filter options.
+        __fileExtensionDropdown: Editable Combobox for the include patterns.
+        __excludeSelection: The gitignore-style patterns to exclude.
         __tree: TreeView widget for displaying file system events in real-time.
         __start_button: Reference to the start button for state control.
+        __status_label: Label summarizing events not shown during bursts.
+        __myDroppedCount: Number of events not shown since the log was cleared.
     """
     
+    MAX_LOG_ROWS = 100
+    
     def __init__(self, theRoot, theController):
         """
         Initialize the SetupWindow with root window and controller.
@@ -30,7 +34,6 @@ class SetupWindow:
         """
         self.__myRoot = theRoot
         self.__myController = theController
-        self.__events_saved = True
 
         # Init Window
         self.__myRoot.title('File System Watcher')
@@ -47,18 +50,25 @@ class SetupWindow:
             command=self.__myController.open_directory,
         )
         open_directory_button.pack(side=tk.LEFT, padx=5)
-        self.__directory_label = tk.Label(
+        self.__directory_list = tk.Listbox(
             directory_frame,
-            text='No directory selected',
-            padx=5,
-            pady=5,
+            height=3,
             width=60,
             relief=tk.GROOVE,
             borderwidth=2,
             bg='white',
             fg='black'
         )
-        self.__directory_label.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.__directory_list.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        self.__directory_list.insert(tk.END, 'No directory selected')
+        # Remove directory button
+        remove_directory_button = tk.Button(
+            directory_frame,
+            text='Remove',
+            font=('Arial', 16),
+            command=self._remove_selected_directory,
+        )
+        remove_directory_button.pack(side=tk.LEFT, padx=5)
         
 
         # Control frame
@@ -80,16 +90,24 @@ class SetupWindow:
             command=self.__myController.stop_watching
         )
         stop_button.pack(side=tk.LEFT)
-        # Dropwdown menu to choose which file extension
+        # Editable dropdown of extensions or glob patterns to include
         self.__fileExtensionSelection = tk.StringVar(value='None')
         self.__fileExtensionOptions = ['None', '.txt', '.pdf', '.csv', '.docx', '.xlsx', '.png']
-        self.__fileExtensionDropdown = tk.OptionMenu(control_frame, 
-                                            self.__fileExtensionSelection, 
-                                            *[opt for opt in self.__fileExtensionOptions if opt != self.__fileExtensionSelection.get()])
+        self.__fileExtensionDropdown = ttk.Combobox(control_frame,
+                                                    textvariable=self.__fileExtensionSelection,
+                                                    values=self.__fileExtensionOptions,
+                                                    width=14)
         
         self.__fileExtensionDropdown.pack(side=tk.LEFT, padx=5)
         self.__fileExtensionSelection.trace_add('write', self._handle_fileExtension_change)
 
+        # Gitignore-style exclusions
+        tk.Label(control_frame, text='Exclude:').pack(side=tk.LEFT)
+        self.__excludeSelection = tk.StringVar(value='')
+        tk.Entry(control_frame, textvariable=self.__excludeSelection, width=18).pack(side=tk.LEFT, padx=5)
+        self.__excludeSelection.trace_add(
+            'write', lambda *args: self.__myController.set_exclude_patterns(self.__excludeSelection.get()))
+
         # Query Button
         query_button = tk.Button(
             control_frame,
@@ -97,7 +115,7 @@ class SetupWindow:
             font=('Arial', 16),
             command=self.__myController.open_query_window
         )
-        query_button.pack(side=tk.LEFT, padx=(250, 5))
+        query_button.pack(side=tk.LEFT, padx=(20, 5))
 
         # Save Database Button
         save_button = tk.Button(
@@ -120,37 +138,58 @@ class SetupWindow:
         self.__tree.column("Event", width=100, anchor=tk.W)
         self.__tree.column("Timestamp", width=150, anchor=tk.W)
         
-        self.__tree.pack(fill=tk.BOTH, expand=True, pady=30)
+        self.__tree.pack(fill=tk.BOTH, expand=True, pady=(30, 0))
+        
+        # Summary of events not shown during bursts
+        self.__myDroppedCount = 0
+        self.__status_label = tk.Label(self.__myRoot, text='', anchor=tk.W)
+        self.__status_label.pack(fill=tk.X, padx=5, pady=(0, 5))
 
         # Bind the window close event
         self.__myRoot.protocol("WM_DELETE_WINDOW", self._on_closing)
 
-    def add_log(self, theMessage: str):
+    def add_logs(self, theEvents, theDropped=0):
         """
-        Adds a file system event log entry to the tree view display.
+        Adds a batch of file system events to the tree view display.
         
         Args:
-            theMessage: Event message.
+            theEvents: List of (event_type, path, dest_path, timestamp) tuples,
+                oldest first. dest_path is None except for moves and timestamp
+                is in epoch nanoseconds.
+            theDropped: Number of events that arrived too fast to be shown.
         """
-        arr = theMessage.split(': ')
-
-        event_type = arr[0]
-        file_path = arr[1]
-        
-        filename, extension = os.path.splitext(os.path.basename(file_path))
-        if not extension:
-            extension = "(none)"
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for event_type, file_path, dest_path, timestamp in theEvents:
+            filename, extension = os.path.splitext(os.path.basename(dest_path or file_path))
+            if not extension:
+                extension = "(none)"
+            display_path = f"{file_path} -> {dest_path}" if dest_path else file_path
+            self.__tree.insert('', 0, values=(
+                filename, extension, display_path, event_type.capitalize(),
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp / 1e9))
+            ))
         
-        self.__tree.insert('', 0, values=(filename, extension, file_path, event_type, timestamp))
+        # Keep only the newest MAX_LOG_ROWS items
+        children = self.__tree.get_children()
+        if len(children) > self.MAX_LOG_ROWS:
+            self.__tree.delete(*children[self.MAX_LOG_ROWS:])
         
-        # Mark events as unsaved when new events are added
-        self.__events_saved = False
+        if theDropped:
+            self.__myDroppedCount += theDropped
+            self.__status_label.config(
+                text=f"{self.__myDroppedCount} events arrived too fast to display "
+                     f"(all are saved to the database)")
+    
+    def show_write_failure(self, theFailedCount, theError):
+        """
+        Shows in the status bar that events could not be written to the database.
         
-        # If there are more than 100 items, remove the oldest ones
-        if len(self.__tree.get_children()) > 100:
-            oldest = self.__tree.get_children()[-1]
-            self.__tree.delete(oldest)
+        Args:
+            theFailedCount: Number of events moved to the dead-letter file so far.
+            theError: Message of the last write error.
+        """
+        self.__status_label.config(
+            text=f"{theFailedCount} events could not be saved to the database "
+                 f"and were written to the failed events file: {theError}")
     
     def _handle_fileExtension_change(self, *args):
         """
@@ -159,81 +198,60 @@ class SetupWindow:
         Args:
             *args: Variable arguments passed by the StringVar trace callback.
         """
-        curr_selection = self.__fileExtensionSelection.get()
-
-        self.__myController.set_file_extension(curr_selection)
-        # Recreate the menu with options that is not selected
-        options = [opt for opt in self.__fileExtensionOptions if opt != curr_selection]
-        menu = self.__fileExtensionDropdown['menu']
-        menu.delete(0, 'end')
-
-        for option in options:
-            menu.add_command(
-                label=option,
-                command=lambda value=option: self.__fileExtensionSelection.set(value)
-            )
+        self.__myController.set_file_extension(self.__fileExtensionSelection.get())
     
-    def update_directory_display(self, theDirectory):
+    def update_directory_display(self, theDirectories):
         """
-        Updates the directory display label with the selected directory path.
+        Updates the directory list with the watched directory paths.
         
         Args:
-            theDirectory: The directory path to display.
+            theDirectories: The directory paths to display.
         """
-        if theDirectory:
-            self.__directory_label.config(text=f"Selected directory: {theDirectory}")
-        else:
-            self.__directory_label.config(text="No directory selected")
+        self.__directory_list.delete(0, tk.END)
+        for directory in theDirectories:
+            self.__directory_list.insert(tk.END, directory)
+        if not theDirectories:
+            self.__directory_list.insert(tk.END, 'No directory selected')
+    
+    def _remove_selected_directory(self):
+        """
+        Stops watching the directory selected in the directory list.
+        """
+        selection = self.__directory_list.curselection()
+        if not selection:
+            messagebox.showwarning("Warning", "Select a directory to remove.")
+            return
+        directory = self.__directory_list.get(selection[0])
+        self.__myController.remove_directory(directory)
     
     def _save_to_database(self):
         """
-        Saves currently displayed events to the database.
+        Waits for captured events to be written to the database.
+        
+        Events are persisted continuously by the controller's event writer,
+        so saving only flushes what is still queued and clears the log view.
         """
         if not self.__tree.get_children():
             messagebox.showwarning("Warning", "No events to save.")
             return
             
-        if messagebox.askyesno("Confirm Save", 
-                            "Do you want to save these events to the database?\n"
-                            "This will add new events to existing data."):
-            events = []
-            for item in self.__tree.get_children():
-                values = self.__tree.item(item)['values']
-                events.append({
-                    'filepath': values[2],
-                    'event_type': values[3],
-                })
-            
-            if self.__myController.save_events_to_database(events):
-                messagebox.showinfo("Success", "Events saved to database.")
-                # Mark events as saved
-                self.__events_saved = True
-                # Clear the logs after save
-                for item in self.__tree.get_children():
-                    self.__tree.delete(item)
-            else:
-                messagebox.showerror("Error", "Failed to save events to database")
+        if self.__myController.flush_events():
+            messagebox.showinfo("Success", "Events saved to database.")
+            # Clear the logs after save
+            self.__tree.delete(*self.__tree.get_children())
+            self.__myDroppedCount = 0
+            self.__status_label.config(text='')
+        else:
+            messagebox.showerror("Error", "Failed to save events to database")
     
     def _on_closing(self):
         """
         Handle the window closing event.
         
-        Prompts user to save unsaved events before closing the application.
+        Stops any active watcher so queued events are written before closing.
         """
-        if self.__tree.get_children() and not self.__events_saved:
-            result = messagebox.askyesnocancel(
-                "Unsaved Events", 
-                "You have unsaved events. Do you want to save them before closing?"
-            )
-            
-            if result is True:
-                self._save_to_database()
-                if self.__events_saved:
-                    self.__myRoot.destroy()
-            elif result is False:
-                self.__myRoot.destroy()
-        else:
-            self.__myRoot.destroy()
+        self.__myController.stop_watching()
+        self.__myRoot.destroy()
 
     def set_start_button_state(self, enabled):
         """
@@ -0,0 +1,197 @@
+import tkinter as tk
+from tkinter import ttk
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Scrollable result grid that only materializes the rows on screen.
+
+    Raw rows are kept in a plain list and only the visible viewport is
+    backed by Treeview items, which are reused as the view scrolls. Rows
+    are formatted lazily, and formatted values are cached for the viewport
+    plus a small overscan so short scrolls do not reformat them.
+
+    Attributes:
+        __myTree: Treeview holding one item per visible row.
+        __myScrollbar: Vertical scrollbar driven by the row offset.
+        __myFormatter: Function turning a raw row into display values.
+        __myLoadMore: Function called when the view nears the end of the rows.
+        __myOverscan: Rows formatted beyond each edge of the viewport.
+        __myRows: Backing store of raw rows.
+        __myFormatted: Cache of formatted rows keyed by row index.
+        __myItems: Treeview item ids, one per visible row.
+        __myOffset: Index of the first visible row.
+        __myVisible: Number of rows that fit in the viewport.
+        __myRowHeight: Height of a Treeview row in pixels.
+    """
+
+    HEADER_HEIGHT = 25
+
+    def __init__(self, master, theColumns, theWidths, theFormatter,
+                 theLoadMore=None, theOverscan=20):
+        """
+        Initialize the grid.
+
+        Args:
+            master: The parent widget.
+            theColumns: Column headings.
+            theWidths: Column widths in pixels, in the same order as theColumns.
+            theFormatter: Function turning a raw row into a tuple of display values.
+            theLoadMore: Function called when the viewport nears the last loaded row.
+                Defaults to None.
+            theOverscan: Rows formatted beyond each edge of the viewport. Defaults to 20.
+        """
+        super().__init__(master)
+        self.__myFormatter = theFormatter
+        self.__myLoadMore = theLoadMore
+        self.__myOverscan = theOverscan
+        self.__myRows = []
+        self.__myFormatted = {}
+        self.__myItems = []
+        self.__myOffset = 0
+        self.__myVisible = 1
+
+        self.__myTree = ttk.Treeview(self, columns=theColumns, show='headings')
+        for col, width in zip(theColumns, theWidths):
+            self.__myTree.column(col, width=width, anchor=tk.W)
+            self.__myTree.heading(col, text=col)
+
+        self.__myScrollbar = ttk.Scrollbar(self, orient="vertical", command=self.__on_scrollbar)
+        self.__myScrollbar.pack(side="right", fill="y")
+        self.__myTree.pack(side="left", fill="both", expand=True)
+
+        self.__myRowHeight = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        self.__myTree.bind('<Configure>', self.__on_resize)
+        self.__myTree.bind('<MouseWheel>', self.__on_mousewheel)
+        self.__myTree.bind('<Button-4>', lambda e: self.scroll_to(self.__myOffset - 3))
+        self.__myTree.bind('<Button-5>', lambda e: self.scroll_to(self.__myOffset + 3))
+
+    def set_rows(self, theRows):
+        """
+        Replace the displayed rows and scroll back to the top.
+
+        Args:
+            theRows: List of raw rows.
+        """
+        self.__myRows = list(theRows)
+        self.__myFormatted = {}
+        self.__myOffset = 0
+        self.__render()
+
+    def append_rows(self, theRows):
+        """
+        Append rows below the ones already loaded.
+
+        Args:
+            theRows: List of raw rows.
+        """
+        self.__myRows.extend(theRows)
+        self.__render()
+
+    def row_count(self):
+        """
+        Gets the number of loaded rows.
+
+        Returns:
+            int: Number of rows in the backing store.
+        """
+        return len(self.__myRows)
+
+    def scroll_to(self, theOffset):
+        """
+        Scroll so the given row is the first one visible.
+
+        Args:
+            theOffset: Index of the row to show at the top, clamped to the valid range.
+        """
+        max_offset = max(0, len(self.__myRows) - self.__myVisible)
+        offset = min(max(0, int(theOffset)), max_offset)
+        if offset != self.__myOffset:
+            self.__myOffset = offset
+            self.__render()
+
+    def __on_scrollbar(self, *args):
+        """
+        Handle scrollbar drags and clicks.
+
+        Args:
+            *args: Either ('moveto', fraction) or ('scroll', amount, 'units'/'pages').
+        """
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * len(self.__myRows))
+        elif args[0] == 'scroll':
+            step = self.__myVisible if args[2] == 'pages' else 1
+            self.scroll_to(self.__myOffset + int(args[1]) * step)
+
+    def __on_mousewheel(self, theEvent):
+        """
+        Scroll three rows per mouse wheel notch.
+
+        Args:
+            theEvent: The Tk mouse wheel event.
+        """
+        self.scroll_to(self.__myOffset - 3 * (1 if theEvent.delta > 0 else -1))
+
+    def __on_resize(self, theEvent):
+        """
+        Recompute how many rows fit when the grid is resized.
+
+        Args:
+            theEvent: The Tk configure event.
+        """
+        visible = max(1, (theEvent.height - self.HEADER_HEIGHT) // self.__myRowHeight)
+        if visible != self.__myVisible:
+            self.__myVisible = visible
+            self.scroll_to(self.__myOffset)
+            self.__render()
+
+    def __format(self, theIndex):
+        """
+        Format a row, reusing the cached values when available.
+
+        Args:
+            theIndex: Index of the row in the backing store.
+
+        Returns:
+            tuple: Display values for the row.
+        """
+        values = self.__myFormatted.get(theIndex)
+        if values is None:
+            try:
+                values = self.__myFormatter(self.__myRows[theIndex])
+            except Exception as e:
+                print(f"Error processing event: {e}")
+                values = ()
+            self.__myFormatted[theIndex] = values
+        return values
+
+    def __render(self):
+        """
+        Refresh the Treeview items and the scrollbar for the current offset.
+        """
+        total = len(self.__myRows)
+        visible = min(self.__myVisible, total)
+
+        # Reuse one item per visible row
+        while len(self.__myItems) < visible:
+            self.__myItems.append(self.__myTree.insert('', 'end'))
+        if len(self.__myItems) > visible:
+            self.__myTree.delete(*self.__myItems[visible:])
+            del self.__myItems[visible:]
+
+        for slot, item in enumerate(self.__myItems):
+            self.__myTree.item(item, values=self.__format(self.__myOffset + slot))
+        self.__myTree.selection_set(())
+
+        # Keep formatted rows only for the viewport and its overscan
+        low = self.__myOffset - self.__myOverscan
+        high = self.__myOffset + visible + self.__myOverscan
+        if len(self.__myFormatted) > 2 * (visible + 2 * self.__myOverscan):
+            self.__myFormatted = {i: v for i, v in self.__myFormatted.items() if low <= i < high}
+
+        if total:
+            self.__myScrollbar.set(self.__myOffset / total, (self.__myOffset + visible) / total)
+        else:
+            self.__myScrollbar.set(0, 1)
+
+        if self.__myLoadMore and high >= total:
+            self.after_idle(self.__myLoadMore)